@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Times the authorization checks of a 10,000 records bulk payload and the
+object filtered query on 10,000 rows.
+
+Run from the repository root with the package installed::
+
+    python benchmarks/bench_authorization.py [--rows 10000] [--repeat 5]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import timeit
+from collections import namedtuple
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+from flask_sqa_restless.authentication import Authorization
+
+Base = declarative_base()
+
+User = namedtuple('User', ['user_type', 'owner_id'])
+
+
+class Article(Base):
+    __tablename__ = 'article'
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.Unicode(100))
+    owner_id = sa.Column(sa.Integer, index=True)
+
+
+def make_session(rows):
+    engine = sa.create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    engine.execute(Article.__table__.insert(), [
+        {'id': i, 'title': u'title %d' % i, 'owner_id': i % 10}
+        for i in range(rows)])
+    return orm.Session(bind=engine)
+
+
+def best(func, repeat, number):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    authorization = Authorization(
+        allowed_roles={'default': [Authorization.DATA_FILTER,
+                                   Authorization.OBJECT_FILTER]},
+        object_perm_filter=('owner_id', 'owner_id'))
+    user = User('member', 1)
+    payload = [{'title': u'title %d' % i, 'owner_id': 1}
+               for i in range(args.rows)]
+
+    session = make_session(args.rows)
+    query = session.query(Article)
+
+    timings = [
+        ('check_data_filter',
+         lambda: authorization.check_data_filter(payload, user), 20),
+        ('is_authorized',
+         lambda: authorization.is_authorized(user, 'bulk_insert', payload),
+         20),
+        ('filtered count, filter_by',
+         lambda: query.filter_by(owner_id=1).count(), 20),
+        ('filtered count, apply_perm_filter',
+         lambda: authorization.apply_perm_filter(query, user,
+                                                 Article).count(), 20),
+    ]
+
+    print('{} rows, best of {} runs'.format(args.rows, args.repeat))
+    for name, func, number in timings:
+        print('{:<40} {:>10.3f} ms'.format(
+            name, best(func, args.repeat, number) * 1000))
+
+
+if __name__ == '__main__':
+    main()
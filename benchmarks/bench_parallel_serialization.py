@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Times the serialization of list pages of growing sizes by the schema, as
+resources do by default, and by ``parallel.encode_rows`` on process pools
+of growing sizes, as with ``parallel_serialization`` set.
+
+Run from the repository root with the package installed::
+
+    python benchmarks/bench_parallel_serialization.py \
+        [--rows 1000 10000 100000] [--workers 1 2 4] [--repeat 3]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import datetime
+import decimal
+import timeit
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+from flask_sqa_restless import parallel
+from flask_sqa_restless.serializer import ModelJSONSerializer
+
+Base = declarative_base()
+
+session = orm.scoped_session(orm.sessionmaker())
+
+
+class Article(Base):
+    __tablename__ = 'article'
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.Unicode(100))
+    body = sa.Column(sa.UnicodeText)
+    views = sa.Column(sa.Integer)
+    price = sa.Column(sa.Numeric(10, 2))
+    created_at = sa.Column(sa.DateTime)
+
+
+class ArticleSerializer(ModelJSONSerializer):
+    class Meta:
+        model = Article
+        sqla_session = session
+
+
+def make_articles(count):
+    created_at = datetime.datetime(2017, 1, 1)
+    return [Article(id=i, title=u'title %d' % i, body=u'body %d' % i * 10,
+                    views=i, price=decimal.Decimal('%d.50' % i),
+                    created_at=created_at + datetime.timedelta(seconds=i))
+            for i in range(count)]
+
+
+def serialize_with_schema(serializer, objects):
+    return serializer.serialize({'objects': serializer.serialize_model(
+        objects)})
+
+
+def serialize_in_parallel(serializer, objects, workers):
+    projection = serializer.get_plain_projection()
+    attributes = [attribute for _, attribute, _ in projection]
+    rows = [tuple(getattr(obj, attribute) for attribute in attributes)
+            for obj in objects]
+    return parallel.encode_rows([key for key, _, _ in projection],
+                                [formatter for _, _, formatter in projection],
+                                rows, serializer.json_encoder, workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Pools are forked before the objects are built, as at the startup of
+    # an application
+    for workers in args.workers:
+        parallel.get_pool(workers)
+
+    serializer = ArticleSerializer()
+    print('{:>8} {:>12} {}'.format(
+        'rows', 'schema', ' '.join('{:>12}'.format('pool of %d' % workers)
+                                   for workers in args.workers)))
+
+    for count in args.rows:
+        objects = make_articles(count)
+        timings = [min(timeit.repeat(
+            lambda: serialize_with_schema(serializer, objects),
+            repeat=args.repeat, number=1))]
+        for workers in args.workers:
+            timings.append(min(timeit.repeat(
+                lambda: serialize_in_parallel(serializer, objects, workers),
+                repeat=args.repeat, number=1)))
+
+        print('{:>8} {}'.format(count, ' '.join(
+            '{:>10.1f}ms'.format(timing * 1000) for timing in timings)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Reports the filtering and ordering access paths declared by resources that
+are not served by an index of the underlying table, and the indexes that no
+access path uses.
+
+Usage::
+
+    python -m flask_sqa_restless.advisor myapp.api [--usage usage.json]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import importlib
+import json
+import sys
+import threading
+from collections import Counter, OrderedDict, namedtuple
+
+import six
+from sqlalchemy import orm
+
+from . import util
+
+# Operators which a B-tree index on the plain column can not serve
+UNINDEXABLE_OPERATORS = frozenset([
+    'ne', 'notin', 'contains', 'icontains', 'iexact', 'endswith',
+    'istartswith', 'iendswith', 'regex', 'iregex', 'year', 'month', 'day'
+])
+
+MISSING_INDEX = 'missing_index'
+UNINDEXABLE_FILTER = 'unindexable_filter'
+UNUSED_INDEX = 'unused_index'
+
+Finding = namedtuple('Finding', ['kind', 'table', 'columns', 'sources',
+                                 'hits', 'message'])
+
+
+class FilterUsageRecorder(object):
+    """
+    Counts the filters and orderings used by requests. Set it as the
+    ``filter_usage_recorder`` of resources to feed actual traffic to
+    :class:`IndexAdvisor`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.filters = Counter()
+        self.orderings = Counter()
+
+    def record_filter(self, model, field, operator):
+        with self._lock:
+            self.filters[(model.__name__, field, operator)] += 1
+
+    def record_ordering(self, model, field):
+        with self._lock:
+            self.orderings[(model.__name__, field)] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'filters': [list(key) + [count]
+                            for key, count in self.filters.items()],
+                'orderings': [list(key) + [count]
+                              for key, count in self.orderings.items()],
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        recorder = cls()
+        for model, field, operator, count in data.get('filters', []):
+            recorder.filters[(model, field, operator)] += count
+        for model, field, count in data.get('orderings', []):
+            recorder.orderings[(model, field)] += count
+        return recorder
+
+
+class IndexAdvisor(object):
+    """
+    Cross checks the ``filtering``, ``ordering_allowed``, ``search_fields``,
+    detail identifiers and nested ``parent_filter`` of resources against the
+    indexes of their models' tables.
+
+    :param resources: Resource classes, ``Api`` registries or a mix of both.
+        Defaults to every imported ``FlaskSQAResource`` subclass with a model
+    :param usage: Optional :class:`FilterUsageRecorder` of actual traffic,
+        used to count the hits of every access path
+    """
+
+    def __init__(self, resources=None, usage=None):
+        self.resources = self._collect_resources(resources)
+        self.usage = usage
+
+    def _collect_resources(self, resources):
+        if resources is None:
+            from .resources import FlaskSQAResource
+            resources = _all_subclasses(FlaskSQAResource)
+
+        collected = []
+        for resource in resources:
+            if hasattr(resource, '_get_all_resources'):
+                candidates = resource._get_all_resources()
+            else:
+                candidates = [resource]
+                candidates.extend(spec['resource'] for spec in
+                                  getattr(resource, 'NESTED_API', []))
+
+            for candidate in candidates:
+                candidate = util.import_class(candidate)
+                if getattr(candidate, 'model', None) is not None and \
+                        candidate not in collected:
+                    collected.append(candidate)
+
+        return collected
+
+    def access_paths(self):
+        """
+        Returns the declared access paths as an ``OrderedDict`` mapping
+        ``(table, column names)`` to lists of ``(resource, field, operator,
+        hits)``, the operator being ``order_by`` for orderings
+        """
+        paths = OrderedDict()
+
+        def add(resource, model, field, operator, hits):
+            columns = _resolve_columns(model, field)
+            if not columns:
+                return
+            key = (columns[0].table, tuple(columns))
+            paths.setdefault(key, []).append(
+                (resource.name(), field, operator, hits))
+
+        for resource in self.resources:
+            model = resource.model
+            for field, operators in resource.filtering.items():
+                if operators == '*':
+                    operators = ['exact']
+                for operator in operators:
+                    add(resource, model, field, operator,
+                        self._filter_hits(model, field, operator))
+
+            for field in resource.ordering_allowed:
+                add(resource, model, field, 'order_by',
+                    self._ordering_hits(model, field))
+
+            add(resource, model, resource.detail_uri_identifier, 'exact', None)
+
+            for spec in getattr(resource, 'NESTED_API', []):
+                nested = util.import_class(spec['resource'])
+                for field in _parent_filter_fields(spec):
+                    add(nested, nested.model, field, 'exact', None)
+
+        return paths
+
+    def report(self):
+        """
+        Returns the list of :class:`Finding` for all the resources, most
+        used access paths first when usage is known
+        """
+        findings = []
+        used_columns = {}
+
+        for (table, columns), sources in self.access_paths().items():
+            used_columns.setdefault(table, set()).update(columns)
+
+            unindexable = [source for source in sources
+                           if source[2] in UNINDEXABLE_OPERATORS]
+            indexable = [source for source in sources
+                         if source[2] not in UNINDEXABLE_OPERATORS and
+                         source[2] != 'search']
+
+            if unindexable:
+                findings.append(self._finding(
+                    UNINDEXABLE_FILTER, table, columns, unindexable,
+                    'operators {} can not use a B-tree index on {}'.format(
+                        ', '.join(sorted(set(s[2] for s in unindexable))),
+                        _column_names(columns))))
+
+            if indexable and not _is_indexed(table, columns[0]):
+                findings.append(self._finding(
+                    MISSING_INDEX, table, columns, indexable,
+                    'no index leads with {}'.format(_column_names(columns))))
+
+        for resource in self.resources:
+            table = resource.model.__table__
+            if resource.search_fields and not resource.search_fts_table \
+                    and not _has_text_search_index(table):
+                columns = tuple(
+                    getattr(resource.model, field).property.columns[0]
+                    for field in resource.search_fields)
+                findings.append(self._finding(
+                    MISSING_INDEX, columns[0].table, columns,
+                    [(resource.name(), 'search', 'search', None)],
+                    'search needs a full text index on {}, e.g. a GIN index '
+                    'on PostgreSQL or search_fts_table on SQLite'.format(
+                        _column_names(columns))))
+
+        for table, columns in used_columns.items():
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                index_columns = list(index.columns)
+                if index_columns and index_columns[0] not in columns:
+                    findings.append(Finding(
+                        UNUSED_INDEX, table.name,
+                        [column.name for column in index_columns], [], None,
+                        'index {} is not used by any filter or ordering'
+                        .format(index.name)))
+
+        findings.sort(key=lambda finding: -(finding.hits or 0))
+        return findings
+
+    def _finding(self, kind, table, columns, sources, message):
+        hits = [source[3] for source in sources if source[3] is not None]
+        names = OrderedDict(('{}.{}__{}'.format(*source[:3]), None)
+                            for source in sources)
+        return Finding(kind, table.name, [column.name for column in columns],
+                       list(names), sum(hits) if hits else None, message)
+
+    def _filter_hits(self, model, field, operator):
+        if self.usage is None:
+            return None
+        return self.usage.filters.get((model.__name__, field, operator), 0)
+
+    def _ordering_hits(self, model, field):
+        if self.usage is None:
+            return None
+        return self.usage.orderings.get((model.__name__, field), 0)
+
+
+def format_report(findings):
+    lines = []
+    for finding in findings:
+        hits = '' if finding.hits is None else ' [{} hits]'.format(
+            finding.hits)
+        lines.append('{}: {}({}){}: {}'.format(
+            finding.kind, finding.table, ', '.join(finding.columns), hits,
+            finding.message))
+        for source in finding.sources:
+            lines.append('    {}'.format(source))
+
+    return '\n'.join(lines) if lines else 'No findings'
+
+
+def _all_subclasses(cls):
+    subclasses = []
+    for subclass in cls.__subclasses__():
+        subclasses.append(subclass)
+        subclasses.extend(_all_subclasses(subclass))
+    return subclasses
+
+
+def _resolve_columns(model, field):
+    """
+    Returns the columns a field of ``model``, possibly spanning relations
+    with ``.`` or ``__``, filters on: the column itself or the local columns
+    of a relationship
+    """
+    tokens = field.replace('.', '__').split('__')
+    mapper = orm.class_mapper(model)
+    for index, token in enumerate(tokens):
+        if token in mapper.relationships:
+            relationship = mapper.relationships[token]
+            if index == len(tokens) - 1:
+                return [local for local, _ in relationship.local_remote_pairs]
+            mapper = relationship.mapper
+        elif token in mapper.columns and index == len(tokens) - 1:
+            return [mapper.columns[token]]
+        else:
+            return []
+
+    return []
+
+
+def _parent_filter_fields(nested_api):
+    parent_filter = nested_api.get('parent_filter')
+    if parent_filter is None:
+        return []
+
+    try:
+        filters = parent_filter(None)
+    except Exception:
+        return []
+
+    if not isinstance(filters, dict):
+        return []
+    return [field for field in filters if isinstance(field, six.string_types)]
+
+
+def _is_indexed(table, column):
+    for index in table.indexes:
+        if list(index.columns)[:1] == [column]:
+            return True
+
+    for constraint in table.constraints:
+        columns = list(getattr(constraint, 'columns', []))
+        if columns[:1] == [column] and \
+                constraint.__visit_name__ in ('primary_key_constraint',
+                                              'unique_constraint'):
+            return True
+
+    return False
+
+
+def _has_text_search_index(table):
+    for index in table.indexes:
+        options = index.dialect_options['postgresql']
+        if options.get('using') in ('gin', 'gist'):
+            return True
+    return False
+
+
+def _column_names(columns):
+    return ', '.join(column.name for column in columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Report missing and unused indexes of resources')
+    parser.add_argument('modules', nargs='+',
+                        help='Modules defining the resources or '
+                             '<module>:<Api instance>')
+    parser.add_argument('--usage',
+                        help='JSON dump of FilterUsageRecorder.to_dict()')
+    args = parser.parse_args(argv)
+
+    resources = None
+    for target in args.modules:
+        module_path, _, attribute = target.partition(':')
+        module = importlib.import_module(module_path)
+        if attribute:
+            resources = (resources or []) + [getattr(module, attribute)]
+
+    usage = None
+    if args.usage:
+        with open(args.usage) as usage_file:
+            usage = FilterUsageRecorder.from_dict(json.load(usage_file))
+
+    findings = IndexAdvisor(resources, usage=usage).report()
+    print(format_report(findings))
+    return 1 if findings else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
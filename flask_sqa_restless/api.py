@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import logging
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from . import util
+
+logger = logging.getLogger(__name__)
+
+
+class Api(object):
+    """
+    Registry of resources which adds the URL rules of all the registered
+    resources to an application in one go.
+
+    Every view function is created with its dispatch table precomputed, so
+    requests are dispatched with a single dictionary lookup. Statistics of the
+    last build - number of resources, number of rules added per registered
+    URL prefix and the time taken - are available in ``stats``.
+
+    With ``lazy`` set, nested resources given as module paths are imported
+    and their serializers built only when first requested, which keeps the
+    startup fast. :meth:`warmup` does that work upfront instead, optionally
+    in the background, for applications preferring fast first requests.
+
+    Usage::
+
+        api = Api(url_prefix='/api/v1')
+        api.register(ArticleResource, '/articles/')
+        api.register(PersonResource, '/persons/')
+        api.init_app(app)
+    """
+
+    def __init__(self, app=None, url_prefix='', lazy=False):
+        self.app = None
+        self.url_prefix = url_prefix
+        self.lazy = lazy
+        self.resources = []
+        self.stats = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def register(self, resource, prefix, endpoint_prefix=None):
+        """
+        Registers ``resource`` to be served at ``prefix``. Rules are added
+        right away if the registry is already bound to an application.
+        """
+        entry = (resource, prefix, endpoint_prefix)
+        self.resources.append(entry)
+        if self.app is not None:
+            self._add_url_rules(self.app, [entry])
+
+        return resource
+
+    def init_app(self, app):
+        self.app = app
+        self.stats = {}
+        self._add_url_rules(app, self.resources)
+
+    def _add_url_rules(self, app, entries):
+        start = time.time()
+        rules_per_prefix = self.stats.setdefault('rules_per_prefix',
+                                                 OrderedDict())
+
+        for resource, prefix, endpoint_prefix in entries:
+            recorder = _RuleRecorder(app)
+            resource.add_url_rules(recorder, self.url_prefix + prefix,
+                                   endpoint_prefix=endpoint_prefix,
+                                   lazy=self.lazy)
+            rules_per_prefix[self.url_prefix + prefix] = recorder.rule_count
+
+        elapsed = time.time() - start
+        self.stats.update({
+            'resources': len(rules_per_prefix),
+            'rules': sum(rules_per_prefix.values()),
+            'seconds': self.stats.get('seconds', 0) + elapsed
+        })
+
+        logger.info("Registered %d url rules for %d resources in %.3fs",
+                    self.stats['rules'], self.stats['resources'], elapsed)
+
+    def warmup(self, background=False, workers=4):
+        """
+        Imports every registered and nested resource and builds their
+        serializers using a pool of ``workers`` threads.
+
+        :param bool background: If set, returns immediately with the
+            ``AsyncResult`` of the warmup instead of waiting for it
+        :return: Dictionary mapping resource names to the seconds their
+            warmup took or the ``AsyncResult`` in background mode
+        """
+        pool = ThreadPool(workers)
+        result = pool.map_async(_warmup_resource, self._get_all_resources(),
+                                callback=_log_warmup)
+        pool.close()
+
+        if background:
+            return result
+
+        return OrderedDict(result.get())
+
+    def _get_all_resources(self):
+        resources = []
+        for resource, _, _ in self.resources:
+            resources.append(resource)
+            for nested_api in getattr(resource, 'NESTED_API', []):
+                if nested_api['resource'] not in resources:
+                    resources.append(nested_api['resource'])
+
+        return resources
+
+
+class _RuleRecorder(object):
+    """
+    Stands in for the application while a resource adds its rules, counting
+    them
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.rule_count = 0
+
+    def add_url_rule(self, *args, **kwargs):
+        self.app.add_url_rule(*args, **kwargs)
+        self.rule_count += 1
+
+    def __getattr__(self, name):
+        return getattr(self.app, name)
+
+
+def _warmup_resource(resource):
+    start = time.time()
+    resource = util.import_class(resource)
+    resource.warmup()
+    return resource.name(), time.time() - start
+
+
+def _log_warmup(timings):
+    for name, elapsed in timings:
+        logger.info("Warmed up resource '%s' in %.3fs", name, elapsed)
+
+    logger.info("Warmed up %d resources in %.3fs of worker time",
+                len(timings),
+                sum(elapsed for _, elapsed in timings))
@@ -2,7 +2,17 @@
 
 from __future__ import absolute_import, division, print_function
 
-from . import util
+import hashlib
+import operator
+import sys
+
+import six
+import sqlalchemy as sa
+from flask import copy_current_request_context, has_request_context, request
+from six.moves import queue
+
+from .cache import TTLCache
+from .jobs import JobRunner
 
 
 class Authentication(object):
@@ -11,6 +21,16 @@ class Authentication(object):
     By default, this indicates the user is always authenticated.
     """
 
+    # Relative cost of ``is_authenticated``, ``MultiAuthentication``
+    # evaluates the cheaper backends first
+    cost = 0
+
+    # Whether ``MultiAuthentication`` may cache the outcomes of
+    # ``is_authenticated``. Backends leaving state for the request, e.g. the
+    # user on ``flask.g``, must also implement ``get_principal`` and
+    # ``restore_principal``
+    cacheable = False
+
     def is_authenticated(self, method, view, **kwargs):
         """
         Identifies if the user is authenticated to continue or not.
@@ -19,31 +39,197 @@ class Authentication(object):
         """
         return True
 
+    def get_principal(self):
+        """
+        Returns the state ``is_authenticated`` left for the request when it
+        succeeded, handed to ``restore_principal`` when the outcome is
+        reused for another request
+        """
+        return None
+
+    def restore_principal(self, principal):
+        pass
+
+
+def get_authorization_header(method, view, **kwargs):
+    return request.headers.get('Authorization')
+
 
 class MultiAuthentication(Authentication):
+    """
+    Authenticates with several backends, requiring any or, with
+    ``match_all``, all of them to succeed.
+
+    Backends are evaluated in increasing ``cost`` order and the evaluation
+    stops as soon as the outcome is decided. With ``concurrent`` set, all
+    backends are evaluated at once on a pool of threads with a copy of the
+    request context, which suits independent I/O bound backends.
+
+    With ``cache_ttl`` set, boolean outcomes are cached for that many seconds,
+    or ``negative_cache_ttl`` seconds for failures, keyed by the SHA-256 of
+    the credential returned by ``credential_getter`` (the ``Authorization``
+    header by default), the method and the view. Only the outcomes decided
+    by ``cacheable`` backends are cached, along with the principal of the
+    backends that succeeded, which is restored on cache hits. Requests
+    without credential are never cached. Revoked credentials must be
+    dropped with :meth:`invalidate`.
+    """
 
     def __init__(self, *backends, **kwargs):
-        self.auth_backends = backends
+        self.auth_backends = sorted(
+            backends, key=lambda backend: getattr(backend, 'cost', 0))
         self.match_all = kwargs.get("match_all", False)
 
         if not self.auth_backends:
             raise ValueError("Atleast one backend must be provided")
 
+        self.concurrent = kwargs.get('concurrent', False)
+        self.runner = kwargs.get('runner') or JobRunner(
+            kwargs.get('workers', len(self.auth_backends)))
+
+        self.credential_getter = kwargs.get('credential_getter',
+                                            get_authorization_header)
+        self.cache_ttl = kwargs.get('cache_ttl', 0)
+        self.negative_cache_ttl = kwargs.get('negative_cache_ttl',
+                                             self.cache_ttl)
+        self.cache = kwargs.get('cache') or TTLCache(
+            max(self.cache_ttl, self.negative_cache_ttl) or 1,
+            maxsize=kwargs.get('cache_maxsize', 10000))
+
     def is_authenticated(self, *args, **kwargs):
-        for backend in self.auth_backends:
-            resp = backend.is_authenticated(*args, **kwargs)
-            if self.match_all:
-                if not resp:
-                    return False
+        key = self._get_cache_key(*args, **kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                resp, principals = cached
+                self._restore_principals(principals)
+                return resp
+
+        if self.concurrent and len(self.auth_backends) > 1:
+            resp, principals = self._authenticate_concurrently(*args,
+                                                               **kwargs)
+            # The backends ran in copies of the request context
+            self._restore_principals(principals)
+        else:
+            resp, principals = self._authenticate(*args, **kwargs)
 
-            else:
-                if resp:
-                    return True
+        if key is not None and isinstance(resp, bool) and all(
+                self.auth_backends[index].cacheable
+                for index, _ in principals):
+            self.cache.set(key, (resp, principals),
+                           self.cache_ttl if resp else self.negative_cache_ttl)
+
+        return resp
+
+    def _authenticate(self, *args, **kwargs):
+        """
+        Returns the outcome and the ``(backend index, principal)`` of the
+        backends deciding it
+        """
+        principals = []
+        for index, backend in enumerate(self.auth_backends):
+            resp = self._decide(
+                principals, _authenticate_backend(index, backend, args, kwargs))
+            if resp is not None:
+                return resp, principals
 
-        return self.match_all
+        return self.match_all, principals
+
+    def _authenticate_concurrently(self, *args, **kwargs):
+        results = queue.Queue()
+        for index, backend in enumerate(self.auth_backends):
+            func = _authenticate_backend
+            if has_request_context():
+                func = copy_current_request_context(func)
+            self.runner.submit(_put_result, results, func,
+                               (index, backend, args, kwargs), {})
+
+        principals = []
+        for _ in self.auth_backends:
+            error, result = results.get()
+            if error is not None:
+                six.reraise(*error)
+
+            resp = self._decide(principals, result)
+            if resp is not None:
+                return resp, principals
+
+        return self.match_all, principals
+
+    def _decide(self, principals, result):
+        """
+        Records the principal of a backend's ``result`` and returns the
+        outcome if the result decides it, ``None`` otherwise
+        """
+        index, resp, principal = result
+        if self.match_all:
+            principals.append((index, principal))
+            if not resp:
+                del principals[:-1]
+                return False
+
+        else:
+            if resp:
+                principals[:] = [(index, principal)]
+                return True
+            principals.append((index, principal))
+
+        return None
+
+    def _restore_principals(self, principals):
+        for index, principal in principals:
+            if principal is not None:
+                self.auth_backends[index].restore_principal(principal)
+
+    def _get_cache_key(self, *args, **kwargs):
+        if not (self.cache_ttl or self.negative_cache_ttl):
+            return None
+
+        credential = self.credential_getter(*args, **kwargs)
+        if credential is None:
+            return None
+
+        return (self.fingerprint(credential), kwargs.get('method'),
+                kwargs.get('view'))
+
+    @staticmethod
+    def fingerprint(credential):
+        if isinstance(credential, six.text_type):
+            credential = credential.encode('utf-8')
+        return hashlib.sha256(credential).hexdigest()
+
+    def invalidate(self, credential):
+        """
+        Drops the cached outcomes of ``credential`` for every method and view
+        """
+        fingerprint = self.fingerprint(credential)
+        self.cache.invalidate(lambda key: key[0] == fingerprint)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def _authenticate_backend(index, backend, args, kwargs):
+    resp = backend.is_authenticated(*args, **kwargs)
+    return index, resp, backend.get_principal() if resp else None
+
+
+def _put_result(results, func, args, kwargs):
+    try:
+        results.put((None, func(*args, **kwargs)))
+    except Exception:
+        results.put((sys.exc_info(), None))
 
 
 class Authorization(object):
+    """
+    Role based authorization policy.
+
+    The roles allowed per view are compiled to frozensets and the getter of
+    the user's value for ``object_perm_filter`` is built once, on
+    initialisation. Call :meth:`compile` after changing ``allowed_roles`` or
+    ``object_perm_filter``.
+    """
 
     ANY = 'ANY'
     OBJECT_FILTER = 'OBJECT_FILTER'
@@ -52,9 +238,23 @@ class Authorization(object):
     def __init__(self, allowed_roles=None, object_perm_filter=None):
         self.allowed_roles = allowed_roles or {}
         self.object_perm_filter = object_perm_filter
+        self.compile()
+
+    def compile(self):
+        self._view_roles = dict(
+            (view, frozenset(roles or ()))
+            for view, roles in self.allowed_roles.items())
+        self._default_roles = self._view_roles.get('default', frozenset())
+
+        self._perm_predicates = {}
+        if self.object_perm_filter:
+            self._perm_field = self.object_perm_filter[0]
+            self._perm_getter = operator.attrgetter(self.object_perm_filter[1])
+        else:
+            self._perm_field = self._perm_getter = None
 
     def is_authorized(self, user, view, data, *args, **kwargs):
-        roles = self.allowed_roles.get(view, self.allowed_roles.get('default'))
+        roles = self._view_roles.get(view, self._default_roles)
         if not roles:
             return False
 
@@ -75,22 +275,46 @@ class Authorization(object):
             return False
 
     def check_data_filter(self, data, user):
-        field = self.object_perm_filter[0]
+        field = self._perm_field
         try:
-            value = util.multi_getter(user, self.object_perm_filter[1])
+            value = self._perm_getter(user)
         except AttributeError:
             return False
 
         if isinstance(data, list):
+            # Items without the field inherit the user's value, items that
+            # are not objects are rejected when saved
             for item in data:
-                if field in item and item[field] != value:
+                if isinstance(item, dict) and item.get(field, value) != value:
                     return False
+            return True
+
         elif field in data and data[field] != value:
             return False
 
         return True
 
     def get_perm_filter(self, user):
-        return {self.object_perm_filter[0]: util.multi_getter(user, self.object_perm_filter[1])}
+        return {self._perm_field: self._perm_getter(user)}
+
+    def get_perm_predicate(self, user, model):
+        """
+        Returns ``(predicate, params)``: the SQL predicate restricting
+        ``model`` to the objects of ``user``, built once per model with a
+        bound parameter, and the value of that parameter for ``user``
+        """
+        predicate = self._perm_predicates.get(model)
+        if predicate is None:
+            column = getattr(model, self._perm_field)
+            predicate = column == sa.bindparam(self.perm_param_name)
+            self._perm_predicates[model] = predicate
+
+        return predicate, {self.perm_param_name: self._perm_getter(user)}
 
+    @property
+    def perm_param_name(self):
+        return 'perm_filter_{}'.format(self._perm_field)
 
+    def apply_perm_filter(self, query, user, model):
+        predicate, params = self.get_perm_predicate(user, model)
+        return query.filter(predicate).params(**params)
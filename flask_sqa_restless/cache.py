@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import threading
+import time
+
+import six
+from flask import _request_ctx_stack
+
+
+class RequestLookupCache(object):
+    """
+    Request scoped identity cache for single object lookups.
+
+    Entries are keyed by ``(model, session, identifier filters, query
+    criteria)`` so that two lookups for the same identifier through queries
+    with different restrictions (e.g. a parent filter) never share a result.
+    The cache lives on the request context and hence is discarded at the end
+    of the request, even when an outer application context, whose ``flask.g``
+    outlives requests, is pushed. Writes must call :meth:`invalidate` for the
+    affected model.
+    """
+
+    ATTRIBUTE = '_sqa_restless_lookup_cache'
+
+    def __init__(self):
+        self._entries = {}
+
+    @classmethod
+    def activate(cls):
+        """
+        Installs a cache for the current request, if not already installed,
+        and returns it. Returns ``None`` outside of requests.
+        """
+        ctx = _request_ctx_stack.top
+        if ctx is None:
+            return None
+
+        cache = getattr(ctx, cls.ATTRIBUTE, None)
+        if cache is None:
+            cache = cls()
+            setattr(ctx, cls.ATTRIBUTE, cache)
+        return cache
+
+    @classmethod
+    def current(cls):
+        """
+        Returns the cache installed for the current request or ``None``
+        """
+        ctx = _request_ctx_stack.top
+        if ctx is None:
+            return None
+        return getattr(ctx, cls.ATTRIBUTE, None)
+
+    @staticmethod
+    def make_key(query, filters):
+        mapper = query._mapper_zero()
+        if mapper is None:
+            return None
+
+        compiled = query.statement.compile()
+        criteria = (six.text_type(compiled), repr(sorted(compiled.params.items())))
+        return (mapper.class_, id(query.session),
+                repr(sorted(filters.items())), criteria)
+
+    def get_or_load(self, query, filters, loader):
+        """
+        Returns the cached result for ``filters`` applied on ``query``,
+        calling ``loader`` to fetch and remember it on a miss
+        """
+        key = self.make_key(query, filters)
+        if key is None:
+            return loader()
+
+        if key in self._entries:
+            return self._entries[key]
+
+        obj = loader()
+        self._entries[key] = obj
+        return obj
+
+    def invalidate(self, model=None):
+        """
+        Drops the cached entries of ``model`` or all entries if no model is
+        provided
+        """
+        if model is None:
+            self._entries.clear()
+            return
+
+        stale = [key for key in self._entries
+                 if issubclass(key[0], model) or issubclass(model, key[0])]
+        for key in stale:
+            del self._entries[key]
+
+
+class TTLCache(object):
+    """
+    Thread safe mapping whose entries expire ``ttl`` seconds after being
+    set. Once ``maxsize`` entries are held, expired entries are purged and,
+    if still full, the entries closest to expiry are evicted.
+    """
+
+    def __init__(self, ttl=60, maxsize=10000, timer=time.time):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.timer = timer
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expires_at = entry
+            if expires_at <= self.timer():
+                del self._entries[key]
+                return default
+
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            now = self.timer()
+            if key not in self._entries and \
+                    len(self._entries) >= self.maxsize:
+                self._evict(now)
+            self._entries[key] = (value, now + ttl)
+
+    def _evict(self, now):
+        expired = [key for key, (_, expires_at) in six.iteritems(self._entries)
+                   if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+        overflow = len(self._entries) - self.maxsize + 1
+        if overflow > 0:
+            by_expiry = sorted(six.iteritems(self._entries),
+                               key=lambda item: item[1][1])
+            for key, _ in by_expiry[:overflow]:
+                del self._entries[key]
+
+    def invalidate(self, predicate):
+        """
+        Drops the entries whose key satisfies ``predicate``
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Cursors and delete tracking for the ``changes/`` API of resources.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import base64
+import datetime
+import decimal
+import uuid
+
+import sqlalchemy as sa
+from marshmallow import utils
+from restless.utils import json, MoreTypesJSONEncoder
+from sqlalchemy import event, orm
+
+
+def encode_cursor(values, json_encoder=MoreTypesJSONEncoder):
+    """
+    Encodes the list ``values`` into an opaque, URL safe cursor
+    """
+    text = json.dumps(values, cls=json_encoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode(
+        'ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns the list of values of a cursor made by :func:`encode_cursor`.
+    Raises ``ValueError`` or ``TypeError`` for malformed cursors.
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(
+        padded.encode('ascii')).decode('utf-8'))
+
+
+def parse_value(column, value):
+    """
+    Turns the JSON ``value`` of a cursor back into the Python type of
+    ``column``
+    """
+    if value is None:
+        return None
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    if python_type is datetime.datetime:
+        return _parse_datetime(value)
+    elif python_type is datetime.date:
+        return utils.from_iso_date(value)
+    elif python_type is datetime.time:
+        return utils.from_iso_time(value)
+    elif python_type is decimal.Decimal:
+        return decimal.Decimal(value)
+    elif python_type is uuid.UUID:
+        return uuid.UUID(value)
+
+    return value
+
+
+def _parse_datetime(value):
+    # Naive timestamps are parsed here as marshmallow, without dateutil,
+    # drops their microseconds
+    for format_ in ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            return datetime.datetime.strptime(value, format_)
+        except ValueError:
+            pass
+
+    return utils.from_iso(value)
+
+
+class TombstoneTracker(object):
+    """
+    Records the primary keys of the deleted objects of the tracked models
+    in the table ``table_name`` of ``metadata``, within the transaction of
+    the delete. Set it as the ``tombstone_tracker`` of resources to report
+    deletes in their ``changes/`` API.
+
+    Objects deleted through the session are always recorded, bulk
+    ``Query.delete`` only with ``synchronize_session='fetch'``, the other
+    strategies not knowing the deleted rows. Tombstones are not restricted
+    to the filters of the requests reading them, and clients that last
+    synced before tombstones get purged must sync again in full.
+
+    Usage::
+
+        tombstones = TombstoneTracker(db.metadata)
+        tombstones.track(Article)
+
+        class ArticleResource(FlaskSQAResource):
+            changes_cursor_field = 'updated_at'
+            tombstone_tracker = tombstones
+    """
+
+    def __init__(self, metadata, table_name='tombstones'):
+        self.table = sa.Table(
+            table_name, metadata,
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('model', sa.String(255), nullable=False),
+            sa.Column('identifier', sa.Text, nullable=False),
+            sa.Column('deleted_at', sa.DateTime, nullable=False,
+                      default=datetime.datetime.utcnow),
+            sa.Index('ix_{}_model_id'.format(table_name), 'model', 'id'))
+
+        self.models = set()
+        event.listen(orm.Session, 'after_bulk_delete', self._after_bulk_delete)
+
+    def track(self, model):
+        mapper = orm.class_mapper(model)
+        if len(mapper.primary_key) != 1:
+            raise ValueError('Only models with a single primary key column '
+                             'can be tracked')
+
+        self.models.add(mapper.class_)
+        event.listen(mapper.class_, 'after_delete', self._after_delete,
+                     propagate=True)
+
+    def model_name(self, model):
+        return orm.class_mapper(model).local_table.name
+
+    def _tombstone(self, model, identifier):
+        return {
+            'model': self.model_name(model),
+            'identifier': json.dumps(identifier, cls=MoreTypesJSONEncoder),
+        }
+
+    def _tracked_model(self, mapper):
+        for cls in mapper.class_.__mro__:
+            if cls in self.models:
+                return cls
+        return None
+
+    def _after_delete(self, mapper, connection, target):
+        model = self._tracked_model(mapper)
+        identifier = mapper.primary_key_from_instance(target)[0]
+        connection.execute(self.table.insert(),
+                           self._tombstone(model, identifier))
+
+    def _after_bulk_delete(self, delete_context):
+        mapper = delete_context.mapper
+        model = self._tracked_model(mapper)
+        rows = getattr(delete_context, 'matched_rows', None)
+        if model is None or not rows:
+            return
+
+        connection = delete_context.session.connection(mapper=mapper)
+        connection.execute(self.table.insert(),
+                           [self._tombstone(model, row[0]) for row in rows])
+
+    def deleted_since(self, session, model, last_id=None, limit=None):
+        """
+        Returns the ``(tombstone id, primary key)`` of the objects of
+        ``model`` deleted after the tombstone ``last_id``, oldest first
+        """
+        query = sa.select([self.table.c.id, self.table.c.identifier]).where(
+            self.table.c.model == self.model_name(model))
+        if last_id is not None:
+            query = query.where(self.table.c.id > last_id)
+        query = query.order_by(self.table.c.id).limit(limit)
+
+        return [(row.id, json.loads(row.identifier))
+                for row in session.execute(query)]
+
+    def last_id(self, session):
+        return session.execute(
+            sa.select([sa.func.max(self.table.c.id)])).scalar()
+
+    def purge(self, session, before):
+        """
+        Deletes the tombstones recorded before the datetime ``before``
+        """
+        session.execute(self.table.delete().where(
+            self.table.c.deleted_at < before))
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Content codings of response bodies, negotiated by resources from the
+``Accept-Encoding`` header of requests.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import gzip
+import hashlib
+import io
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class Codec(object):
+    """
+    Content coding named ``name`` in the ``Content-Encoding`` header,
+    compressing at ``default_level`` unless told otherwise
+    """
+
+    name = None
+    default_level = None
+
+    @property
+    def available(self):
+        return True
+
+    def compress(self, body, level=None):
+        raise NotImplementedError
+
+
+class GzipCodec(Codec):
+
+    name = 'gzip'
+    default_level = 6
+
+    def compress(self, body, level=None):
+        if level is None:
+            level = self.default_level
+
+        buf = io.BytesIO()
+        # A constant modification time keeps the output of identical bodies
+        # identical
+        with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0,
+                           compresslevel=level) as file_:
+            file_.write(body)
+        return buf.getvalue()
+
+
+class BrotliCodec(Codec):
+    """
+    Brotli, available when the ``brotli`` package is installed
+    """
+
+    name = 'br'
+    default_level = 5
+
+    @property
+    def available(self):
+        return brotli is not None
+
+    def compress(self, body, level=None):
+        quality = self.default_level if level is None else level
+        return brotli.compress(body, quality=quality)
+
+
+class ZstdCodec(Codec):
+    """
+    Zstandard, available when the ``zstandard`` package is installed
+    """
+
+    name = 'zstd'
+    default_level = 3
+
+    @property
+    def available(self):
+        return zstandard is not None
+
+    def compress(self, body, level=None):
+        level = self.default_level if level is None else level
+        compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.compress(body)
+
+
+GZIP = GzipCodec()
+BROTLI = BrotliCodec()
+ZSTD = ZstdCodec()
+
+
+def negotiate_codec(accept_encodings, codecs):
+    """
+    Returns the available codec of ``codecs`` best matching the accepted
+    encodings, preferring the earlier ones on equal quality, or ``None``
+    """
+    available = [codec for codec in codecs if codec.available]
+    best = accept_encodings.best_match([codec.name for codec in available])
+    for codec in available:
+        if codec.name == best:
+            return codec
+    return None
+
+
+def compress(body, codec, level=None, cache=None):
+    """
+    Compresses ``body`` with ``codec``. With a ``cache``, e.g. a
+    ``cache.TTLCache``, the compressed bodies are remembered by their digest
+    so that identical responses are compressed only once.
+    """
+    if cache is None:
+        return codec.compress(body, level)
+
+    key = (codec.name, level, hashlib.sha1(body).hexdigest())
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = codec.compress(body, level)
+        cache.set(key, compressed)
+    return compressed
@@ -13,7 +13,9 @@ from sqlalchemy.orm import joinedload, joinedload_all, Query
 from sqlalchemy.util import to_list
 from sqlalchemy.sql import operators, extract
 
+from .cache import RequestLookupCache
 from .exceptions import NotFound
+from .search import TextSearch
 
 class DjangoQueryMixin(object):
     """Can be mixed into any Query class of SQLAlchemy and extends it to
@@ -46,6 +48,7 @@ class DjangoQueryMixin(object):
         'iregex': lambda c, x: c.op('~*', is_comparison=True)(x),
         'isnull': lambda c, x: c.is_(None) if x else c.isnot(None),
         'range': lambda c, x: operators.between_op(c, *x),
+        'search': lambda c, x: TextSearch([c], x),
         'year': lambda c, x: extract('year', c) == x,
         'month': lambda c, x: extract('month', c) == x,
         'day': lambda c, x: extract('day', c) == x
@@ -133,6 +136,14 @@ class DjangoQueryMixin(object):
 
 class DjangoQuery(DjangoQueryMixin, Query):
     def get_or_404(self, **kwargs):
+        cache = RequestLookupCache.current()
+        if cache is not None:
+            return cache.get_or_load(self, kwargs,
+                                     lambda: self._get_or_404(**kwargs))
+
+        return self._get_or_404(**kwargs)
+
+    def _get_or_404(self, **kwargs):
         try:
             return self.filter_by(**kwargs).one()
         except NoResultFound:
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Bus of the committed changes of models, feeding the ``stream/`` Server-Sent
+Events API of resources.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import operator
+import re
+import threading
+from collections import namedtuple
+
+import six
+from six.moves import queue
+from sqlalchemy import event as sa_event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import orm
+
+from . import changes
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+Event = namedtuple('Event', ['type', 'model', 'identifier', 'values'])
+
+SESSION_INFO_KEY = '_sqa_restless_events'
+
+
+class Broker(object):
+    """
+    Transport of the events between the buses of a deployment's processes.
+    ``publish`` must deliver events to the callbacks registered with
+    ``subscribe`` in every process, this one included, e.g. over Redis
+    pub/sub, and preserve the types of their values.
+    """
+
+    def publish(self, event):
+        raise NotImplementedError
+
+    def subscribe(self, callback):
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """
+    Delivers the events to the callbacks of this process only
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def publish(self, event):
+        for callback in self.callbacks:
+            callback(event)
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+
+class Subscription(object):
+    """
+    Queue of the events of a model for one subscriber. Once ``maxsize``
+    events are pending, further events are dropped and ``overflowed`` is
+    set, the subscriber being too slow to keep up.
+    """
+
+    def __init__(self, bus, model_name, maxsize):
+        self.bus = bus
+        self.model_name = model_name
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Returns the next event, or ``None`` after ``timeout`` seconds
+        without any
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus(object):
+    """
+    Publishes the objects of the tracked models created, updated and
+    deleted through the sessions of ``session``, a session, session class
+    or ``scoped_session`` (every session by default), once their
+    transaction commits. Objects written in a savepoint that is rolled back
+    are not published. Bulk ``Query.update`` and ``Query.delete`` are not
+    seen.
+
+    Usage::
+
+        bus = EventBus()
+        bus.track(Article)
+
+        class ArticleResource(FlaskSQAResource):
+            event_bus = bus
+    """
+
+    def __init__(self, broker=None, session=orm.Session, max_pending=1000):
+        self.broker = broker or LocalBroker()
+        self.max_pending = max_pending
+        # Every bus keeps its pending events apart, buses tracking the same
+        # sessions would otherwise publish each other's
+        self._info_key = (SESSION_INFO_KEY, id(self))
+        self.models = set()
+        self.subscriptions = {}
+        self._lock = threading.Lock()
+
+        self.broker.subscribe(self.dispatch)
+        sa_event.listen(session, 'after_flush', self._after_flush)
+        sa_event.listen(session, 'after_commit', self._after_commit)
+        sa_event.listen(session, 'after_transaction_end',
+                        self._after_transaction_end)
+
+    def track(self, model):
+        mapper = orm.class_mapper(model)
+        if len(mapper.primary_key) != 1:
+            raise ValueError('Only models with a single primary key column '
+                             'can be tracked')
+        self.models.add(mapper.class_)
+
+    def model_name(self, model):
+        return orm.class_mapper(model).local_table.name
+
+    def subscribe(self, model):
+        subscription = Subscription(self, self.model_name(model),
+                                    self.max_pending)
+        with self._lock:
+            self.subscriptions.setdefault(subscription.model_name,
+                                          set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscriptions.get(subscription.model_name,
+                                   set()).discard(subscription)
+
+    def publish(self, event):
+        self.broker.publish(event)
+
+    def dispatch(self, event):
+        """
+        Queues ``event``, as delivered by the broker, for the subscribers of
+        its model
+        """
+        with self._lock:
+            subscriptions = list(self.subscriptions.get(event.model, ()))
+
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def _tracked_model(self, obj):
+        for cls in type(obj).__mro__:
+            if cls in self.models:
+                return cls
+        return None
+
+    def _make_event(self, type_, obj):
+        model = self._tracked_model(obj)
+        if model is None:
+            return None
+
+        state = sa_inspect(obj)
+        values = dict((prop.key, state.dict.get(prop.key))
+                      for prop in state.mapper.column_attrs)
+        identifier = state.mapper.primary_key_from_instance(obj)[0]
+        return Event(type_, self.model_name(model), identifier, values)
+
+    def _after_flush(self, session, flush_context):
+        events = [self._make_event(CREATED, obj) for obj in session.new]
+        events.extend(self._make_event(UPDATED, obj) for obj in session.dirty
+                      if session.is_modified(obj))
+        events.extend(self._make_event(DELETED, obj)
+                      for obj in session.deleted)
+
+        events = [event for event in events if event is not None]
+        if events:
+            pending = session.info.setdefault(self._info_key, {})
+            pending.setdefault(_boundary(session.transaction),
+                               []).extend(events)
+
+    def _after_commit(self, session):
+        pending = session.info.get(self._info_key)
+        transaction = session.transaction
+        if not pending or transaction not in pending:
+            return
+
+        events = pending.pop(transaction)
+        if transaction.nested:
+            # Released savepoints hand their events over to the enclosing
+            # transaction
+            pending.setdefault(_boundary(transaction.parent),
+                               []).extend(events)
+            return
+
+        for event in events:
+            self.publish(event)
+
+    def _after_transaction_end(self, session, transaction):
+        # Events of the transactions ended without a commit are dropped
+        pending = session.info.get(self._info_key)
+        if pending:
+            pending.pop(transaction, None)
+
+
+def _boundary(transaction):
+    """
+    Returns the transaction actually committing or rolling back the changes
+    of ``transaction``: itself, its enclosing savepoint or the outermost one
+    """
+    while transaction.parent is not None and not transaction.nested:
+        transaction = transaction.parent
+    return transaction
+
+
+def _text(operation):
+    def condition(actual, expected):
+        return isinstance(actual, six.string_types) and \
+            operation(actual, expected)
+    return condition
+
+
+def _date_part(name):
+    def condition(actual, expected):
+        return getattr(actual, name, None) == int(expected)
+    return condition
+
+
+def _defined(operation):
+    def condition(actual, expected):
+        return actual is not None and operation(actual, expected)
+    return condition
+
+
+# Python counterparts of ``DjangoQuery.OPERATORS``, on the values of events
+CONDITIONS = {
+    'exact': operator.eq,
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': _defined(operator.gt),
+    'lt': _defined(operator.lt),
+    'gte': _defined(operator.ge),
+    'lte': _defined(operator.le),
+    'in': lambda actual, expected: actual in expected,
+    'notin': lambda actual, expected: actual not in expected,
+    'range': _defined(lambda actual, expected:
+                      expected[0] <= actual <= expected[1]),
+    'isnull': lambda actual, expected: (actual is None) == bool(expected),
+    'contains': _text(lambda actual, expected: expected in actual),
+    'icontains': _text(lambda actual, expected:
+                       expected.lower() in actual.lower()),
+    'iexact': _text(lambda actual, expected:
+                    actual.lower() == expected.lower()),
+    'startswith': _text(lambda actual, expected: actual.startswith(expected)),
+    'istartswith': _text(lambda actual, expected:
+                         actual.lower().startswith(expected.lower())),
+    'endswith': _text(lambda actual, expected: actual.endswith(expected)),
+    'iendswith': _text(lambda actual, expected:
+                       actual.lower().endswith(expected.lower())),
+    'regex': _text(lambda actual, expected:
+                   re.search(expected, actual) is not None),
+    'iregex': _text(lambda actual, expected:
+                    re.search(expected, actual, re.I) is not None),
+    'year': _date_part('year'),
+    'month': _date_part('month'),
+    'day': _date_part('day'),
+}
+
+# Operators comparing the value of the column itself
+TYPED_CONDITIONS = frozenset(['exact', 'eq', 'ne', 'gt', 'lt', 'gte', 'lte',
+                              'in', 'notin', 'range'])
+
+
+def make_condition(column, attribute, operator_name, value):
+    """
+    Returns a function telling whether the ``values`` of an event meet the
+    filter ``operator_name`` on ``attribute``, whose ``column`` gives the
+    type ``value`` is converted to. Raises ``ValueError`` for unsupported
+    operators and unconvertible values.
+    """
+    if operator_name not in CONDITIONS:
+        raise ValueError('Unsupported operator {!r}'.format(operator_name))
+
+    if operator_name in TYPED_CONDITIONS:
+        value = coerce_value(column, value)
+
+    condition = CONDITIONS[operator_name]
+
+    def matches(values):
+        return condition(values.get(attribute), value)
+
+    return matches
+
+
+def coerce_value(column, value):
+    """
+    Converts the query string ``value`` to the Python type of ``column``
+    """
+    if isinstance(value, (list, tuple)):
+        return [coerce_value(column, item) for item in value]
+
+    if not isinstance(value, six.string_types):
+        return value
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    if python_type is bool:
+        return value.lower() in ('true', '1')
+    elif python_type in six.integer_types or python_type is float:
+        return python_type(value)
+
+    return changes.parse_value(column, value)
@@ -74,6 +74,11 @@ class Gone(HTTPException):
     description = 'Request URL is no longer available'
 
 
+class UnsupportedMediaType(HTTPException):
+    code = 415
+    description = 'The media type of the request body is not supported'
+
+
 class ServerError(HTTPException):
     code = 500
     description = 'Server Error. Something went wrong'
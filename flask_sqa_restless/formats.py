@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Wire formats of the request and response bodies, negotiated by resources
+from the ``Accept`` and ``Content-Type`` headers of requests.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import six
+from restless.utils import json
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+class Format(object):
+    """
+    Encoding of the plain data of bodies. ``content_types`` lists the media
+    types of the format, the first one being sent in responses.
+    """
+
+    name = None
+    content_types = ()
+
+    # Whether the bodies are encoded by the format rather than by the JSON
+    # serializer of the resource
+    binary = True
+
+    @property
+    def content_type(self):
+        return self.content_types[0]
+
+    @property
+    def available(self):
+        return True
+
+    def dumps(self, data, json_encoder):
+        """
+        Encodes ``data``. Values the format has no type for are converted by
+        the ``default`` of ``json_encoder``, as in JSON bodies.
+        """
+        raise NotImplementedError
+
+    def loads(self, body):
+        raise NotImplementedError
+
+
+class JSONFormat(Format):
+
+    name = 'json'
+    content_types = ('application/json',)
+    binary = False
+
+    def dumps(self, data, json_encoder):
+        return json.dumps(data, cls=json_encoder)
+
+    def loads(self, body):
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        return json.loads(body)
+
+
+class MsgPackFormat(Format):
+    """
+    MessagePack, available when the ``msgpack`` package is installed
+    """
+
+    name = 'msgpack'
+    content_types = ('application/msgpack', 'application/x-msgpack')
+
+    @property
+    def available(self):
+        return msgpack is not None
+
+    def dumps(self, data, json_encoder):
+        encoder = json_encoder()
+        # The bin type would turn the native strings of Python 2 into bytes
+        return msgpack.packb(data, default=encoder.default,
+                             use_bin_type=six.PY3)
+
+    def loads(self, body):
+        return msgpack.unpackb(body, raw=False)
+
+
+class CBORFormat(Format):
+    """
+    CBOR, available when the ``cbor2`` package is installed
+    """
+
+    name = 'cbor'
+    content_types = ('application/cbor',)
+
+    @property
+    def available(self):
+        return cbor2 is not None
+
+    def dumps(self, data, json_encoder):
+        converter = json_encoder()
+        return cbor2.dumps(data, default=lambda encoder, value:
+                           encoder.encode(converter.default(value)))
+
+    def loads(self, body):
+        return cbor2.loads(body)
+
+
+JSON = JSONFormat()
+MSGPACK = MsgPackFormat()
+CBOR = CBORFormat()
+
+
+def get_format(content_type, formats):
+    """
+    Returns the format of ``formats`` with the media type ``content_type``,
+    or ``None``
+    """
+    for format_ in formats:
+        if content_type in format_.content_types:
+            return format_
+    return None
+
+
+def negotiate_format(accept_mimetypes, formats):
+    """
+    Returns the available format of ``formats`` best matching the accepted
+    media types, the first available format when none matches
+    """
+    available = [format_ for format_ in formats if format_.available]
+    best = accept_mimetypes.best_match(
+        [content_type for format_ in available
+         for content_type in format_.content_types])
+    return get_format(best, available) or available[0]
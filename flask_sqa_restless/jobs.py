@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import copy
+import datetime
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+import sqlalchemy as sa
+from restless.utils import MoreTypesJSONEncoder
+
+
+class Job(object):
+    """
+    State of a background bulk operation. ``success`` and ``errors`` are
+    keyed by the index of the record in the payload, in the same format as
+    the synchronous ``bulk_insert`` response.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, resource, total):
+        self.id = uuid.uuid4().hex
+        self.resource = resource
+        self.status = self.PENDING
+        self.total = total
+        self.processed = 0
+        self.success = OrderedDict()
+        self.errors = OrderedDict()
+        self.error = None
+        self.created_at = datetime.datetime.utcnow()
+        self.updated_at = self.created_at
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'resource': self.resource,
+            'status': self.status,
+            'total': self.total,
+            'processed': self.processed,
+            'success': self.success,
+            'errors': self.errors,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+class JobStore(object):
+    """
+    Protocol of the stores keeping the state of background jobs
+    """
+
+    def save(self, job):
+        """
+        Creates or updates the stored state of ``job``
+        """
+        raise NotImplementedError()
+
+    def get(self, job_id):
+        """
+        Returns the state of the job as a dictionary or ``None`` if there is
+        no such job
+        """
+        raise NotImplementedError()
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Keeps job states in the memory of the current process. Jobs are only
+    visible to the process running them.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def save(self, job):
+        job.updated_at = datetime.datetime.utcnow()
+        state = copy.deepcopy(job.to_dict())
+        with self._lock:
+            self._jobs[job.id] = state
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+class SQLAlchemyJobStore(JobStore):
+    """
+    Keeps job states in a database table, so that all the processes of a
+    deployment can report them. Call :meth:`create_table` to create the
+    table if needed.
+    """
+
+    def __init__(self, engine, table_name='bulk_jobs', metadata=None):
+        self.engine = engine
+        self.table = sa.Table(
+            table_name, metadata or sa.MetaData(),
+            sa.Column('id', sa.String(32), primary_key=True),
+            sa.Column('resource', sa.String(255), nullable=False),
+            sa.Column('status', sa.String(16), nullable=False),
+            sa.Column('total', sa.Integer),
+            sa.Column('processed', sa.Integer, nullable=False),
+            sa.Column('result', sa.Text),
+            sa.Column('error', sa.Text),
+            sa.Column('created_at', sa.DateTime, nullable=False),
+            sa.Column('updated_at', sa.DateTime, nullable=False)
+        )
+
+    def create_table(self):
+        self.table.create(self.engine, checkfirst=True)
+
+    def save(self, job):
+        job.updated_at = datetime.datetime.utcnow()
+        values = {
+            'resource': job.resource,
+            'status': job.status,
+            'total': job.total,
+            'processed': job.processed,
+            'result': json.dumps({'success': job.success,
+                                  'errors': job.errors},
+                                 cls=MoreTypesJSONEncoder),
+            'error': job.error,
+            'created_at': job.created_at,
+            'updated_at': job.updated_at
+        }
+
+        with self.engine.begin() as conn:
+            result = conn.execute(self.table.update().where(
+                self.table.c.id == job.id).values(**values))
+            if not result.rowcount:
+                conn.execute(self.table.insert().values(id=job.id, **values))
+
+    def get(self, job_id):
+        with self.engine.connect() as conn:
+            row = conn.execute(self.table.select().where(
+                self.table.c.id == job_id)).first()
+
+        if row is None:
+            return None
+
+        state = dict(row)
+        result = json.loads(state.pop('result') or '{}',
+                            object_pairs_hook=OrderedDict)
+        state['success'] = result.get('success', OrderedDict())
+        state['errors'] = result.get('errors', OrderedDict())
+        return state
+
+
+class JobRunner(object):
+    """
+    Runs jobs on a pool of ``workers`` threads, created on first use
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+
+        return self._pool.apply_async(func, args)
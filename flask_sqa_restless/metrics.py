@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import threading
+import time
+
+from sqlalchemy import event
+
+
+class PoolMetrics(object):
+    """
+    Collects the connection checkouts and checkins of the pool of
+    ``engine``.
+
+    Usage::
+
+        metrics = PoolMetrics(db.engine)
+
+        @app.route('/metrics/pool/')
+        def pool_metrics():
+            return jsonify(metrics.snapshot())
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.reset()
+
+        event.listen(engine.pool, 'connect', self._on_connect)
+        event.listen(engine.pool, 'checkout', self._on_checkout)
+        event.listen(engine.pool, 'checkin', self._on_checkin)
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.timed_checkins = 0
+            self.checkout_seconds = 0.0
+            self.max_checkout_seconds = 0.0
+
+    def remove(self):
+        event.remove(self.engine.pool, 'connect', self._on_connect)
+        event.remove(self.engine.pool, 'checkout', self._on_checkout)
+        event.remove(self.engine.pool, 'checkin', self._on_checkin)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record,
+                     connection_proxy):
+        connection_record.info['checked_out_at'] = time.time()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        with self._lock:
+            self.checkins += 1
+            if checked_out_at is None:
+                return
+
+            self.checked_out -= 1
+            self.timed_checkins += 1
+            held = time.time() - checked_out_at
+            self.checkout_seconds += held
+            self.max_checkout_seconds = max(self.max_checkout_seconds, held)
+
+    def snapshot(self):
+        """
+        Returns the counters as a dictionary, along with the size and
+        overflow of pools that have one
+        """
+        with self._lock:
+            data = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'avg_checkout_seconds': (
+                    self.checkout_seconds / self.timed_checkins
+                    if self.timed_checkins else 0.0),
+                'max_checkout_seconds': self.max_checkout_seconds,
+            }
+
+        pool = self.engine.pool
+        for name in ('size', 'overflow'):
+            if hasattr(pool, name):
+                data['pool_' + name] = getattr(pool, name)()
+
+        return data
@@ -151,6 +151,12 @@ class SQLAlchemyPaginator(object):
         # memoize count
         count = self.count
 
+    def set_count(self, count):
+        """
+        Sets the total count for results not fetched through ``page``
+        """
+        self.__dict__['count'] = count
+
     def page(self, query):
         """
         Generates all pertinent data about the requested page.
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+Serialization of large result sets sharded across a pool of processes.
+
+Rows are handed to the workers as plain tuples of column values along with
+the keys and formatters of the columns, so that neither model instances nor
+schemas need to be pickled. Each worker encodes its chunk of rows to JSON and
+the chunks are joined in order.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import decimal
+import json
+import multiprocessing
+import threading
+
+import six
+from marshmallow import utils as ma_utils
+
+from . import util
+
+_pools = {}
+
+_pools_lock = threading.Lock()
+
+
+def get_pool(workers=None):
+    """
+    Returns the process pool of ``workers`` processes, creating it on first
+    use. Forking is safest before the application starts serving requests,
+    so call it at startup for the worker counts in use.
+    """
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = multiprocessing.Pool(workers)
+
+        return _pools[workers]
+
+
+def format_value(formatter, value):
+    """
+    Formats ``value`` the way the marshmallow field described by
+    ``formatter`` would serialize it
+    """
+    if value is None or formatter is None:
+        return value
+
+    name, arg = formatter
+    if name == 'datetime':
+        return ma_utils.isoformat(value)
+    elif name == 'text':
+        return six.text_type(value)
+    elif name == 'decimal':
+        value = decimal.Decimal(str(value))
+        if arg is not None and value.is_finite():
+            value = value.quantize(decimal.Decimal((0, (1,), -arg)))
+        return value
+
+    raise ValueError('Unknown formatter {!r}'.format(name))
+
+
+def _encode_chunk(args):
+    keys, formatters, rows, json_encoder = args
+    encoder = json_encoder()
+    items = []
+    for row in rows:
+        obj = {}
+        for key, formatter, value in zip(keys, formatters, row):
+            obj[key] = format_value(formatter, value)
+        items.append(encoder.encode(obj))
+
+    return u','.join(items)
+
+
+def encode_rows(keys, formatters, rows, json_encoder, workers=None):
+    """
+    Encodes ``rows`` to a JSON array of objects, sharding the work across
+    the process pool
+    :param list keys: Object key of every column
+    :param list formatters: Formatter of every column, see :func:`format_value`
+    :param list rows: Tuples of column values
+    :param json_encoder: JSON encoder class, must be importable by the workers
+    :param int workers: Size of the process pool, defaults to the CPU count
+    :return: JSON text of the array
+    """
+    processes = workers or multiprocessing.cpu_count()
+    chunk_size = max(1, -(-len(rows) // (processes * 4)))
+    tasks = [(keys, formatters, chunk, json_encoder)
+             for chunk in util.chunked(rows, chunk_size)]
+
+    chunks = get_pool(workers).map(_encode_chunk, tasks)
+    return u'[' + u','.join(chunk for chunk in chunks if chunk) + u']'
@@ -8,28 +8,99 @@ https://github.com/django-tastypie/django-tastypie/blob/master/tastypie/resource
 from __future__ import absolute_import, division, print_function
 
 import copy
+import itertools
+import logging
 import sys
+import time
 from collections import OrderedDict
 
 import six
-from flask import make_response, request
+from flask import (Response, current_app, has_request_context, make_response,
+                   request)
 from restless.constants import *
 from restless.fl import FlaskResource as BaseFlaskResource
-from restless.utils import format_traceback
+from restless.utils import format_traceback, json
 from six import wraps
+import sqlalchemy as sa
 from sqlalchemy import orm
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import NoResultFound
 
-from . import djquery
+from . import (changes, compression, djquery, events, parallel, sharding,
+               streaming)
 from .authentication import Authentication
+from .cache import RequestLookupCache
 from .djquery import DjangoQuery
 from .exceptions import *
+from .formats import CBOR, JSON, MSGPACK, get_format, negotiate_format
+from .jobs import InMemoryJobStore, Job, JobRunner
 from .paginator import SQLAlchemyPaginator
+from .search import TextSearch, TextSearchRank
+from .serializer import Columnar, RawJSON
 from .util import get_model_relationship_names, Final
 
+logger = logging.getLogger(__name__)
+
 ALLOWED_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']
 
+JOB_STATUS_API = {
+    'url': 'jobs/<job_id>/',
+    'name': 'job_status',
+    'methods': ['GET']
+}
+
+COLUMNAR_CONTENT_TYPE = 'application/vnd.columnar+json'
+
+AGGREGATE_API = {
+    'url': 'aggregate/',
+    'name': 'aggregate',
+    'methods': ['GET']
+}
+
+CHANGES_API = {
+    'url': 'changes/',
+    'name': 'changes',
+    'methods': ['GET']
+}
+
+STREAM_API = {
+    'url': 'stream/',
+    'name': 'stream',
+    'methods': ['GET']
+}
+
+EVENT_STREAM_CONTENT_TYPE = 'text/event-stream'
+
+AGGREGATE_FUNCTIONS = OrderedDict([
+    ('count', sa.func.count),
+    ('sum', sa.func.sum),
+    ('avg', sa.func.avg),
+    ('min', sa.func.min),
+    ('max', sa.func.max),
+])
+
+
+# Key of ``Session.info`` flagging a transaction that wrote to the database,
+# see ``FlaskSQAResource.release_connection``
+TRANSACTION_WRITES_KEY = '_sqa_restless_writes'
+
+
+@sa.event.listens_for(orm.Session, 'after_flush')
+def _flag_flush(session, flush_context):
+    session.info[TRANSACTION_WRITES_KEY] = True
+
+
+@sa.event.listens_for(orm.Session, 'after_bulk_update')
+@sa.event.listens_for(orm.Session, 'after_bulk_delete')
+def _flag_bulk_write(context):
+    context.session.info[TRANSACTION_WRITES_KEY] = True
+
+
+@sa.event.listens_for(orm.Session, 'after_transaction_end')
+def _clear_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(TRANSACTION_WRITES_KEY, None)
+
 
 def db_http_wrapper(func):
     @wraps(func)
@@ -59,8 +130,11 @@ def with_session(func):
             else:
                 raise
 
+            # Roll back whatever the failed operation left behind, a
+            # session still in a transaction would otherwise hold on to its
+            # connection until the end of the request
             session = resource.session
-            if session and not session.is_active:
+            if session:
                 session.rollback()
 
             raise
@@ -141,9 +215,15 @@ class FlaskResource(BaseFlaskResource):
 
     def __init__(self, *args, **kwargs):
         self.custom_api = kwargs.pop('custom_api', None)
+        dispatch_table = kwargs.pop('dispatch_table', None)
         BaseFlaskResource.__init__(self, *args, **kwargs)
 
-        self.http_methods = copy.deepcopy(self.__class__.http_methods)
+        # A precomputed dispatch table is shared between requests and must
+        # never be mutated in place
+        if dispatch_table is not None:
+            self.http_methods = dispatch_table
+        else:
+            self.http_methods = copy.deepcopy(self.__class__.http_methods)
         self.status_map = copy.deepcopy(self.__class__.status_map)
         self.response_headers = copy.deepcopy(self.__class__.response_headers)
         if self.custom_api:
@@ -154,20 +234,43 @@ class FlaskResource(BaseFlaskResource):
         return cls.__name__.replace('Resource', '').lower()
 
     def add_custom_api(self):
-        self.http_methods[self.custom_api['name']] = {
-            method: self.custom_api['name']
-            for method in self.custom_api['methods']
-            }
+        if self.custom_api['name'] not in self.http_methods:
+            self.http_methods[self.custom_api['name']] = {
+                method: self.custom_api['name']
+                for method in self.custom_api['methods']
+                }
 
         if self.custom_api.get('status_code'):
             self.status_map[self.custom_api['name']] = \
                 self.custom_api['status_code']
 
     def update_http_methods(self, view, accepted_methods):
-        methods = dict(self.http_methods[view])
-        for method in methods:
-            if method not in accepted_methods:
-                del self.http_methods[view][method]
+        self.http_methods = dict(self.http_methods)
+        self.http_methods[view] = {
+            method: view_method
+            for method, view_method in self.http_methods[view].items()
+            if method in accepted_methods
+            }
+
+    @classmethod
+    def build_dispatch_table(cls, view_type, accepted_methods,
+                             custom_api=None):
+        """
+        Computes once, at registration time, the ``http_methods`` a view
+        instance would otherwise rebuild on every request
+        """
+        http_methods = copy.deepcopy(cls.http_methods)
+        if custom_api:
+            http_methods[custom_api['name']] = {
+                method: custom_api['name'] for method in custom_api['methods']
+                }
+
+        http_methods[view_type] = {
+            method: view_method
+            for method, view_method in http_methods[view_type].items()
+            if method in accepted_methods
+            }
+        return http_methods
 
     def request_method(self):
         if 'X-HTTP-Method-Override' in self.request.headers:
@@ -193,9 +296,17 @@ class FlaskResource(BaseFlaskResource):
         raise MethodNotImplemented()
 
     @classmethod
-    def add_url_rules(cls, app, rule_prefix, endpoint_prefix=None):
+    def add_url_rules(cls, app, rule_prefix, endpoint_prefix=None,
+                      lazy=False):
         cls._add_url_rules(app, rule_prefix, endpoint_prefix)
 
+    @classmethod
+    def warmup(cls):
+        """
+        Performs the setup otherwise deferred until the first request
+        """
+        pass
+
     @classmethod
     def _add_url_rules(cls, app, rule_prefix, endpoint_prefix=None):
         if cls.list_allowed:
@@ -232,20 +343,21 @@ class FlaskResource(BaseFlaskResource):
 
     @classmethod
     def as_view(cls, view_type, *init_args, **init_kwargs):
+        if 'custom_api' in init_kwargs:
+            accepted_methods = init_kwargs['custom_api']['methods']
+        else:
+            accepted_methods = cls.list_allowed if view_type == 'list' \
+                else cls.detail_allowed
+
+        init_kwargs['dispatch_table'] = cls.build_dispatch_table(
+            view_type, accepted_methods, init_kwargs.get('custom_api'))
+
         def _wrapper(*args, **kwargs):
             # Make a new instance so that no state potentially leaks between
             # instances.
             inst = cls(*init_args, **init_kwargs)
             inst.request = request
 
-            if 'custom_api' in init_kwargs:
-                accepted_methods = init_kwargs['custom_api']['methods']
-            else:
-                accepted_methods = inst.list_allowed if view_type == 'list' \
-                    else inst.detail_allowed
-
-            inst.update_http_methods(view_type, accepted_methods)
-
             return inst.handle(view_type, *args, **kwargs)
 
         return _wrapper
@@ -256,6 +368,16 @@ class FlaskSQAResource(FlaskResource):
 
     authentication = Authentication()
 
+    # ``Authorization`` policy enforced by ``check_authorization`` for the
+    # user returned by ``get_current_user``. Object filters it grants are
+    # added to the query as a SQL predicate
+    authorization = None
+
+    perm_filter_applied = False
+
+    # Object filter granted to the user of the request by ``authorization``
+    perm_filter = None
+
     paginator_cls = SQLAlchemyPaginator
 
     serializer_cls = None
@@ -264,6 +386,24 @@ class FlaskSQAResource(FlaskResource):
 
     allow_bulk_insert = False
 
+    # Parse the ``bulk_insert`` payload incrementally from the request stream
+    # (a JSON array or, with the ``application/x-ndjson`` content type, one
+    # JSON record per line) and save the records in chunks as they arrive.
+    # The chunks saved before a malformed part of the body stay saved, unless
+    # in ``unit_of_work`` mode, see ``_bulk_save_chunked``
+    bulk_insert_streaming = False
+
+    bulk_insert_chunk_size = 500
+
+    # Run ``bulk_insert`` as a background job: the request is answered with
+    # ``202 Accepted`` and the job id, and ``jobs/<job_id>/`` reports the
+    # progress and the per record results
+    bulk_insert_async = False
+
+    job_store = InMemoryJobStore()
+
+    job_runner = JobRunner()
+
     include_fields = []
 
     exclude_fields = []
@@ -278,6 +418,30 @@ class FlaskSQAResource(FlaskResource):
 
     custom_filtering = {}
 
+    """
+        Fields allowed in the ``aggregate/`` API and the aggregations allowed
+        on each of them, e.g. -
+        {
+            'status': ['group_by'],
+            'amount': ['sum', 'avg', 'min', 'max'],
+            'author_id': '*'
+        }
+    """
+    aggregation = {}
+
+    # Fields searched by the ``search`` query parameter, see
+    # ``search.TextSearch``. ``search_config`` is the PostgreSQL text search
+    # configuration and ``search_fts_table`` the SQLite FTS5 table
+    search_fields = []
+
+    search_config = None
+
+    search_fts_table = None
+
+    # Optional ``advisor.FilterUsageRecorder`` counting the filters and
+    # orderings requested
+    filter_usage_recorder = None
+
     """
         {
             'resource': '<resource class or full qualified name>',
@@ -292,17 +456,148 @@ class FlaskSQAResource(FlaskResource):
 
     session = None
 
+    # Optional ``routing.ReplicaRouter`` choosing the session of every
+    # request, in place of ``session``
+    session_router = None
+
+    # Optional ``sharding.ShardRouter`` choosing the shard session of every
+    # request. Takes precedence over ``session_router``
+    shard_router = None
+
+    FAN_OUT_VIEWS = ('list', 'count', 'detail', 'stream')
+
+    # Serve list pages as columns and rows on request, see
+    # ``is_columnar_request``
+    allow_columnar = True
+
+    columnar_response = False
+
+    # Whether the response depends on the ``Accept`` header of the request,
+    # which is then added to its ``Vary`` header
+    vary_on_accept = False
+
+    # Formats of the request and response bodies, picked by the
+    # ``Content-Type`` and ``Accept`` headers. The first available one is
+    # used for responses when the client accepts none of them
+    formats = (JSON, MSGPACK, CBOR)
+
+    # Column updated on every write of the model, e.g. an ``updated_at``
+    # timestamp or a version number, enabling the ``changes/`` API. See
+    # ``obj_get_changes``
+    changes_cursor_field = None
+
+    # ``changes.TombstoneTracker`` tracking the model, reporting deletes in
+    # the ``changes/`` API
+    tombstone_tracker = None
+
+    # ``events.EventBus`` publishing the committed changes of the model,
+    # enabling the ``stream/`` Server-Sent Events API
+    event_bus = None
+
+    # Seconds between the keepalive comments of idle event streams
+    stream_keepalive = 15
+
+    # Compress the response bodies of at least ``compression_min_size``
+    # bytes with the first of ``compression_codecs`` the client accepts
+    compress_responses = False
+
+    compression_codecs = (compression.BROTLI, compression.ZSTD,
+                          compression.GZIP)
+
+    compression_min_size = 1024
+
+    # Level of every codec, or a dictionary of levels by encoding name.
+    # ``None`` uses the default level of each codec
+    compression_level = None
+
+    # Cache of compressed bodies, e.g. ``TTLCache``, so that identical
+    # responses are compressed only once
+    compression_cache = None
+
+    # Render list pages to JSON in the database, on PostgreSQL and SQLite,
+    # when the serializer fields are plain column values
+    db_rendered_list = False
+
+    # Run every request in a single transaction: the ``obj_*`` helpers only
+    # flush, ``handle`` commits once the view succeeded, or rolls back when
+    # it failed, and bulk operations isolate every record in a savepoint
+    unit_of_work = False
+
+    # End the transaction, returning the connection to the pool, as soon as
+    # the view has fetched its data instead of after the serialization
+    release_connection_after_view = False
+
+    # Remove the scoped session at the end of every request, needed for
+    # scoped sessions not managed by Flask-SQLAlchemy
+    remove_session_after_request = False
+
+    # Serve repeated single object lookups within a request from a request
+    # scoped cache instead of issuing the same SQL again
+    use_lookup_cache = False
+
+    # Serialize list pages of at least ``parallel_serialization_threshold``
+    # objects on a pool of ``parallel_serialization_workers`` processes
+    # (defaults to the CPU count). Only applies to serializers whose fields
+    # all map to plain column values.
+    parallel_serialization = False
+
+    parallel_serialization_threshold = 1000
+
+    parallel_serialization_workers = None
+
+    # Nested queries only match rows whose parent exists and missing parents
+    # result in a 404
+    check_parent_exists = True
+
     response_headers = {
         'default': {}
     }
 
     def __init__(self, *args, **kwargs):
-        self._initialize_serializer()
         self.nested = kwargs.pop('nested', False)
         self.parent_relation = kwargs['parent'] if self.nested else None
+        if self.session_router is not None:
+            self.session = self.session_router.route(self._routing_method())
+        self.shard_sessions = None
+        if self.shard_router is not None:
+            # Until ``handle`` selects the shard of the request, once it is
+            # authenticated
+            self.session = list(self.shard_router.shards.values())[0]
+        self._initialize_serializer()
         FlaskResource.__init__(self, *args, **kwargs)
         self._init_query()
 
+    def _routing_method(self):
+        """
+        Returns the method the session is routed for, the one the request is
+        dispatched on
+        """
+        if not has_request_context():
+            return 'POST'
+
+        # Handed over by ``as_view`` only once the resource is built
+        self.request = request
+        return self.request_method()
+
+    def select_shard(self):
+        """
+        Switches the resource to the session of the shard of the request, or
+        to every shard if it can not be resolved
+        """
+        shard = self.shard_router.resolve(self)
+        if shard is None:
+            # Fan out to every shard, the first one serving as the session
+            # for everything but the fanned out queries
+            self.shard_sessions = list(self.shard_router.shards.values())
+            session = self.shard_sessions[0]
+        else:
+            session = self.shard_router.shards[shard]
+
+        if session is not self.session:
+            self.session = session
+            self.serializer.session = session
+            self._init_query()
+
     def _initialize_serializer(self):
         self.include_fields = copy.deepcopy(self.__class__.include_fields)
         self.exclude_fields = copy.deepcopy(self.__class__.exclude_fields)
@@ -311,7 +606,7 @@ class FlaskSQAResource(FlaskResource):
         self.exclude_fields_deserialize = copy.deepcopy(
             self.__class__.exclude_fields_deserialize)
 
-        self.serializer = self.serializer_cls(session=self.session)
+        self.serializer = self.get_serializer_cls()(session=self.session)
         if self.include_fields:
             self.serializer.include_fields_serialize(self.include_fields)
         elif self.exclude_fields:
@@ -328,19 +623,36 @@ class FlaskSQAResource(FlaskResource):
         mapper = orm.class_mapper(self.model)
         if mapper:
             self.query = self.QUERY_CLASS(mapper, session=self.session())
-            if self.parent_relation and self.parent_relation.filter:
-                self.query = self.query.filter_by(**self.parent_relation.filter)
+            if self.parent_relation:
+                self._apply_parent_relation()
         else:
             self.query = None
 
+    def _apply_parent_relation(self):
+        self.parent_relation.session = self.session
+        if self.check_parent_exists:
+            self.query = self.query.filter(
+                self.parent_relation.exists_clause())
+
+        if self.parent_relation.filter:
+            self.query = self.query.filter_by(**self.parent_relation.filter)
+
+    def ensure_parent_exists(self):
+        """
+        Raises ``NotFound`` if the resource is nested within a parent that
+        does not exist. Only needed when a nested query returned nothing, as
+        any returned row proves the existence of the parent.
+        """
+        if self.parent_relation and self.check_parent_exists:
+            self.parent_relation.ensure_exists()
+
     @property
     def fields(self):
         return util.get_mapper_cls_fields(self.model)
 
     def build_response(self, data, status=200):
         response = make_response(data, status, {
-            'Content-Type': getattr(self.serializer, 'content_type',
-                                    'application/json')
+            'Content-Type': self.get_response_content_type()
         })
 
         view_name = self.get_view()
@@ -352,21 +664,155 @@ class FlaskSQAResource(FlaskResource):
         for key, value in resp_headers.items():
             response.headers[key] = value
 
+        if self.vary_on_accept:
+            response.vary.add('Accept')
+
+        if self.compress_responses:
+            self.compress_response(response)
+
         return response
 
+    def compress_response(self, response):
+        """
+        Compresses the body of ``response`` in the encoding negotiated from
+        the ``Accept-Encoding`` header of the request
+        """
+        response.vary.add('Accept-Encoding')
+        if response.is_streamed or response.status_code in (204, 304) or \
+                'Content-Encoding' in response.headers:
+            return
+
+        body = response.get_data()
+        if len(body) < self.compression_min_size:
+            return
+
+        codec = compression.negotiate_codec(self.request.accept_encodings,
+                                            self.compression_codecs)
+        if codec is None:
+            return
+
+        level = self.compression_level
+        if isinstance(level, dict):
+            level = level.get(codec.name)
+
+        response.set_data(compression.compress(
+            body, codec, level, cache=self.compression_cache))
+        response.headers['Content-Encoding'] = codec.name
+
     def wrap_list_response(self, objects):
         return {
             'meta': self.paginator.get_meta() if self.paginator_cls else {},
             'objects': self.serializer.serialize_model(objects)
         }
 
+    def get_response_content_type(self):
+        content_type = getattr(self.serializer, 'content_type',
+                               'application/json')
+        if self.columnar_response and content_type == JSON.content_type:
+            return COLUMNAR_CONTENT_TYPE
+        return content_type
+
+    def negotiate_response_format(self):
+        """
+        Encodes the responses of the request, errors included, in the format
+        of ``formats`` best matching its ``Accept`` header
+        """
+        if len([format_ for format_ in self.formats
+                if format_.available]) > 1:
+            self.vary_on_accept = True
+
+        response_format = negotiate_format(self.request.accept_mimetypes,
+                                           self.formats)
+        self.serializer.response_format = response_format \
+            if response_format.binary else None
+
+    def get_request_format(self):
+        """
+        Returns the format of the request body, by its ``Content-Type``.
+        Bodies of other types are decoded as JSON.
+        """
+        request_format = get_format(self.request.mimetype, self.formats)
+        if request_format is None:
+            return JSON
+
+        if not request_format.available:
+            raise UnsupportedMediaType(
+                "Request bodies of type '%s' are not supported" %
+                self.request.mimetype)
+
+        return request_format
+
+    def load_request_body(self, body):
+        request_format = self.get_request_format()
+        if not request_format.binary:
+            return self.serializer.deserialize(body)
+
+        try:
+            return request_format.loads(body)
+        except Exception:
+            raise BadRequest("Malformed %s request body" %
+                             request_format.name)
+
+    def deserialize_list(self, body):
+        if body:
+            return self.load_request_body(body)
+        return []
+
+    def deserialize_detail(self, body):
+        if body:
+            return self.load_request_body(body)
+        return {}
+
+    def wrap_columnar_response(self, data):
+        return {
+            'meta': self.paginator.get_meta() if self.paginator_cls else {},
+            'columns': data.columns,
+            'rows': data.rows
+        }
+
+    def serialize_list(self, data):
+        if isinstance(data, Columnar):
+            return self.serializer.serialize(self.wrap_columnar_response(data))
+
+        if isinstance(data, RawJSON):
+            return self.serializer.serialize(self.wrap_list_response(data))
+
+        if self.use_parallel_serialization(data):
+            return self.serializer.serialize(
+                self.wrap_list_response(self.serialize_rows_parallel(data)))
+
+        return FlaskResource.serialize_list(self, data)
+
+    def use_parallel_serialization(self, data):
+        return self.parallel_serialization and isinstance(data, list) and \
+            len(data) >= self.parallel_serialization_threshold and \
+            bool(data) and isinstance(data[0], self.model) and \
+            self.serializer.get_plain_projection() is not None
+
+    def serialize_rows_parallel(self, objects):
+        """
+        Serializes model ``objects`` on the process pool
+        :return: ``RawJSON`` of the serialized objects
+        """
+        projection = self.serializer.get_plain_projection()
+        keys = [key for key, _, _ in projection]
+        formatters = [formatter for _, _, formatter in projection]
+        attributes = [attribute for _, attribute, _ in projection]
+
+        rows = [tuple(getattr(obj, attribute) for attribute in attributes)
+                for obj in objects]
+
+        return RawJSON(parallel.encode_rows(
+            keys, formatters, rows, self.serializer.json_encoder,
+            workers=self.parallel_serialization_workers))
+
     def serialize_detail(self, data):
         if not data:
             return ''
         data = self.serializer.serialize_model(data)
         return FlaskResource.serialize_detail(self, data)
 
-    def serialize(self, method, endpoint, data):
+    def select_serialized_fields(self):
         qs = self.request_querystring()
 
         self.include_fields = qs.get('include_fields', self.include_fields)
@@ -376,6 +822,9 @@ class FlaskSQAResource(FlaskResource):
         elif self.exclude_fields:
             self.serializer.exclude_fields_serialize(self.exclude_fields)
 
+    def serialize(self, method, endpoint, data):
+        self.select_serialized_fields()
+
         if endpoint == 'list' or isinstance(data, list):
             # Create is a special-case, because you POST it to the collection,
             # not to a detail.
@@ -421,11 +870,38 @@ class FlaskSQAResource(FlaskResource):
         pass
 
     @classmethod
-    def add_url_rules(cls, app, rule_prefix, endpoint_prefix=None):
+    def add_url_rules(cls, app, rule_prefix, endpoint_prefix=None,
+                      lazy=False):
+        """
+        Adds the URL rules of the resource and its nested resources. If
+        ``lazy`` is set, nested resources given as module paths are only
+        imported when first requested, provided their nested API spec
+        declares the APIs they offer, see ``declares_nested_apis``.
+        """
         cls._add_url_rules(app, rule_prefix, endpoint_prefix=endpoint_prefix)
         for nested_api in cls.NESTED_API:
             cls.add_nested_url_rules(nested_api, app, rule_prefix,
-                                     endpoint_prefix)
+                                     endpoint_prefix, lazy=lazy)
+
+    @classmethod
+    def get_serializer_cls(cls):
+        """
+        Returns the serializer class, importing it on first use if
+        ``serializer_cls`` is given as a module path. Deferring the import
+        defers the marshmallow field conversion of the schema as well.
+        """
+        if isinstance(cls.serializer_cls, six.string_types):
+            cls.serializer_cls = util.import_class(cls.serializer_cls)
+
+        return cls.serializer_cls
+
+    @classmethod
+    def warmup(cls):
+        """
+        Imports the serializer and builds a schema instance, so that the
+        first request does not pay for it
+        """
+        cls.get_serializer_cls()()
 
     @classmethod
     def get_custom_apis(cls):
@@ -444,11 +920,23 @@ class FlaskSQAResource(FlaskResource):
                 'methods': ['POST']
             })
 
+            if cls.bulk_insert_async:
+                api_list.append(JOB_STATUS_API)
+
+        if cls.aggregation:
+            api_list.append(AGGREGATE_API)
+
+        if cls.changes_cursor_field:
+            api_list.append(CHANGES_API)
+
+        if cls.event_bus is not None:
+            api_list.append(STREAM_API)
+
         return api_list
 
     @classmethod
     def add_nested_url_rules(cls, nested_api, app, rule_prefix,
-                             endpoint_prefix=None):
+                             endpoint_prefix=None, lazy=False):
 
         if 'resource' not in nested_api or 'url_prefix' not in nested_api:
             raise ValueError(
@@ -458,7 +946,13 @@ class FlaskSQAResource(FlaskResource):
         parent_identifier = nested_api['parent_identifier']
         parent_filter = nested_api.get('parent_filter', None)
         if isinstance(resource, six.string_types):
-            resource = util.import_class(resource)
+            if lazy and cls.declares_nested_apis(nested_api):
+                resource = LazyResource(
+                    resource, name=nested_api.get('name'),
+                    detail_uri_identifier=nested_api.get(
+                        'detail_uri_identifier'))
+            else:
+                resource = util.import_class(resource)
 
         nested_prefix = "%s<%s>/%s/" % (rule_prefix, parent_identifier,
                                         nested_api['url_prefix'])
@@ -489,7 +983,7 @@ class FlaskSQAResource(FlaskResource):
                 methods=nested_api['detail_allowed']
             )
 
-        custom_apis = nested_api.get('custom_apis', [])
+        custom_apis = list(nested_api.get('custom_apis', []))
         custom_apis.append({
             'url': 'count/',
             'name': 'count',
@@ -503,6 +997,23 @@ class FlaskSQAResource(FlaskResource):
                 'methods': ['POST']
             })
 
+            if nested_api.get('bulk_insert_async',
+                              getattr(resource, 'bulk_insert_async', False)):
+                custom_apis.append(JOB_STATUS_API)
+
+        if nested_api.get('aggregate',
+                          bool(getattr(resource, 'aggregation', None))):
+            custom_apis.append(AGGREGATE_API)
+
+        if nested_api.get('changes',
+                          bool(getattr(resource, 'changes_cursor_field',
+                                       None))):
+            custom_apis.append(CHANGES_API)
+
+        if nested_api.get('stream',
+                          getattr(resource, 'event_bus', None) is not None):
+            custom_apis.append(STREAM_API)
+
         for custom_api in custom_apis:
             api_name = "%s_%s" % (resource.name(), custom_api['name'])
             app.add_url_rule(
@@ -517,12 +1028,44 @@ class FlaskSQAResource(FlaskResource):
                 methods=custom_api['methods']
             )
 
+    @classmethod
+    def declares_nested_apis(cls, nested_api):
+        """
+        Tells whether the nested API spec declares every API depending on
+        the attributes of its resource, which can then be imported lazily
+        """
+        keys = ['aggregate', 'changes', 'stream']
+        if nested_api.get('allow_bulk_insert', False):
+            keys.append('bulk_insert_async')
+
+        return all(key in nested_api for key in keys)
+
     @classmethod
     def nested_view(cls, nested_resource, view, accepted_methods,
                     parent_filter, parent_identifier,
                     *init_args, **init_kwargs):
 
+        # Resolved nested resource class and its dispatch table, computed on
+        # the first request if the resource is lazily imported
+        resolved = {}
+
+        def _resolve():
+            if not resolved:
+                resource_cls = nested_resource.resolve() \
+                    if isinstance(nested_resource, LazyResource) \
+                    else nested_resource
+                resolved['dispatch_table'] = resource_cls.build_dispatch_table(
+                    view, accepted_methods, init_kwargs.get('custom_api'))
+                resolved['resource'] = resource_cls
+
+            return resolved['resource'], resolved['dispatch_table']
+
+        if not isinstance(nested_resource, LazyResource):
+            _resolve()
+
         def _wrapper(*args, **kwargs):
+            resource_cls, dispatch_table = _resolve()
+
             # Make a new instance so that no state potentially leaks between
             # instances.
             parent_ident_value = kwargs.pop(parent_identifier, None)
@@ -530,16 +1073,15 @@ class FlaskSQAResource(FlaskResource):
             parent = ParentRelation(cls, parent_identifier, parent_ident_value,
                                     parent_filter)
 
-            init_kwargs['nested'] = True
-            init_kwargs['parent'] = parent
+            inst_kwargs = dict(init_kwargs, nested=True, parent=parent,
+                               dispatch_table=dispatch_table)
 
-            inst = nested_resource(*init_args, **init_kwargs)
+            inst = resource_cls(*init_args, **inst_kwargs)
             try:
                 inst.request = request
-                inst.update_http_methods(view, accepted_methods)
                 return inst.handle(view, *args, **kwargs)
             except Exception as ex:
-                inst.handle_error(ex)
+                return inst.handle_error(ex)
 
         return _wrapper
 
@@ -567,6 +1109,10 @@ class FlaskSQAResource(FlaskResource):
         """
         self.endpoint = endpoint
         method = self.request_method()
+        self.negotiate_response_format()
+
+        if self.use_lookup_cache:
+            RequestLookupCache.activate()
 
         try:
             # Use ``.get()`` so we can also dodge potentially incorrect
@@ -582,9 +1128,17 @@ class FlaskSQAResource(FlaskResource):
             if not self.is_authenticated():
                 raise UnAuthorized()
 
-            self.data = self.deserialize(method, endpoint, self.request_body())
-            self.check_authorization(self.http_methods[endpoint][method],
-                                     self.data, *args, **kwargs)
+            if self.shard_router is not None:
+                self.select_shard()
+
+            if self.is_streaming_request(endpoint, method):
+                # Records are authorized chunk by chunk while being saved
+                self.data = self.stream_request_body()
+            else:
+                self.data = self.deserialize(method, endpoint,
+                                             self.request_body())
+                self.check_authorization(self.http_methods[endpoint][method],
+                                         self.data, *args, **kwargs)
 
             if self.paginator_cls:
                 self.paginator = self.paginator_cls(self.request_querystring(),
@@ -592,31 +1146,166 @@ class FlaskSQAResource(FlaskResource):
                                                     max_limit=self.MAX_LIMIT)
 
             view = self.get_view()
+            if self.shard_sessions is not None and \
+                    view not in self.FAN_OUT_VIEWS:
+                raise BadRequest("A shard key is required for '%s'" % view)
+
             view_method = getattr(self, view)
+            start = time.time()
             data = view_method(*args, **kwargs)
+            if self.unit_of_work:
+                self.commit_unit_of_work()
+            if self.session_router is not None:
+                self.session_router.record_latency(self.session,
+                                                   time.time() - start)
+            if self.release_connection_after_view:
+                self.release_connection(data)
+            if isinstance(data, Response):
+                # Views answering on their own, e.g. event streams
+                return data
             serialized = self.serialize(method, endpoint, data)
         except Exception as err:
+            if self.unit_of_work:
+                # Nothing of a failed request is kept, whether the view
+                # flushed it or not
+                self.session.rollback()
             return self.handle_error(err)
+        finally:
+            if self.remove_session_after_request:
+                self.remove_session()
 
         status = self.status_map.get(self.http_methods[endpoint][method], 200)
         return self.build_response(serialized, status=status)
 
+    def commit(self):
+        """
+        Commits the session, or only flushes it in ``unit_of_work`` mode
+        """
+        if self.unit_of_work:
+            self.session.flush()
+        else:
+            self.session.commit()
+
+    @db_http_wrapper_with_session
+    def commit_unit_of_work(self):
+        self.session.commit()
+
+    def release_connection(self, data):
+        """
+        Ends the transaction of a session that has neither pending changes
+        nor flushed any, so its connection goes back to the pool before the
+        serialization. Writes left uncommitted by the view are never
+        committed here. Expired returned objects are refreshed first and the
+        commit keeps the loaded state, so that serializing them does not
+        check a connection out again, except for lazy loaded relations.
+        Statements run with ``Session.execute`` are not seen as writes.
+        """
+        session = self.session()
+        if session.new or session.dirty or session.deleted or \
+                session.info.get(TRANSACTION_WRITES_KEY):
+            return
+
+        objects = data if isinstance(data, (list, tuple)) else [data]
+        for obj in objects:
+            state = sa.inspect(obj, raiseerr=False)
+            if isinstance(state, orm.state.InstanceState) and \
+                    state.session is session and state.expired_attributes:
+                session.refresh(obj)
+
+        expire_on_commit = session.expire_on_commit
+        session.expire_on_commit = False
+        try:
+            session.commit()
+        finally:
+            session.expire_on_commit = expire_on_commit
+
+    def remove_session(self):
+        for session in self.shard_sessions or [self.session]:
+            if hasattr(session, 'remove'):
+                session.remove()
+
+    def get_current_user(self):
+        """
+        Returns the user requests are authorized for, override to return the
+        authenticated user
+        """
+        return None
+
     def check_authorization(self, view_method, data, *args, **kwargs):
+        if self.authorization is None:
+            return True
+
+        user = self.get_current_user()
+        result = self.authorization.is_authorized(user, view_method, data,
+                                                  *args, **kwargs)
+        if not result:
+            raise PermissionDenied()
+
+        if isinstance(result, dict):
+            self.perm_filter = result
+            if self.query is not None:
+                self.query = self.apply_perm_filter(self.query, user)
+
         return True
 
+    def apply_perm_filter(self, query, user):
+        """
+        Restricts ``query`` to the objects ``user`` is allowed to access by
+        the object filter of ``authorization``. Applied once per request.
+        """
+        if self.perm_filter_applied:
+            return query
+
+        self.perm_filter_applied = True
+        return self.authorization.apply_perm_filter(query, user, self.model)
+
     @db_http_wrapper_with_session
     def create(self, *args, **kwargs):
         return self.obj_create(self.data, **kwargs)
 
     @db_http_wrapper_with_session
     def list(self, *args, **kwargs):
+        if self.is_columnar_request():
+            self.columnar_response = True
+            return self.obj_get_list_columnar(**kwargs)
+
+        if self.db_rendered_list:
+            rendered = self.obj_get_list_rendered(**kwargs)
+            if rendered is not None:
+                return rendered
+
         return self.obj_get_list(**kwargs)
 
     @db_http_wrapper_with_session
     def count(self, *args, **kwargs):
+        facets = self._get_aggregate_fields(self.request_querystring(),
+                                            'facets')
+        if facets:
+            return self.obj_count_facets(facets, **kwargs)
+
         count = self.obj_get_list(count_only=True, **kwargs)
         return {'total_count': count}
 
+    @db_http_wrapper_with_session
+    def aggregate(self, *args, **kwargs):
+        objects = self.obj_aggregate(**kwargs)
+        return {
+            'meta': self.paginator.get_meta() if self.paginator_cls else {},
+            'objects': objects
+        }
+
+    @db_http_wrapper_with_session
+    def changes(self, *args, **kwargs):
+        return self.obj_get_changes(**kwargs)
+
+    def stream(self, *args, **kwargs):
+        self.select_serialized_fields()
+        conditions = self.get_stream_conditions(**kwargs)
+        return Response(self.generate_events(conditions),
+                        mimetype=EVENT_STREAM_CONTENT_TYPE,
+                        headers={'Cache-Control': 'no-cache',
+                                 'X-Accel-Buffering': 'no'})
+
     @db_http_wrapper_with_session
     def detail(self, *args, **kwargs):
         return self.obj_get(**kwargs)
@@ -638,8 +1327,45 @@ class FlaskSQAResource(FlaskResource):
         return self.obj_create_or_update(self.data, **kwargs)
 
     def bulk_insert(self, *args, **kwargs):
+        streaming_request = self.is_streaming_request(self.endpoint,
+                                                      self.request_method())
+        if self.bulk_insert_async:
+            records = self.data
+            if streaming_request:
+                # The job outlives the request and its body stream
+                records = list(records)
+                self.check_authorization(self.get_view(), records, *args,
+                                         **kwargs)
+
+            return self.submit_bulk_job('Insert', records)
+
+        if streaming_request:
+            return self._bulk_save_chunked('Insert', self.data, *args,
+                                           **kwargs)
+
         return self._bulk_save('Insert', self.data)
 
+    def job_status(self, job_id, *args, **kwargs):
+        job = self.job_store.get(job_id)
+        if job is None or job['resource'] != self.name():
+            raise NotFound()
+
+        return job
+
+    def is_streaming_request(self, endpoint, method):
+        return self.bulk_insert_streaming and \
+            self.http_methods[endpoint][method] == 'bulk_insert'
+
+    def stream_request_body(self):
+        """
+        Returns an iterator over the records of the request body, decoded
+        while the body is being read
+        """
+        if self.request.mimetype == streaming.NDJSON_CONTENT_TYPE:
+            return streaming.iter_ndjson(self.request.stream)
+
+        return streaming.iter_json_array(self.request.stream)
+
     ############################ Helper Methods ################################
     def obj_create_or_update(self, data, **filters):
         query = self.query.filter_by(**filters)
@@ -656,35 +1382,434 @@ class FlaskSQAResource(FlaskResource):
         obj = self.load_model(data)
         self.session.add(obj)
         if commit:
-            self.session.commit()
+            self.commit()
+        self.invalidate_lookup_cache()
         return obj
 
     def get_detail_query(self):
         return self.query
 
     def obj_get(self, **filters):
+        if self.shard_sessions is not None:
+            return self._obj_get_sharded(**filters)
+
         return self.get_detail_query().get_or_404(**filters)
 
+    def _obj_get_sharded(self, **filters):
+        query = self.get_detail_query().filter_by(**filters)
+
+        def _get(session):
+            return query.with_session(session).first()
+
+        sessions = [session() for session in self.shard_sessions]
+        for obj in self.shard_router.map(_get, sessions):
+            if obj is not None:
+                return obj
+
+        raise NotFound()
+
     def get_list_query(self):
         return self.query
 
-    def obj_get_list(self, count_only=False, **kwargs):
+    def build_list_query(self, **kwargs):
+        """
+        Returns the list query with the filters and ordering of the request
+        applied, but not the pagination
+        """
         query = self.get_list_query()
         query = self.apply_filtering(query, **kwargs)
-        query = self.apply_sorting(query)
+        return self.apply_sorting(query)
+
+    def obj_get_list(self, count_only=False, **kwargs):
+        query = self.build_list_query(**kwargs)
+        if self.shard_sessions is not None:
+            return self._obj_get_list_sharded(query, count_only)
+
         if count_only:
-            return query.count()
+            count = query.count()
+            if not count:
+                self.ensure_parent_exists()
+            return count
+
         query = self.apply_pagination(query)
-        return query.all()
+        objects = query.all()
+        if not objects:
+            self.ensure_parent_exists()
+        return objects
+
+    def _obj_get_list_sharded(self, query, count_only=False):
+        """
+        Runs the list ``query`` on every shard in parallel. Each shard
+        returns its first ``offset + limit`` objects in the requested order,
+        which are merge sorted to cut the page, and its count. Searches
+        without ``order_by`` are merged by the rank of the objects.
+        """
+        primary_keys = util.get_primary_keys(self.model)
+        query = query.order_by(*primary_keys)
+
+        offset, limit = 0, None
+        if self.paginator_cls and not count_only:
+            offset, limit = self.paginator.offset, self.paginator.limit
+        page_query = query.limit(offset + limit) if limit else query
+
+        order_by = self.request_querystring().get('order_by', [])
+        terms = self.get_search_terms() if not order_by else None
+        if terms:
+            page_query = page_query.add_columns(
+                TextSearchRank(*self.get_search_args(terms)))
+
+        def _fetch(session):
+            count = query.with_session(session).count()
+            if count_only or not count:
+                return [], count
+            return page_query.with_session(session).all(), count
+
+        sessions = [session() for session in self.shard_sessions]
+        results = self.shard_router.map(_fetch, sessions)
+        count = sum(shard_count for _, shard_count in results)
+        if count_only:
+            return count
+
+        if self.paginator_cls:
+            self.paginator.set_count(count)
+
+        dialect = self.session().get_bind(
+            orm.class_mapper(self.model)).dialect
+        nulls_last = sharding.nulls_last(dialect)
+        sort_key = sharding.make_sort_key(order_by, primary_keys, nulls_last)
+        if not terms:
+            return sharding.merge_sorted([objects for objects, _ in results],
+                                         sort_key, offset, limit)
+
+        rows = sharding.merge_sorted(
+            [objects for objects, _ in results],
+            sharding.make_rank_sort_key(sort_key, nulls_last), offset, limit)
+        return [obj for obj, _ in rows]
+
+    def is_columnar_request(self):
+        """
+        Whether the columnar list format is requested, with
+        ``?format=columnar`` or an ``Accept`` header preferring
+        ``COLUMNAR_CONTENT_TYPE``. The ``format`` parameter is then never a
+        filter.
+        """
+        if not self.allow_columnar:
+            return False
+
+        if self.request_querystring().get('format', [None])[0] == 'columnar':
+            return True
+
+        self.vary_on_accept = True
+        accept = self.request.accept_mimetypes
+        return COLUMNAR_CONTENT_TYPE in accept and accept.best_match(
+            [self.get_response_content_type(), COLUMNAR_CONTENT_TYPE]) == \
+            COLUMNAR_CONTENT_TYPE
+
+    def obj_get_list_columnar(self, **kwargs):
+        """
+        Fetches the page of the list as rows of column values, straight from
+        the query when the serializer fields are plain column values and
+        from the serialized objects otherwise
+        :return: ``Columnar`` page
+        """
+        self.select_serialized_fields()
+        projection = self.serializer.get_plain_projection()
+        if projection is None or self.shard_sessions is not None:
+            objects = self.serializer.serialize_model(
+                self.obj_get_list(**kwargs))
+            columns = list(objects[0].keys()) if objects else []
+            return Columnar(columns, [[obj.get(column) for column in columns]
+                                      for obj in objects])
+
+        query = self.apply_pagination(self.build_list_query(**kwargs))
+        rows = query.with_entities(*[getattr(self.model, attribute)
+                                     for _, attribute, _ in projection]).all()
+        if not rows:
+            self.ensure_parent_exists()
+
+        formatters = [formatter for _, _, formatter in projection]
+        if any(formatters):
+            rows = [[parallel.format_value(formatter, value)
+                     for formatter, value in zip(formatters, row)]
+                    for row in rows]
+
+        return Columnar([key for key, _, _ in projection], rows)
+
+    def obj_get_list_rendered(self, **kwargs):
+        """
+        Renders the objects of the page of the list as JSON text in the
+        database, with ``json_build_object`` on PostgreSQL or
+        ``json_object`` on SQLite, from the plain projection of the
+        serializer. The rows are fetched in the order of the list query and
+        joined into a JSON array.
+
+        :return: ``RawJSON`` of the objects, or ``None`` if the dialect or the
+            serializer fields do not allow it
+        """
+        self.select_serialized_fields()
+        projection = self.serializer.get_plain_projection()
+        if projection is None or self.shard_sessions is not None or any(
+                formatter not in (None, ('text', None))
+                for _, _, formatter in projection):
+            return None
+
+        session = self.session()
+        dialect = session.get_bind(orm.class_mapper(self.model)).dialect.name
+        if dialect not in ('postgresql', 'sqlite'):
+            return None
+
+        pairs = []
+        for key, attribute, _ in projection:
+            value = getattr(self.model, attribute)
+            if dialect == 'sqlite':
+                if isinstance(value.type, sa.Boolean):
+                    value = sa.case([(value.is_(None), sa.null()),
+                                     (value != 0, sa.func.json('true'))],
+                                    else_=sa.func.json('false'))
+                elif isinstance(value.type, sa.Float):
+                    # SQLite renders reals with 15 significant digits only,
+                    # 17 are needed for them to read back as the same value
+                    # and only its extended ``!`` format goes beyond 16
+                    value = sa.case([(value.is_(None), sa.null())],
+                                    else_=sa.func.json(
+                                        sa.func.printf('%!.17g', value)))
+            pairs.extend([sa.literal(key), value])
+
+        if dialect == 'postgresql':
+            rendered = sa.func.json_build_object(*pairs)
+        else:
+            rendered = sa.func.json_object(*pairs)
+
+        # Aggregating the rows of the page in a subquery would rely on the
+        # aggregate following the order of the subquery, which SQL does not
+        # guarantee, so the ``ORDER BY`` stays on the query of the rows
+        query = self.apply_pagination(self.build_list_query(**kwargs))
+        texts = [text for text, in query.with_entities(
+            sa.cast(rendered, sa.Text)).all()]
+        if not texts:
+            self.ensure_parent_exists()
+        return RawJSON(u'[' + u','.join(texts) + u']')
+
+    def obj_count_facets(self, facets, **kwargs):
+        """
+        Counts the filtered list query in total and per distinct value of
+        each of the ``facets`` fields, which must allow ``exact`` filtering.
+        All the counts are fetched with a single ``UNION ALL`` of one
+        ``GROUP BY`` query per facet.
+
+        :return: ``{'total_count': 10, 'facets': {'status': {'open': 6,
+            'closed': 4}}}``, the facet values rendered as strings
+        """
+        columns = OrderedDict()
+        for field in facets:
+            if field not in self.fields:
+                raise BadRequest("No matching '%s' field for facets." % field)
+            self.check_filtering(field, 'exact')
+            columns[field] = getattr(self.model, field)
+
+        query = self.apply_filtering(self.get_list_query(), **kwargs)
+
+        total = query.with_entities(
+            sa.literal(None, sa.String).label('facet'),
+            sa.literal(None, sa.String).label('value'),
+            self._count_rows().label('count'))
+        per_facet = [
+            query.with_entities(
+                sa.literal(field, sa.String).label('facet'),
+                sa.cast(column, sa.String).label('value'),
+                self._count_rows().label('count')).group_by(column)
+            for field, column in columns.items()
+        ]
+
+        query = total.union_all(*per_facet)
+        if self.shard_sessions is not None:
+            sessions = [session() for session in self.shard_sessions]
+            rows = itertools.chain.from_iterable(self.shard_router.map(
+                lambda session: query.with_session(session).all(), sessions))
+        else:
+            rows = query.all()
+
+        result = {'total_count': 0,
+                  'facets': OrderedDict((field, {}) for field in columns)}
+        for facet, value, count in rows:
+            if facet is None:
+                result['total_count'] += count
+            else:
+                counts = result['facets'][facet]
+                counts[value] = counts.get(value, 0) + count
+
+        if not result['total_count']:
+            self.ensure_parent_exists()
+        return result
+
+    def obj_aggregate(self, **kwargs):
+        """
+        Computes the aggregates requested by the ``group_by``, ``count``,
+        ``sum``, ``avg``, ``min`` and ``max`` query parameters, each taking
+        a comma separated list of fields, over the filtered list query with a
+        single ``GROUP BY`` statement. ``count=*`` counts the rows.
+
+        The groups are paginated like the objects of the list, and limited
+        to ``MAX_LIMIT`` without a paginator.
+
+        :return: List of dictionaries, one per group, holding the group
+            fields and the aggregates labelled ``<aggregate>__<field>``
+        """
+        qs = self.request_querystring()
+
+        group_by = []
+        for field in self._get_aggregate_fields(qs, 'group_by'):
+            self.check_aggregation(field, 'group_by')
+            group_by.append(getattr(self.model, field))
+
+        columns = [column.label(column.key) for column in group_by]
+        for aggregate, aggregate_func in AGGREGATE_FUNCTIONS.items():
+            for field in self._get_aggregate_fields(qs, aggregate):
+                if aggregate == 'count' and field == '*':
+                    columns.append(self._count_rows().label('count'))
+                    continue
+
+                self.check_aggregation(field, aggregate)
+                columns.append(aggregate_func(getattr(self.model, field)).label(
+                    '{}__{}'.format(aggregate, field)))
+
+        if len(columns) == len(group_by):
+            raise BadRequest('At least one of {} must be provided'.format(
+                ', '.join(AGGREGATE_FUNCTIONS)))
+
+        query = self.apply_filtering(self.get_list_query(), **kwargs)
+        query = query.with_entities(*columns)
+        if group_by:
+            query = query.group_by(*group_by).order_by(*group_by)
+
+        if self.paginator_cls:
+            query = self.apply_pagination(query)
+        else:
+            query = query.limit(self.MAX_LIMIT)
+
+        labels = [column.key for column in columns]
+        return [dict(zip(labels, row)) for row in query.all()]
+
+    def obj_get_changes(self, **kwargs):
+        """
+        Returns the filtered objects created or updated after the ``since``
+        cursor, ordered by ``changes_cursor_field`` and primary key, and the
+        primary keys of the objects deleted since, at most ``limit`` of each.
+        Without a cursor, every object is returned but no delete. The
+        returned ``cursor`` resumes after the page, and ``has_more`` tells
+        whether more changes follow.
+
+        The cursor field must not be null and must only grow. Writes
+        committed with a lower value than the cursor of a client are missed
+        by it, so values should be assigned as late as possible in the
+        transaction.
+        """
+        field = self.model.__mapper__.get_property(
+            self.changes_cursor_field).columns[0]
+        primary_key = self.model.__mapper__.primary_key[0]
+        primary_key_attribute = \
+            self.model.__mapper__.get_property_by_column(primary_key).key
+
+        since = self.request_querystring().get('since', [None])[0]
+        value, key, tombstone = self.decode_changes_cursor(since) \
+            if since else (None, None, None)
+
+        limit = self.paginator.limit if self.paginator_cls else self.MAX_LIMIT
+
+        query = self.apply_filtering(self.get_list_query(), **kwargs)
+        if value is not None:
+            # Keyset pagination, the primary key breaking the ties
+            query = query.filter(sa.or_(
+                field > value, sa.and_(field == value, primary_key > key)))
+        objects = query.order_by(field, primary_key).limit(limit + 1).all()
+
+        has_more = len(objects) > limit
+        objects = objects[:limit]
+        if objects:
+            value = getattr(objects[-1], self.changes_cursor_field)
+            key = getattr(objects[-1], primary_key_attribute)
+        else:
+            self.ensure_parent_exists()
+
+        deleted = []
+        if self.tombstone_tracker is not None and not since:
+            tombstone = self.tombstone_tracker.last_id(self.session)
+        elif self.tombstone_tracker is not None:
+            tombstones = self.tombstone_tracker.deleted_since(
+                self.session, self.model, tombstone, limit + 1)
+            has_more = has_more or len(tombstones) > limit
+            tombstones = tombstones[:limit]
+            if tombstones:
+                tombstone = tombstones[-1][0]
+            deleted = [identifier for _, identifier in tombstones]
+
+        return {
+            'objects': objects,
+            'deleted': deleted,
+            'cursor': self.encode_changes_cursor(value, key, tombstone),
+            'has_more': has_more
+        }
+
+    def encode_changes_cursor(self, value, key, tombstone):
+        return changes.encode_cursor([value, key, tombstone],
+                                     self.serializer.json_encoder)
+
+    def decode_changes_cursor(self, cursor):
+        """
+        Returns the cursor field value, primary key and last tombstone id of
+        a ``changes/`` cursor
+        """
+        field = self.model.__mapper__.get_property(
+            self.changes_cursor_field).columns[0]
+        primary_key = self.model.__mapper__.primary_key[0]
+        try:
+            value, key, tombstone = changes.decode_cursor(cursor)
+            return (changes.parse_value(field, value),
+                    changes.parse_value(primary_key, key), tombstone)
+        except (TypeError, ValueError):
+            raise BadRequest("Invalid changes cursor '%s'" % cursor)
+
+    def _count_rows(self):
+        # Counting the primary key, unlike ``count(*)``, keeps the model in
+        # the ``FROM`` clause of a query selecting no other column
+        return sa.func.count(self.model.__mapper__.primary_key[0])
+
+    def _get_aggregate_fields(self, qs, param):
+        return [field for value in qs.get(param, [])
+                for field in value.split(',') if field]
+
+    def check_aggregation(self, field, aggregate):
+        """
+        Raises ``BadRequest`` unless the ``aggregate`` (or ``group_by``) is
+        allowed on the field by ``aggregation``
+        """
+        if field not in self.fields:
+            raise BadRequest("No matching '%s' field for aggregation."
+                             % field)
+
+        allowed = self.aggregation.get(field)
+        if allowed == '*':
+            return True
+
+        elif not allowed:
+            raise BadRequest("The '%s' field does not allow aggregation."
+                             % field)
+
+        elif aggregate not in allowed:
+            raise BadRequest("'%s' is not an allowed aggregation on the '%s' "
+                             "field." % (aggregate, field))
+
+        return True
 
     def obj_update(self, data, commit=True, partial=False, **filters):
         existing_obj = self.obj_get(**filters)
-        new_obj = self.load_model(data, partial=partial)
-        for key, value in data.iteritems():
-            setattr(existing_obj, key, getattr(new_obj, key, value))
+        values = self.validate_data(data, partial=partial)
+        for key, value in six.iteritems(values):
+            setattr(existing_obj, key, value)
 
         if commit:
-            self.session.commit()
+            self.commit()
+        self.invalidate_lookup_cache()
 
         return existing_obj
 
@@ -692,27 +1817,145 @@ class FlaskSQAResource(FlaskResource):
         obj = self.obj_get(**filters)
         self.session.delete(obj)
         if commit:
-            self.session.commit()
+            self.commit()
+        self.invalidate_lookup_cache()
+
+    def invalidate_lookup_cache(self):
+        """
+        Drops the request scoped lookups of this resource's model. Must be
+        called by custom views writing to the model outside the ``obj_*``
+        helpers
+        """
+        cache = RequestLookupCache.current()
+        if cache is not None:
+            cache.invalidate(self.model)
 
     def load_model(self, data, partial=False):
         return self.serializer.deserialize_model(data, partial=partial)
 
+    def validate_data(self, data, partial=False):
+        """
+        Validates ``data`` and returns the deserialized values without
+        building a model instance, for applying them to an existing object
+        """
+        return self.serializer.validate_model(data, partial=partial)
+
     def _record_exists(self, data):
         return data.get('id', None) is not None
 
-    def _bulk_save(self, op_name, object_list):
-        obj_create = db_http_wrapper_with_session(self.obj_create)
-        multi_update = db_http_wrapper_with_session(self.obj_update_list)
+    def submit_bulk_job(self, op_name, records):
+        """
+        Schedules saving ``records`` on the job runner and answers with the
+        id of the job
+        """
+        job = Job(self.name(), len(records))
+        self.job_store.save(job)
+        response = {
+            'job_id': job.id,
+            'status': job.status
+        }
+
+        # The user is resolved within the request, for the job to restrict
+        # its own query to the objects the user may access
+        user = self.get_current_user() if self.perm_filter else None
+        self.job_runner.submit(self._run_bulk_job,
+                               current_app._get_current_object(), job,
+                               op_name, records, user)
 
+        self.status_map[self.get_view()] = ACCEPTED
+        return response
+
+    def _run_bulk_job(self, app, job, op_name, records, user=None):
+        with app.app_context():
+            self._init_query()
+            if self.perm_filter:
+                self.perm_filter_applied = False
+                self.query = self.apply_perm_filter(self.query, user)
+
+            job.status = Job.RUNNING
+            self.job_store.save(job)
+            try:
+                for chunk in util.chunked(records, self.bulk_insert_chunk_size):
+                    result = self._bulk_save(op_name, chunk,
+                                             start_index=job.processed)
+                    if self.unit_of_work:
+                        self.commit_unit_of_work()
+                    job.success.update(result['success'])
+                    job.errors.update(result['errors'])
+                    job.processed += len(chunk)
+                    self.job_store.save(job)
+
+                job.status = Job.COMPLETED
+            except Exception as ex:
+                if self.unit_of_work:
+                    self.session.rollback()
+                job.status = Job.FAILED
+                job.error = six.text_type(ex)
+            finally:
+                self.job_store.save(job)
+                if self.remove_session_after_request:
+                    self.remove_session()
+
+    def _bulk_save_chunked(self, op_name, records, *args, **kwargs):
+        """
+        Saves the ``records`` iterable chunk by chunk, so that only a chunk
+        of records is held in memory at a time. Each chunk is authorized
+        before being saved.
+
+        A malformed record stream is answered with ``400 Bad Request``,
+        whose payload gives the number of records ``processed`` before it
+        and their results. Those records are committed already, except in
+        ``unit_of_work`` mode where the whole request is rolled back.
+        """
+        view = self.get_view()
         success = OrderedDict()
         errors = OrderedDict()
-        for ind, data in enumerate(object_list):
+        start_index = 0
+        chunks = util.chunked(records, self.bulk_insert_chunk_size)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except BadRequest as ex:
+                raise BadRequest(
+                    '{} after {} records'.format(ex.description, start_index),
+                    payload={
+                        'processed': start_index,
+                        'success': success,
+                        'errors': errors
+                    })
+
+            self.check_authorization(view, chunk, *args, **kwargs)
+            result = self._bulk_save(op_name, chunk, start_index=start_index)
+            success.update(result['success'])
+            errors.update(result['errors'])
+            start_index += len(chunk)
+
+        return {
+            'success': success,
+            'errors': errors
+        }
+
+    def _bulk_save(self, op_name, object_list, start_index=0):
+        success = OrderedDict()
+        errors = OrderedDict()
+        for ind, data in enumerate(object_list, start_index):
+            if not isinstance(data, dict):
+                errors[ind] = {
+                    'status': 'failure',
+                    'type': 'ValidationError',
+                    'error': 'Record must be an object'
+                }
+                continue
+
             try:
                 if self._record_exists(data):
                     object_id = data['id']
-                    multi_update({'id': object_id}, data)
+                    self._save_record(self.obj_update_list,
+                                      {'id': object_id}, data)
                 else:
-                    obj = obj_create(data)
+                    obj = self._save_record(self.obj_create, data)
                     object_id = obj.id
 
                 success[ind] = object_id
@@ -737,18 +1980,51 @@ class FlaskSQAResource(FlaskResource):
                     'error': ex.message
                 }
 
-        print("Total: {}, Error Count {}, Success Count {}".format(
-            len(object_list), len(errors), len(success)))
+            except NotFound as ex:
+                errors[ind] = {
+                    'status': 'failure',
+                    'type': 'NotFound',
+                    'error': ex.description
+                }
+
+        logger.debug("Bulk %s of %d records: %d errors, %d saved", op_name,
+                     len(object_list), len(errors), len(success))
 
         return {
             'success': success,
             'errors': errors
         }
 
+    def _save_record(self, save, *args):
+        """
+        Calls ``save`` for a single record of a bulk operation. In
+        ``unit_of_work`` mode the record is saved within a savepoint, so that
+        its failure only rolls back the record and not the whole request.
+        """
+        if not self.unit_of_work:
+            return db_http_wrapper_with_session(save)(*args)
+
+        savepoint = self.session.begin_nested()
+        try:
+            result = db_http_wrapper(save)(*args)
+            savepoint.commit()
+        except Exception:
+            savepoint.rollback()
+            raise
+
+        return result
+
     def obj_update_list(self, filter_dict, data):
-        self.load_model(data, partial=True)
-        self.query.filter_by(**filter_dict).update(data)
-        self.session.commit()
+        self.validate_data(data, partial=True)
+        # The criteria of the query, e.g. the parent's ``EXISTS`` clause, can
+        # not be evaluated in Python against the objects of the session
+        count = self.query.filter_by(**filter_dict).update(
+            data, synchronize_session='fetch')
+        if not count:
+            # Missing, or out of the parent or the object filter of the user
+            raise NotFound()
+        self.commit()
+        self.invalidate_lookup_cache()
 
     def check_filtering(self, field, filter_type):
         """
@@ -781,10 +2057,34 @@ class FlaskSQAResource(FlaskResource):
 
         return self.paginator.page(query)
 
+    def get_search_terms(self):
+        if not self.search_fields:
+            return None
+
+        terms = self.request_querystring().get('search')
+        if isinstance(terms, (list, tuple)):
+            terms = terms[0]
+        return terms.strip() if terms else None
+
+    def get_search_args(self, terms):
+        columns = [getattr(self.model, field) for field in self.search_fields]
+        return (columns, terms, self.search_config, self.search_fts_table)
+
+    def apply_search(self, query):
+        terms = self.get_search_terms()
+        if not terms:
+            return query
+
+        return query.filter(TextSearch(*self.get_search_args(terms)))
+
     def apply_sorting(self, query):
         options = self.request_querystring()
 
         if 'order_by' not in options:
+            terms = self.get_search_terms()
+            if terms:
+                rank = TextSearchRank(*self.get_search_args(terms))
+                query = query.order_by(rank.desc())
             return query
 
         for order_by in options['order_by']:
@@ -805,6 +2105,10 @@ class FlaskSQAResource(FlaskResource):
                 raise BadRequest("This '%s' field does not allow ordering"
                                  % field_name)
 
+            if self.filter_usage_recorder is not None:
+                self.filter_usage_recorder.record_ordering(self.model,
+                                                           field_name)
+
             query = query.order_by(order_by)
 
         return query
@@ -832,6 +2136,11 @@ class FlaskSQAResource(FlaskResource):
         filters = dict(kwargs)
 
         for filter_expr, value in qs.items():
+            if filter_expr == 'format' and self.allow_columnar:
+                # Reserved for ``is_columnar_request``, a field named
+                # ``format`` is filtered on with ``format__exact``
+                continue
+
             custom_filtering_handler = self.custom_filtering.get(filter_expr)
             if isinstance(custom_filtering_handler, six.string_types):
                 custom_filtering_handler = getattr(self,
@@ -842,43 +2151,210 @@ class FlaskSQAResource(FlaskResource):
                 query = custom_filtering_handler(query, qs, value)
                 continue
 
-            filter_bits = filter_expr.rsplit('__', 1)
+            complete_field, filter_type = self.split_filter_expr(filter_expr)
 
-            if filter_bits[-1] not in DjangoQuery.OPERATORS:
-                filter_type = 'exact'
-                complete_field = '__'.join(filter_bits)
-            else:
-                filter_type = filter_bits[-1]
-                complete_field = filter_bits[0]
+            field_name = complete_field.split('__')[0]
+            model_relationships = get_model_relationship_names(self.model)
+            if field_name not in self.fields and field_name not in model_relationships:
+                continue
+
+            self.check_filtering(complete_field, filter_type)
+            if self.filter_usage_recorder is not None:
+                self.filter_usage_recorder.record_filter(
+                    self.model, complete_field.replace('__', '.'), filter_type)
+
+            filters[filter_expr] = self.get_filter_value(filter_type, value)
+
+        query = self.apply_search(query)
+        return query.filter_by(**filters) if filters else query
+
+    def split_filter_expr(self, filter_expr):
+        """
+        Returns the field and the filter type of a ``field[__operator]``
+        filter expression
+        """
+        filter_bits = filter_expr.rsplit('__', 1)
+
+        if filter_bits[-1] not in DjangoQuery.OPERATORS:
+            return '__'.join(filter_bits), 'exact'
+
+        return filter_bits[0], filter_bits[-1]
 
+    def get_filter_value(self, filter_type, value):
+        if filter_type not in ('in', 'notin', 'range') and isinstance(value,
+                                                                      (list,
+                                                                       tuple)):
+            value = value[0]
+
+        return util.convert_value_to_python(value)
+
+    def get_stream_conditions(self, **kwargs):
+        """
+        Returns the conditions the events of the stream must meet: the
+        filters of the query string, allowed as by ``apply_filtering``, the
+        parent filter of nested resources and the object filter of the user
+        """
+        filters = dict(kwargs)
+        if self.parent_relation is not None and self.parent_relation.filter:
+            filters.update(self.parent_relation.filter)
+        if self.perm_filter:
+            filters.update(self.perm_filter)
+
+        conditions = [self.make_stream_condition(filter_expr, value)
+                      for filter_expr, value in filters.items()]
+
+        for filter_expr, value in self.request_querystring().items():
+            complete_field, filter_type = self.split_filter_expr(filter_expr)
             field_name = complete_field.split('__')[0]
             model_relationships = get_model_relationship_names(self.model)
             if field_name not in self.fields and field_name not in model_relationships:
                 continue
 
             self.check_filtering(complete_field, filter_type)
+            conditions.append(self.make_stream_condition(
+                filter_expr, self.get_filter_value(filter_type, value)))
 
-            if filter_type not in ('in', 'notin', 'range') and isinstance(value,
-                                                                          (list,
-                                                                           tuple)):
-                value = value[0]
+        return conditions
 
-            value = util.convert_value_to_python(value)
-            filters[filter_expr] = value
+    def make_stream_condition(self, filter_expr, value):
+        field, filter_type = self.split_filter_expr(filter_expr)
+        column_attrs = self.model.__mapper__.column_attrs
+        if field not in column_attrs:
+            raise InvalidFilterError(
+                "The '%s' filter can not be applied to event streams."
+                % filter_expr)
 
-        return query.filter_by(**filters) if filters else query
+        try:
+            return events.make_condition(column_attrs[field].columns[0],
+                                         field, filter_type, value)
+        except ValueError:
+            raise InvalidFilterError(
+                "The '%s' filter can not be applied to event streams."
+                % filter_expr)
+
+    def generate_events(self, conditions):
+        """
+        Yields the Server-Sent Events of the changes of the model meeting
+        all ``conditions``, with a comment every ``stream_keepalive``
+        seconds without any. Subscribers falling behind get an ``overflow``
+        event and are disconnected, to catch up e.g. with ``changes/``.
+        """
+        subscription = self.event_bus.subscribe(self.model)
+        try:
+            yield ': connected\n\n'
+            while True:
+                event = subscription.get(timeout=self.stream_keepalive)
+                if subscription.overflowed:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+
+                if event is None:
+                    yield ': keepalive\n\n'
+                elif all(condition(event.values) for condition in conditions):
+                    yield self.format_event(event)
+        finally:
+            subscription.close()
+
+    def format_event(self, event):
+        data = {
+            'type': event.type,
+            'id': event.identifier,
+            'object': self.serialize_event_values(event.values)
+        }
+        return 'event: {}\ndata: {}\n\n'.format(
+            event.type, json.dumps(data, cls=self.serializer.json_encoder))
+
+    def serialize_event_values(self, values):
+        """
+        Serializes the column values of an event like the serializer would
+        serialize the object, when its fields are plain column values
+        """
+        projection = self.serializer.get_plain_projection()
+        if projection is None:
+            return values
+
+        return dict((key, parallel.format_value(formatter,
+                                                values.get(attribute)))
+                    for key, attribute, formatter in projection)
 
 
 class ParentRelation(six.with_metaclass(Final)):
-    
+
     def __init__(self, resource,  identifier_key, identifier_value, filter_=None):
         self.resource = resource
         self.identifier_key = identifier_key
         self.identifier_value = identifier_value
         self.filter = filter_(identifier_value) if filter_ else None
+        # Session of the nested resource, so that the parent is loaded within
+        # the same session as its children
+        self.session = None
 
     def get_object(self):
+        mapper = orm.class_mapper(self.resource.model)
+        session = self.session or self.resource.session
+        query = self.resource.QUERY_CLASS(mapper, session=session())
+        filters = {self.resource.detail_uri_identifier: self.identifier_value}
+        cache = RequestLookupCache.current()
+        if cache is not None:
+            return cache.get_or_load(query, filters,
+                                     lambda: self._load_object(query, filters))
+
+        return self._load_object(query, filters)
+
+    def _load_object(self, query, filters):
+        try:
+            return query.filter_by(**filters).one()
+        except NoResultFound:
+            raise NotFound()
+
+    def exists_clause(self):
+        """
+        Returns an ``EXISTS`` expression that is true only if the parent
+        object exists. Nested queries embed it so that the parent check and
+        the child filtering are done by a single statement.
+        """
         field = getattr(self.resource.model,
                         self.resource.detail_uri_identifier)
+        # Never correlate with the enclosing query, which might select from
+        # or join the parent's table too
+        return sa.exists().where(field == self.identifier_value).correlate(None)
+
+    def ensure_exists(self):
+        session = self.session or self.resource.session
+        if not session().query(self.exists_clause()).scalar():
+            raise NotFound('{} with {} `{}` does not exist'.format(
+                self.resource.name(), self.resource.detail_uri_identifier,
+                self.identifier_value))
+
+
+class LazyResource(object):
+    """
+    Stands in for a nested resource given as a module path until it is
+    requested for the first time. Since the class is not imported while
+    adding the URL rules, the resource name and the detail URI identifier
+    are taken from the nested API spec, defaulting to the conventions of
+    ``FlaskResource``. So are the APIs it offers: the spec must set
+    ``aggregate``, ``changes`` and ``stream``, and ``bulk_insert_async``
+    along with ``allow_bulk_insert``, or the resource is imported right
+    away to find them out.
+    """
+
+    def __init__(self, cls_path, name=None, detail_uri_identifier=None):
+        self.cls_path = cls_path
+        self._name = name
+        self.detail_uri_identifier = detail_uri_identifier or \
+            FlaskResource.detail_uri_identifier
+        self._resource = None
+
+    def name(self):
+        if self._name:
+            return self._name
+
+        cls_name = self.cls_path.rsplit('.', 1)[-1]
+        return cls_name.replace('Resource', '').lower()
+
+    def resolve(self):
+        if self._resource is None:
+            self._resource = util.import_class(self.cls_path)
 
-        return self.resource.model.query.filter(field == self.identifier_value).one()
+        return self._resource
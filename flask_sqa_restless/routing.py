@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import itertools
+import threading
+
+from flask import has_request_context, request
+
+from .cache import TTLCache
+
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+ROUND_ROBIN = 'round_robin'
+LEAST_LATENCY = 'least_latency'
+
+
+def get_client_key():
+    """
+    Identifies the client for stickiness by its credentials, falling back to
+    its address
+    """
+    return request.headers.get('Authorization') or request.remote_addr
+
+
+class ReplicaRouter(object):
+    """
+    Routes the requests of resources to the ``primary`` session or to one of
+    the ``replicas`` sessions. Set it as the ``session_router`` of resources.
+
+    Safe methods are served by a replica, picked round robin or, with the
+    ``least_latency`` strategy, the one with the lowest moving average of the
+    latencies recorded by :meth:`record_latency`. Other methods go to the
+    primary, and so do the safe methods of a client for ``sticky_seconds``
+    after its last write so that it reads its own writes despite the
+    replication lag. Clients are told apart by ``client_key``, a callable
+    returning the client's identifier for the current request.
+
+    Usage::
+
+        router = ReplicaRouter(primary_session,
+                               [replica_session_1, replica_session_2])
+
+        class ArticleResource(FlaskSQAResource):
+            session_router = router
+    """
+
+    def __init__(self, primary, replicas=None, strategy=ROUND_ROBIN,
+                 sticky_seconds=5, client_key=get_client_key,
+                 latency_decay=0.2, max_clients=100000):
+        if strategy not in (ROUND_ROBIN, LEAST_LATENCY):
+            raise ValueError('Unknown routing strategy {!r}'.format(strategy))
+
+        self.primary = primary
+        self.replicas = list(replicas or [])
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self.client_key = client_key
+        self.latency_decay = latency_decay
+
+        self.sticky_clients = TTLCache(sticky_seconds or 1,
+                                       maxsize=max_clients)
+        self.latencies = {}
+        self._lock = threading.Lock()
+        self._replica_cycle = itertools.cycle(self.replicas)
+
+    def route(self, method):
+        """
+        Returns the session for a request with the HTTP ``method``
+        """
+        client = self._get_client()
+        if method.upper() not in SAFE_METHODS:
+            if client is not None and self.sticky_seconds:
+                self.sticky_clients.set(client, True)
+            return self.primary
+
+        if not self.replicas or (client is not None and
+                                 self.sticky_clients.get(client)):
+            return self.primary
+
+        return self.pick_replica()
+
+    def pick_replica(self):
+        with self._lock:
+            if self.strategy == LEAST_LATENCY:
+                # Replicas without measurement yet are tried first
+                return min(self.replicas, key=lambda replica:
+                           self.latencies.get(id(replica), 0))
+
+            return next(self._replica_cycle)
+
+    def record_latency(self, session, seconds):
+        """
+        Records the time taken to serve a request by ``session``, as an
+        exponentially weighted moving average
+        """
+        with self._lock:
+            previous = self.latencies.get(id(session))
+            if previous is None:
+                self.latencies[id(session)] = seconds
+            else:
+                self.latencies[id(session)] = (
+                    self.latency_decay * seconds +
+                    (1 - self.latency_decay) * previous)
+
+    def is_replica(self, session):
+        return any(session is replica for replica in self.replicas)
+
+    def _get_client(self):
+        if not has_request_context() or self.client_key is None:
+            return None
+        return self.client_key()
@@ -2,6 +2,7 @@
 
 from __future__ import absolute_import, division, print_function
 
+import copy
 import functools
 
 from builtins import super
@@ -23,6 +24,16 @@ def array_field_converter(converter, data_type):
 
 
 class BaseModelConverter(ModelConverter):
+    """
+    Model converter memoizing the fields it converts. Converted fields are
+    kept as prototypes keyed by the converter, the ``TYPE_MAPPING`` of the
+    schema class, the model, the column property and the conversion options,
+    and every schema gets a copy of the prototype instead of inspecting the
+    SQLAlchemy types again.
+    """
+
+    _field_cache = {}
+
     @classmethod
     def update_sqla_type_mapper(cls, mapping):
         """
@@ -30,6 +41,34 @@ class BaseModelConverter(ModelConverter):
         :param dict mapping: Mapping from sqlalchemy field type to marshmallow field type
         """
         cls.SQLA_TYPE_MAPPING.update(mapping)
+        cls.clear_field_cache()
+
+    @classmethod
+    def clear_field_cache(cls):
+        BaseModelConverter._field_cache.clear()
+
+    def _get_cached_field(self, key, convert):
+        prototype = self._field_cache.get(key)
+        if prototype is None:
+            prototype = convert()
+            self._field_cache[key] = prototype
+
+        return copy.deepcopy(prototype)
+
+    def property2field(self, prop, instance=True, field_class=None, **kwargs):
+        # Relationship fields are bound to the session of the schema, only
+        # column fields are memoized
+        if not instance or field_class is not None or \
+                not hasattr(prop, 'columns'):
+            return super(BaseModelConverter, self).property2field(
+                prop, instance, field_class, **kwargs)
+
+        key = (self.__class__, id(self.type_mapping), prop.parent.class_,
+               prop.key, repr(sorted(kwargs.items())))
+        return self._get_cached_field(
+            key,
+            lambda: super(BaseModelConverter, self).property2field(prop,
+                                                                   **kwargs))
 
     def _add_column_kwargs(self, kwargs, column):
         """Add keyword arguments to kwargs (in-place) based on the passed in
@@ -43,10 +82,16 @@ class BaseModelConverter(ModelConverter):
         pass
 
     def get_field_for_data_type(self, data_type, **kwargs):
+        key = (self.__class__, id(self.type_mapping), repr(data_type),
+               repr(sorted(kwargs.items())))
+        return self._get_cached_field(
+            key, lambda: self._convert_data_type(data_type, **kwargs))
+
+    def _convert_data_type(self, data_type, **kwargs):
         field_class = self._get_field_class_for_data_type(data_type)
         field_kwargs = self.get_base_kwargs()
         self._add_data_type_kwargs(field_kwargs, data_type)
-        field_kwargs.update(field_kwargs)
+        field_kwargs.update(kwargs)
         return field_class(**field_kwargs)
 
 
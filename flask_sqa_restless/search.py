@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import sqlalchemy as sa
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+
+DEFAULT_SEARCH_CONFIG = 'simple'
+
+LIKE_ESCAPE = u'\\'
+
+
+def escape_like(word):
+    """
+    Escapes the ``LIKE`` wildcards of ``word`` with :data:`LIKE_ESCAPE`
+    """
+    return word.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace(
+        u'%', LIKE_ESCAPE + u'%').replace(u'_', LIKE_ESCAPE + u'_')
+
+
+def _as_column(column):
+    if hasattr(column, '__clause_element__'):
+        return column.__clause_element__()
+    return column
+
+
+class _SearchElement(ColumnElement):
+
+    def __init__(self, columns, terms, config=None, fts_table=None):
+        self.columns = [_as_column(column) for column in columns]
+        self.terms = terms
+
+        info = getattr(self.table, 'info', {})
+        self.config = config or info.get('search_config',
+                                         DEFAULT_SEARCH_CONFIG)
+        self.fts_table = fts_table or info.get('search_fts_table')
+
+    @property
+    def table(self):
+        return self.columns[0].table
+
+    @property
+    def _from_objects(self):
+        return [from_ for column in self.columns
+                for from_ in column._from_objects]
+
+    def get_children(self, **kwargs):
+        return self.columns
+
+    def words(self):
+        return [word for word in self.terms.split() if word]
+
+    def tsvector(self):
+        """
+        ``to_tsvector`` of the columns. Expression indexes must be created on
+        the very same expression for PostgreSQL to use them, e.g.
+        ``to_tsvector('simple', title)`` or
+        ``to_tsvector('simple', concat_ws(' ', title, body))``.
+        """
+        if len(self.columns) == 1:
+            document = self.columns[0]
+        else:
+            document = sa.func.concat_ws(sa.literal_column("' '"),
+                                         *self.columns)
+
+        return sa.func.to_tsvector(self.regconfig(), document)
+
+    def tsquery(self):
+        return sa.func.plainto_tsquery(self.regconfig(), self.terms)
+
+    def regconfig(self):
+        # Rendered inline, a bound parameter would not match the expression
+        # of the index
+        return sa.literal_column("'{}'".format(self.config.replace("'", "''")))
+
+    def fts_match(self, compiler):
+        """
+        ``<fts_table> MATCH '"word" "word"'``, every word quoted so that user
+        input never reaches the FTS5 query syntax
+        """
+        query = u' '.join(u'"{}"'.format(word.replace('"', '""'))
+                          for word in self.words())
+        fts_table = sa.literal_column(compiler.preparer.quote(self.fts_table))
+        return fts_table.op('MATCH')(sa.bindparam(None, query, type_=sa.String))
+
+    def self_group(self, against=None):
+        # The compiled expressions are complete conditions, never compared
+        # against ``1`` on dialects without a native boolean
+        return self
+
+    def rowid(self):
+        return list(self.table.primary_key.columns)[0]
+
+
+class TextSearch(_SearchElement):
+    """
+    Boolean full text search of ``terms`` over ``columns``.
+
+    Compiles to ``to_tsvector(...) @@ plainto_tsquery(...)`` on PostgreSQL
+    and to a ``MATCH`` on the FTS5 table ``fts_table`` on SQLite. The FTS5
+    table must index the row ids of the searched table, e.g.
+    ``CREATE VIRTUAL TABLE article_fts USING fts5(title, body,
+    content='article', content_rowid='id')``. Every other dialect, and SQLite
+    without a FTS table, falls back to ``ILIKE`` requiring each word to be in
+    one of the columns.
+
+    ``config`` and ``fts_table`` default to the ``search_config`` and
+    ``search_fts_table`` keys of the table's ``info``. Blank ``terms`` match
+    every row, as no search.
+    """
+
+    type = sa.Boolean()
+
+    def fallback(self):
+        return sa.and_(*[
+            sa.or_(*[column.ilike(u'%' + escape_like(word) + u'%',
+                                  escape=LIKE_ESCAPE)
+                     for column in self.columns])
+            for word in self.words()
+        ])
+
+
+class TextSearchRank(_SearchElement):
+    """
+    Relevance of a row for :class:`TextSearch`, higher being more relevant:
+    ``ts_rank`` on PostgreSQL, the negated ``bm25`` of the FTS5 table on
+    SQLite and ``NULL`` everywhere else.
+    """
+
+    type = sa.Float()
+
+
+def _compile_match_all(element, compiler, **kw):
+    return compiler.process(sa.true(), **kw)
+
+
+@compiles(TextSearch)
+def _compile_text_search(element, compiler, **kw):
+    if not element.words():
+        return _compile_match_all(element, compiler, **kw)
+
+    return '(%s)' % compiler.process(element.fallback(), **kw)
+
+
+@compiles(TextSearch, 'postgresql')
+def _compile_text_search_postgresql(element, compiler, **kw):
+    if not element.words():
+        return _compile_match_all(element, compiler, **kw)
+
+    return '(%s)' % compiler.process(
+        element.tsvector().op('@@')(element.tsquery()), **kw)
+
+
+@compiles(TextSearch, 'sqlite')
+def _compile_text_search_sqlite(element, compiler, **kw):
+    if not element.fts_table or not element.words():
+        return _compile_text_search(element, compiler, **kw)
+
+    fts_table = sa.table(element.fts_table, sa.column('rowid'))
+    matches = sa.select([fts_table.c.rowid]).where(
+        element.fts_match(compiler))
+    return '(%s)' % compiler.process(element.rowid().in_(matches), **kw)
+
+
+@compiles(TextSearchRank)
+def _compile_text_search_rank(element, compiler, **kw):
+    return compiler.process(sa.null(), **kw)
+
+
+@compiles(TextSearchRank, 'postgresql')
+def _compile_text_search_rank_postgresql(element, compiler, **kw):
+    return compiler.process(
+        sa.func.ts_rank(element.tsvector(), element.tsquery()), **kw)
+
+
+@compiles(TextSearchRank, 'sqlite')
+def _compile_text_search_rank_sqlite(element, compiler, **kw):
+    # An empty ``MATCH`` is a syntax error of FTS5
+    if not element.fts_table or not element.words():
+        return _compile_text_search_rank(element, compiler, **kw)
+
+    fts_table = sa.table(element.fts_table, sa.column('rowid'))
+    bm25 = sa.func.bm25(sa.literal_column(
+        compiler.preparer.quote(element.fts_table)))
+    rank = sa.select([-bm25]).where(sa.and_(
+        fts_table.c.rowid == element.rowid(),
+        element.fts_match(compiler))).correlate(element.table).as_scalar()
+    return compiler.process(rank, **kw)
@@ -3,34 +3,119 @@
 from __future__ import absolute_import
 from __future__ import division
 
-from copy import deepcopy
+import uuid
+from contextlib import contextmanager
 
-from marshmallow import fields
+from marshmallow import fields, post_load
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow_sqlalchemy.fields import Related
 from restless.serializers import JSONSerializer
 
 from restless.utils import json, MoreTypesJSONEncoder
+from sqlalchemy import inspect as sa_inspect
 
 from .schema import BaseModelSchema
 from .exceptions import ValidationError
 
 
+# Field types whose serialization can be reproduced from the bare column
+# value. See ``ModelJSONSerializer.get_plain_projection``.
+PLAIN_FIELD_TYPES = (fields.Field, fields.Raw, fields.String, fields.Integer,
+                     fields.Float, fields.Boolean, fields.Date)
+
+
+class RawJSON(object):
+    """
+    Already encoded JSON text, embedded as is when placed as a value of the
+    dictionary passed to ``SimpleJSONSerializer.serialize``
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+
+class Columnar(object):
+    """
+    Page of objects in columnar form: the serialized keys once in
+    ``columns`` and one list of values per object in ``rows``
+    """
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+
 class SimpleJSONSerializer(JSONSerializer):
 
+    # Binary ``formats.Format`` encoding the serialized data instead of JSON,
+    # negotiated per request by the resource
+    response_format = None
+
     def __init__(self, json_encoder=MoreTypesJSONEncoder):
         self._json_encoder = json_encoder
 
+    @property
+    def json_encoder(self):
+        return self._json_encoder
+
+    @property
+    def content_type(self):
+        if self.response_format is not None:
+            return self.response_format.content_type
+        return 'application/json'
+
     def serialize(self, data):
+        if self.response_format is not None:
+            return self.response_format.dumps(self._decode_raw_json(data),
+                                              self._json_encoder)
+
+        if isinstance(data, dict) and \
+                any(isinstance(value, RawJSON) for value in data.values()):
+            return self._serialize_with_raw_json(data)
+
         return json.dumps(data, cls=self._json_encoder)
 
+    def _serialize_with_raw_json(self, data):
+        data = dict(data)
+        placeholders = {}
+        for key, value in data.items():
+            if isinstance(value, RawJSON):
+                placeholder = uuid.uuid4().hex
+                placeholders[placeholder] = value.text
+                data[key] = placeholder
+
+        body = json.dumps(data, cls=self._json_encoder)
+        for placeholder, text in placeholders.items():
+            body = body.replace(u'"{}"'.format(placeholder), text, 1)
+
+        return body
+
+    def _decode_raw_json(self, data):
+        if not isinstance(data, dict):
+            return data
+
+        return dict((key, json.loads(value.text)
+                     if isinstance(value, RawJSON) else value)
+                    for key, value in data.items())
+
     def serialize_model(self, data):
         return self.serialize(data)
 
     def deserialize_model(self, obj_dict):
         return obj_dict
 
+    def validate_model(self, obj_dict, partial=False):
+        return dict(obj_dict)
+
+    def get_plain_projection(self):
+        return None
+
 
 class ModelJSONSerializer(BaseModelSchema, SimpleJSONSerializer):
 
+    # Set while ``validate_model`` loads, see ``make_instance``
+    _validating = False
+
     def __init__(self, *args, **kwargs):
         BaseModelSchema.__init__(self, *args, **kwargs)
         SimpleJSONSerializer.__init__(self, self.opts.json_encoder)
@@ -59,21 +144,135 @@ class ModelJSONSerializer(BaseModelSchema, SimpleJSONSerializer):
         return resp
 
     def deserialize_model(self, obj_dict, **kwargs):
-        if kwargs.get('partial'):
-            self._nest_partial_fields()
+        with self._partial_nested_fields(kwargs.get('partial')):
+            data, errors = BaseModelSchema.load(self, obj_dict, **kwargs)
+
+        if errors:
+            raise ValidationError(payload=self._parse_validation_error(errors))
+
+        return data
+
+    def validate_model(self, obj_dict, partial=False):
+        """
+        Deserializes and validates ``obj_dict`` without building a model
+        instance out of it. The ``post_load`` hooks of the schema still run,
+        on the dictionary of values instead of a model instance.
+        :return: Dictionary of validated values keyed by model attribute
+        """
+        self._validating = True
+        try:
+            with self._partial_nested_fields(partial):
+                data, errors = self._do_load(obj_dict, partial=partial)
+        finally:
+            self._validating = False
 
-        data, errors = BaseModelSchema.load(self, obj_dict, **kwargs)
         if errors:
             raise ValidationError(payload=self._parse_validation_error(errors))
 
         return data
 
-    def _nest_partial_fields(self):
-        for field_name, field in self.fields.items():
-            if isinstance(field, fields.Nested):
-                new_field = deepcopy(field)
-                new_field.schema.partial = True
-                self.fields[field_name] = new_field
+    @post_load
+    def make_instance(self, data):
+        # Left out by ``validate_model``, which only needs the values
+        if self._validating:
+            return data
+        return BaseModelSchema.make_instance(self, data)
+
+    @contextmanager
+    def _partial_nested_fields(self, partial):
+        """
+        Makes the schemas of the nested fields partial for the duration of
+        the block. The nested schema instances are reused rather than copied
+        for every partial load.
+        """
+        if not partial:
+            yield
+            return
+
+        nested_schemas = [field.schema for field in self.fields.values()
+                          if isinstance(field, fields.Nested)]
+        previous = [schema.partial for schema in nested_schemas]
+        for schema in nested_schemas:
+            schema.partial = True
+
+        try:
+            yield
+        finally:
+            for schema, value in zip(nested_schemas, previous):
+                schema.partial = value
+
+    def get_plain_projection(self):
+        """
+        Describes the serialized objects in terms of bare column values, for
+        serializing rows without going through the fields.
+
+        :return: List of ``(key, attribute, formatter)`` tuples, one for each
+            dumped field, or ``None`` if some field cannot be reproduced from a
+            column value or the schema has dump processors. See
+            ``parallel.format_value`` for the formatters.
+        """
+        if self._has_dump_processors():
+            return None
+
+        mapper = self.model.__mapper__
+        column_attributes = set(prop.key for prop in mapper.column_attrs)
+
+        projection = []
+        for name, field in self.fields.items():
+            if field.load_only:
+                continue
+
+            key = field.dump_to or name
+            attribute = field.attribute or name
+            formatter = None
+
+            if getattr(field, 'as_string', False):
+                return None
+
+            if type(field) is Related:
+                attribute = self._get_related_column_attribute(field)
+            elif type(field) is fields.DateTime:
+                if field.dateformat not in (None, 'iso') or field.localtime:
+                    return None
+                formatter = ('datetime', None)
+            elif type(field) is fields.Decimal:
+                places = -field.places.as_tuple().exponent \
+                    if field.places is not None else None
+                formatter = ('decimal', places)
+            elif type(field) is fields.UUID:
+                formatter = ('text', None)
+            elif type(field) not in PLAIN_FIELD_TYPES:
+                return None
+
+            if attribute not in column_attributes:
+                return None
+
+            projection.append((key, attribute, formatter))
+
+        return projection
+
+    def _has_dump_processors(self):
+        return any(self.__processors__.get((tag, pass_many))
+                   for tag in (PRE_DUMP, POST_DUMP)
+                   for pass_many in (False, True))
+
+    def _get_related_column_attribute(self, field):
+        """
+        Returns the attribute of the foreign key column holding the value of
+        a many to one ``Related`` field, if there is a single such column
+        """
+        prop = self.model.__mapper__.get_property(field.attribute or field.name)
+        if field.columns or prop.direction.name != 'MANYTOONE' or \
+                len(prop.local_columns) != 1:
+            return None
+
+        column = list(prop.local_columns)[0]
+        related_keys = [key.name for key in sa_inspect(prop.mapper).primary_key]
+        remote_keys = [remote.name for _, remote in prop.local_remote_pairs]
+        if remote_keys != related_keys:
+            return None
+
+        return self.model.__mapper__.get_property_by_column(column).key
 
     def _parse_validation_error(self, errors, field_prefix=None):
         errors_dict = {}
@@ -87,7 +286,3 @@ class ModelJSONSerializer(BaseModelSchema, SimpleJSONSerializer):
                 errors_dict[field] = error
 
         return errors_dict
-
-    @property
-    def content_type(self):
-        return 'application/json'
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import heapq
+import itertools
+import zlib
+from collections import OrderedDict
+
+import six
+from flask import request
+
+from .jobs import JobRunner
+
+
+class ParentIdentifierResolver(object):
+    """
+    Shard key from the parent identifier in the URL of nested resources
+    """
+
+    def __call__(self, resource):
+        if resource.parent_relation is None:
+            return None
+        return resource.parent_relation.identifier_value
+
+
+class PrincipalResolver(object):
+    """
+    Shard key from the ``attribute`` of the user returned by the resource's
+    ``get_current_user``
+    """
+
+    def __init__(self, attribute):
+        self.attribute = attribute
+
+    def __call__(self, resource):
+        user = resource.get_current_user()
+        return getattr(user, self.attribute, None)
+
+
+class FilterResolver(object):
+    """
+    Shard key from the exact ``field`` filter of the query string
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __call__(self, resource):
+        return request.args.get(self.field)
+
+
+class ShardRouter(object):
+    """
+    Resolves the shard of a request for resources partitioned across
+    several databases. Set it as the ``shard_router`` of resources.
+
+    :param shards: Mapping of shard names to their (scoped) sessions
+    :param resolvers: Callables given the resource and returning the shard
+        key of the request or ``None``, tried in order
+    :param shard_for: Maps a shard key to a shard name. By default the key is
+        used as the name if it is one, else hashed over the shards
+    :param workers: Size of the thread pool running fanned out queries
+
+    Requests whose shard can not be resolved are served by fanning out to
+    every shard: lists and counts are run on all shards in parallel and
+    merged, detail lookups return the object of the first shard holding it.
+    Other views require a shard key. Merged lists are ordered in Python,
+    which compares text by code point: their order only matches the one of
+    the database for text columns with a binary collation, e.g. ``"C"``.
+    The sessions of the request are used
+    from the pool's threads, so SQLite engines need
+    ``connect_args={'check_same_thread': False}``.
+    """
+
+    def __init__(self, shards, resolvers, shard_for=None, workers=None):
+        if not shards:
+            raise ValueError('At least one shard must be provided')
+
+        self.shards = OrderedDict(shards)
+        self.resolvers = list(resolvers)
+        self.shard_for = shard_for or self.hash_shard
+        self.runner = JobRunner(workers or len(self.shards))
+
+    def resolve(self, resource):
+        """
+        Returns the name of the shard of the request or ``None``
+        """
+        for resolver in self.resolvers:
+            key = resolver(resource)
+            if key is not None:
+                return self.shard_for(key)
+
+        return None
+
+    def hash_shard(self, key):
+        if key in self.shards:
+            return key
+
+        names = list(self.shards)
+        digest = zlib.crc32(six.text_type(key).encode('utf-8')) & 0xffffffff
+        return names[digest % len(names)]
+
+    def map(self, func, items):
+        """
+        Calls ``func`` on every item in parallel and returns the results in
+        order
+        """
+        results = [self.runner.submit(func, item) for item in items]
+        return [result.get() for result in results]
+
+
+class _Descending(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _null_key(value, nulls_last):
+    if nulls_last:
+        return (value is None, value)
+    return (value is not None, value)
+
+
+def nulls_last(dialect):
+    """
+    Whether ``NULL`` sorts after every value in ascending order on
+    ``dialect``, as on PostgreSQL and Oracle, rather than before
+    """
+    return dialect.name in ('postgresql', 'oracle')
+
+
+def make_sort_key(order_by, primary_keys, nulls_last=False):
+    """
+    Returns a key function ordering objects as ``order_by``, a list of
+    ``[-]field[__related_field]``, followed by the primary keys. ``None``
+    sorts first, or last with ``nulls_last``, in ascending order.
+    """
+    getters = []
+    for field in list(order_by) + list(primary_keys):
+        descending = field.startswith('-')
+        path = field.lstrip('+-').split('__')
+        getters.append((path, descending))
+
+    def sort_key(obj):
+        key = []
+        for path, descending in getters:
+            value = obj
+            for attribute in path:
+                value = getattr(value, attribute, None) if value is not None \
+                    else None
+            value = _null_key(value, nulls_last)
+            key.append(_Descending(value) if descending else value)
+        return key
+
+    return sort_key
+
+
+def make_rank_sort_key(sort_key, nulls_last=False):
+    """
+    Returns a key function ordering ``(object, rank)`` rows by descending
+    search rank, then by ``sort_key`` of the object
+    """
+    def rank_sort_key(row):
+        obj, rank = row
+        return [_Descending(_null_key(rank, nulls_last))] + sort_key(obj)
+
+    return rank_sort_key
+
+
+def merge_sorted(results, sort_key, offset=0, limit=None):
+    """
+    Merges the lists of ``results``, each ordered by ``sort_key``, and
+    returns the page at ``offset``
+    """
+    def decorate(index, objects):
+        # The shard index and position break ties between equal keys before
+        # the objects themselves get compared
+        for position, obj in enumerate(objects):
+            yield sort_key(obj), index, position, obj
+
+    decorated = [decorate(index, objects)
+                 for index, objects in enumerate(results)]
+    merged = (item[-1] for item in heapq.merge(*decorated))
+    stop = offset + limit if limit else None
+    return list(itertools.islice(merged, offset, stop))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import codecs
+import json
+
+from .exceptions import BadRequest
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+WHITESPACE = u' \t\n\r'
+
+DELIMITERS = WHITESPACE + u',]'
+
+
+class JSONArrayReader(object):
+    """
+    Iterates over the items of a JSON array read incrementally from a file
+    like ``stream``, so that the items can be processed while the rest of
+    the array is still being received. Only the item being decoded is kept
+    in memory.
+    """
+
+    def __init__(self, stream, chunk_size=64 * 1024):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = u''
+        self.pos = 0
+        self.eof = False
+        self._json_decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def __iter__(self):
+        char = self._peek()
+        # An empty body is an empty list, as for non streamed requests
+        if char is None:
+            return
+
+        if char != u'[':
+            raise BadRequest('Request body must be a JSON array')
+        self.pos += 1
+
+        if self._peek() == u']':
+            self.pos += 1
+        else:
+            while True:
+                yield self._read_value()
+
+                char = self._peek()
+                self.pos += 1
+                if char == u']':
+                    break
+                elif char != u',':
+                    raise BadRequest('Malformed JSON array in request body')
+
+        if self._peek() is not None:
+            raise BadRequest('Unexpected data after the JSON array')
+
+    def _fill(self):
+        """
+        Reads the next chunk of the stream into the buffer, dropping the
+        consumed part of the buffer. Returns ``False`` at the end of stream.
+        """
+        if self.eof:
+            return False
+
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        text = self._text_decoder.decode(chunk, final=self.eof)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return not self.eof or bool(text)
+
+    def _peek(self):
+        """
+        Skips whitespace and returns the next character or ``None`` at the
+        end of stream
+        """
+        while True:
+            while self.pos < len(self.buffer) and \
+                    self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self._fill():
+                return None
+
+    def _read_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self.buffer,
+                                                           self.pos)
+            except ValueError:
+                end = None
+
+            # A value not followed by a delimiter, e.g. a number, might
+            # continue in the next chunk
+            if end is not None and (self.eof or (
+                    end < len(self.buffer) and self.buffer[end] in DELIMITERS)):
+                self.pos = end
+                return value
+
+            if not self._fill():
+                if end is not None:
+                    self.pos = end
+                    return value
+
+                raise BadRequest('Malformed JSON array in request body')
+
+
+def iter_json_array(stream, chunk_size=64 * 1024):
+    return iter(JSONArrayReader(stream, chunk_size))
+
+
+def iter_ndjson(stream):
+    """
+    Iterates over the records of a newline delimited JSON ``stream``
+    """
+    for line_number, line in enumerate(iter(stream.readline, b''), 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            yield json.loads(line.decode('utf-8'))
+        except ValueError:
+            raise BadRequest(
+                'Malformed JSON record on line {}'.format(line_number))
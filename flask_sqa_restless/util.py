@@ -4,6 +4,7 @@ from __future__ import absolute_import
 from __future__ import division
 
 import importlib
+import itertools
 import operator
 import inspect
 
@@ -18,6 +19,18 @@ def multi_getter(obj, *args):
     return operator.attrgetter(*args)(obj)
 
 
+def chunked(iterable, size):
+    """
+    Yields lists of at most ``size`` consecutive items of ``iterable``
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def capitalize_underscore_string(string):
     list_words = [word[0].upper() + word[1:] for word in string.split('_')]
     return " ".join(list_words)
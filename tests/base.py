@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Models and application fixture shared by the tests, backed by a temporary
+SQLite file.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+from flask_sqa_restless.serializer import ModelJSONSerializer
+
+db = SQLAlchemy()
+
+
+class Owner(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.Unicode(50))
+
+
+class Article(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.Unicode(100))
+    body = db.Column(db.UnicodeText)
+    status = db.Column(db.Unicode(20))
+    views = db.Column(db.Integer, default=0)
+    owner_id = db.Column(db.Integer, db.ForeignKey('owner.id'))
+    owner = db.relationship(Owner, backref=db.backref('articles',
+                                                      lazy='dynamic'))
+
+
+class OwnerSerializer(ModelJSONSerializer):
+    class Meta:
+        model = Owner
+        sqla_session = db.session
+
+
+class ArticleSerializer(ModelJSONSerializer):
+    class Meta:
+        model = Article
+        sqla_session = db.session
+        include_fk = True
+
+
+class AppTestCase(unittest.TestCase):
+    """
+    Creates an application with the tables of ``db`` in a fresh SQLite
+    file for every test
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = self.create_app(self.database_uri('primary'))
+        db.init_app(self.app)
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.tmpdir)
+
+    def database_uri(self, name):
+        return 'sqlite:///' + os.path.join(self.tmpdir, name + '.db')
+
+    def create_app(self, database_uri):
+        app = flask.Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        return app
+
+    def enable_savepoints(self):
+        """
+        Has pysqlite begin the transactions and keep them open across
+        ``SAVEPOINT``, see the SQLAlchemy SQLite dialect docs
+        """
+        with self.app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, 'connect')
+        def connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def begin(connection):
+            connection.execute('BEGIN')
+
+    def add_articles(self, count, owner_count=2, **values):
+        with self.app.app_context():
+            owners = [Owner(name=u'owner %d' % i) for i in range(owner_count)]
+            db.session.add_all(owners)
+            db.session.flush()
+            for i in range(count):
+                article_values = dict(
+                    title=u'title %d' % i, body=u'body %d' % i,
+                    status=u'open' if i % 2 else u'closed', views=i * 10,
+                    owner_id=owners[i % owner_count].id)
+                article_values.update(values)
+                db.session.add(Article(**article_values))
+            db.session.commit()
+
+    def get_json(self, url, **kwargs):
+        response = self.client.get(url, **kwargs)
+        return response.status_code, json.loads(response.data.decode('utf-8'))
+
+    def send_json(self, method, url, data, **kwargs):
+        response = self.client.open(url, method=method,
+                                    data=json.dumps(data),
+                                    content_type='application/json', **kwargs)
+        body = response.data.decode('utf-8')
+        return response.status_code, json.loads(body) if body else None
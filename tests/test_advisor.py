@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import json
+import unittest
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+from flask_sqa_restless import advisor
+from flask_sqa_restless.advisor import (FilterUsageRecorder, IndexAdvisor,
+                                        MISSING_INDEX, UNINDEXABLE_FILTER,
+                                        UNUSED_INDEX)
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+Base = declarative_base()
+
+
+class Author(Base):
+    __tablename__ = 'author'
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.Unicode(50), index=True)
+
+
+class Post(Base):
+    __tablename__ = 'post'
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.Unicode(100))
+    status = sa.Column(sa.Unicode(20))
+    views = sa.Column(sa.Integer)
+    created = sa.Column(sa.DateTime)
+    author_id = sa.Column(sa.Integer, sa.ForeignKey('author.id'))
+    author = orm.relationship(Author)
+
+    __table_args__ = (
+        sa.Index('ix_post_status_views', 'status', 'views'),
+        sa.Index('ix_post_created', 'created'),
+    )
+
+
+class PostResource(FlaskSQAResource):
+    model = Post
+    filtering = {
+        'status': ['exact', 'in'],
+        'title': ['icontains'],
+        'views': ['gt'],
+        'author.name': ['exact'],
+    }
+    ordering_allowed = ['views']
+
+
+class AuthorResource(FlaskSQAResource):
+    model = Author
+    NESTED_API = [{
+        'resource': PostResource,
+        'url_prefix': 'posts',
+        'parent_identifier': 'author_id',
+        'parent_filter': lambda value: {'author_id': value},
+    }]
+
+
+def findings_by_kind(findings):
+    result = {}
+    for finding in findings:
+        result.setdefault(finding.kind, []).append(
+            (finding.table, finding.columns))
+    return result
+
+
+class IndexAdvisorTest(unittest.TestCase):
+
+    def test_report(self):
+        findings = findings_by_kind(
+            IndexAdvisor([AuthorResource]).report())
+
+        self.assertEqual(sorted(findings[MISSING_INDEX]), [
+            ('post', ['author_id']),
+            ('post', ['views']),
+        ])
+        self.assertEqual(findings[UNINDEXABLE_FILTER],
+                         [('post', ['title'])])
+        self.assertEqual(findings[UNUSED_INDEX],
+                         [('post', ['created'])])
+
+    def test_resources_are_collected_once(self):
+        advisor_ = IndexAdvisor([AuthorResource, PostResource])
+        self.assertEqual(advisor_.resources, [AuthorResource, PostResource])
+
+    def test_relations_resolve_to_their_local_columns(self):
+        self.assertEqual(advisor._resolve_columns(Post, 'author'),
+                         [Post.__table__.c.author_id])
+        self.assertEqual(advisor._resolve_columns(Post, 'author__name'),
+                         [Author.__table__.c.name])
+        self.assertEqual(advisor._resolve_columns(Post, 'missing'), [])
+        self.assertEqual(advisor._resolve_columns(Post, 'views__name'), [])
+
+    def test_usage_orders_the_findings(self):
+        usage = FilterUsageRecorder()
+        for _ in range(3):
+            usage.record_filter(Post, 'views', 'gt')
+        usage.record_filter(Post, 'title', 'icontains')
+        usage = FilterUsageRecorder.from_dict(
+            json.loads(json.dumps(usage.to_dict())))
+
+        findings = IndexAdvisor([PostResource], usage=usage).report()
+        self.assertEqual([(finding.columns, finding.hits)
+                          for finding in findings][:2],
+                         [(['views'], 3), (['title'], 1)])
+        self.assertEqual(findings[0].sources, ['post.views__gt',
+                                               'post.views__order_by'])
+
+    def test_format_report(self):
+        self.assertEqual(advisor.format_report([]), 'No findings')
+        text = advisor.format_report(IndexAdvisor([PostResource]).report())
+        self.assertIn('missing_index: post(views): no index leads with views',
+                      text)
+
+
+class RecordingArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    filtering = {'status': ['exact'], 'views': ['gt']}
+    ordering_allowed = ['views']
+    filter_usage_recorder = FilterUsageRecorder()
+
+
+class FilterUsageRecorderTest(AppTestCase):
+
+    def test_requests_are_recorded(self):
+        RecordingArticleResource.add_url_rules(self.app, '/api/articles/')
+        self.add_articles(2)
+
+        self.get_json('/api/articles/?status=open&views__gt=1'
+                      '&order_by=-views')
+        self.get_json('/api/articles/?views__gt=5')
+
+        recorder = RecordingArticleResource.filter_usage_recorder
+        self.assertEqual(recorder.filters, {
+            ('Article', 'status', 'exact'): 1,
+            ('Article', 'views', 'gt'): 2,
+        })
+        self.assertEqual(recorder.orderings, {('Article', 'views'): 1})
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless.api import Api
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+
+
+class ApiTest(AppTestCase):
+
+    def test_stats_count_rules_of_same_named_resources_apart(self):
+        rule_count = len(list(self.app.url_map.iter_rules()))
+
+        api = Api(url_prefix='/api')
+        api.register(ArticleResource, '/articles/')
+        api.register(ArticleResource, '/archive/articles/',
+                     endpoint_prefix='archive')
+        api.init_app(self.app)
+
+        added = len(list(self.app.url_map.iter_rules())) - rule_count
+        # list, detail and count/
+        self.assertEqual(api.stats['rules_per_prefix'], {
+            '/api/articles/': 3,
+            '/api/archive/articles/': 3,
+        })
+        self.assertEqual(api.stats['resources'], 2)
+        self.assertEqual(api.stats['rules'], added)
+
+    def test_resources_registered_after_init_app_are_served(self):
+        api = Api(self.app, url_prefix='/api')
+        api.register(ArticleResource, '/articles/')
+        self.add_articles(1)
+
+        status, data = self.get_json('/api/articles/1/')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['title'], u'title 0')
+        self.assertEqual(api.stats['rules'], 3)
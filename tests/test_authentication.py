@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import flask
+from flask import g, request
+
+from flask_sqa_restless.authentication import (Authentication,
+                                               MultiAuthentication)
+
+
+class TokenAuthentication(Authentication):
+    """
+    Sets the user of the token on ``g``, as most backends do
+    """
+
+    cacheable = True
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.calls = 0
+
+    def is_authenticated(self, method, view, **kwargs):
+        self.calls += 1
+        user = self.tokens.get(request.headers.get('Authorization'))
+        if user is None:
+            return False
+
+        g.user = user
+        return True
+
+    def get_principal(self):
+        return g.user
+
+    def restore_principal(self, principal):
+        g.user = principal
+
+
+class UncacheableTokenAuthentication(TokenAuthentication):
+    cacheable = False
+
+
+class MultiAuthenticationCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+
+    def authenticate(self, authentication, token):
+        with self.app.test_request_context(
+                '/', headers={'Authorization': token}):
+            result = authentication.is_authenticated(method='GET',
+                                                     view='list')
+            return result, getattr(g, 'user', None)
+
+    def test_cache_hit_restores_user(self):
+        backend = TokenAuthentication({'secret': 'alice'})
+        authentication = MultiAuthentication(backend, cache_ttl=60)
+
+        self.assertEqual(self.authenticate(authentication, 'secret'),
+                         (True, 'alice'))
+        self.assertEqual(self.authenticate(authentication, 'secret'),
+                         (True, 'alice'))
+        self.assertEqual(backend.calls, 1)
+
+    def test_outcomes_of_uncacheable_backends_are_not_cached(self):
+        backend = UncacheableTokenAuthentication({'secret': 'alice'})
+        authentication = MultiAuthentication(backend, cache_ttl=60)
+
+        for _ in range(2):
+            self.assertEqual(self.authenticate(authentication, 'secret'),
+                             (True, 'alice'))
+        self.assertEqual(backend.calls, 2)
+
+    def test_failures_are_cached(self):
+        backend = TokenAuthentication({'secret': 'alice'})
+        authentication = MultiAuthentication(backend, cache_ttl=60)
+
+        for _ in range(2):
+            self.assertEqual(self.authenticate(authentication, 'wrong'),
+                             (False, None))
+        self.assertEqual(backend.calls, 1)
+
+    def test_concurrent_backends_set_user_of_request(self):
+        authentication = MultiAuthentication(
+            TokenAuthentication({'secret': 'alice'}),
+            TokenAuthentication({'other': 'bob'}),
+            concurrent=True, cache_ttl=60)
+
+        for _ in range(2):
+            self.assertEqual(self.authenticate(authentication, 'other'),
+                             (True, 'bob'))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import namedtuple
+
+from flask import request
+
+from flask_sqa_restless.authentication import Authorization
+from flask_sqa_restless.exceptions import NotFound
+from flask_sqa_restless.jobs import InMemoryJobStore, Job, JobRunner
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+User = namedtuple('User', ['user_type', 'owner_id'])
+
+
+class RecordingJobRunner(JobRunner):
+    """
+    Keeps the results of the submitted jobs for the tests to wait on
+    """
+
+    def __init__(self):
+        super(RecordingJobRunner, self).__init__(workers=1)
+        self.results = []
+
+    def submit(self, func, *args):
+        result = super(RecordingJobRunner, self).submit(func, *args)
+        self.results.append(result)
+        return result
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    allow_bulk_insert = True
+    authorization = Authorization(
+        allowed_roles={'default': [Authorization.OBJECT_FILTER]},
+        object_perm_filter=('owner_id', 'owner_id'))
+
+    def get_current_user(self):
+        return User('member', int(request.headers['X-Owner']))
+
+
+class AsyncArticleResource(ArticleResource):
+    bulk_insert_async = True
+    job_store = InMemoryJobStore()
+    job_runner = RecordingJobRunner()
+
+
+class BulkInsertAuthorizationTest(AppTestCase):
+
+    def setUp(self):
+        super(BulkInsertAuthorizationTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        AsyncArticleResource.add_url_rules(self.app, '/api/async/articles/',
+                                           endpoint_prefix='async')
+        # Article 1 belongs to owner 1, article 2 to owner 2
+        self.add_articles(2)
+
+    def bulk_insert(self, url, records):
+        return self.send_json('POST', url, records,
+                              headers={'X-Owner': '1'})
+
+    def assert_other_owner_row_untouched(self):
+        with self.app.app_context():
+            self.assertEqual(Article.query.get(1).title, u'mine')
+            self.assertEqual(Article.query.get(2).title, u'title 1')
+
+    def test_update_of_other_owner_row_is_rejected(self):
+        status, data = self.bulk_insert('/api/articles/bulk_insert/', [
+            {'id': 1, 'title': u'mine'},
+            {'id': 2, 'title': u'theirs'},
+        ])
+        self.assertEqual(status, 200)
+        self.assertEqual(list(data['success'].values()), [1])
+        self.assertEqual(data['errors']['1']['type'], 'NotFound')
+        self.assertEqual(data['errors']['1']['error'],
+                         NotFound.description)
+        self.assert_other_owner_row_untouched()
+
+    def test_update_of_missing_row_is_not_found(self):
+        status, data = self.bulk_insert('/api/articles/bulk_insert/', [
+            {'id': 42, 'title': u'missing'},
+        ])
+        self.assertEqual(status, 200)
+        self.assertEqual(data['success'], {})
+        self.assertEqual(data['errors']['0'], {
+            'status': 'failure',
+            'type': 'NotFound',
+            'error': NotFound.description
+        })
+
+    def test_job_does_not_update_other_owner_row(self):
+        status, data = self.bulk_insert('/api/async/articles/bulk_insert/', [
+            {'id': 1, 'title': u'mine'},
+            {'id': 2, 'title': u'theirs'},
+        ])
+        self.assertEqual(status, 202)
+
+        AsyncArticleResource.job_runner.results[-1].get(timeout=10)
+        job = AsyncArticleResource.job_store.get(data['job_id'])
+        self.assertEqual(job['status'], Job.COMPLETED)
+        self.assertEqual(list(job['success'].values()), [1])
+        self.assertEqual(job['errors'][1]['type'], 'NotFound')
+        self.assertEqual(job['errors'][1]['error'], NotFound.description)
+        self.assert_other_owner_row_untouched()
+
+    def test_records_that_are_not_objects_are_rejected(self):
+        status, data = self.bulk_insert('/api/articles/bulk_insert/', [
+            {'title': u'new'}, 5,
+        ])
+        self.assertEqual(status, 200)
+        self.assertEqual(list(data['success'].values()), [3])
+        self.assertEqual(data['errors']['1']['type'], 'ValidationError')
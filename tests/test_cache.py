@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless.cache import RequestLookupCache
+from flask_sqa_restless.djquery import DjangoQuery
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    use_lookup_cache = True
+
+
+class RequestLookupCacheTest(AppTestCase):
+
+    def setUp(self):
+        super(RequestLookupCacheTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        self.add_articles(2)
+
+    def test_cache_is_discarded_between_requests_in_outer_app_context(self):
+        with self.app.app_context():
+            status, data = self.get_json('/api/articles/1/')
+            self.assertEqual(data['title'], u'title 0')
+
+            # Written behind the back of the resource, so only a fresh
+            # cache sees it
+            db.session.remove()
+            db.session.query(Article).filter_by(id=1).update(
+                {'title': u'renamed'})
+            db.session.commit()
+            db.session.remove()
+
+            status, data = self.get_json('/api/articles/1/')
+            self.assertEqual(data['title'], u'renamed')
+
+    def test_cache_is_not_installed_outside_requests(self):
+        with self.app.app_context():
+            self.assertIsNone(RequestLookupCache.activate())
+            self.assertIsNone(RequestLookupCache.current())
+
+    def test_repeated_lookups_share_the_cached_object(self):
+        with self.app.test_request_context('/'):
+            RequestLookupCache.activate()
+            query = DjangoQuery(Article, session=db.session())
+            first = query.get_or_404(id=1)
+            self.assertIs(query.get_or_404(id=1), first)
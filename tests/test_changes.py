@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import datetime
+
+from flask_sqa_restless import changes
+from flask_sqa_restless.changes import TombstoneTracker
+from flask_sqa_restless.resources import FlaskSQAResource
+from flask_sqa_restless.serializer import ModelJSONSerializer
+
+from .base import AppTestCase, db
+
+START = datetime.datetime(2017, 3, 1, 10, 30, 0, 250)
+
+
+class Note(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    body = db.Column(db.UnicodeText)
+    topic = db.Column(db.Unicode(20))
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+tombstones = TombstoneTracker(db.metadata, table_name='note_tombstones')
+tombstones.track(Note)
+
+
+class NoteSerializer(ModelJSONSerializer):
+    class Meta:
+        model = Note
+        sqla_session = db.session
+
+
+class NoteResource(FlaskSQAResource):
+    model = Note
+    session = db.session
+    serializer_cls = NoteSerializer
+    changes_cursor_field = 'updated_at'
+    tombstone_tracker = tombstones
+    filtering = {'topic': ['exact']}
+
+
+class CursorTest(AppTestCase):
+
+    def test_cursor_round_trip(self):
+        cursor = changes.encode_cursor([START, 7, None])
+        self.assertNotIn('=', cursor)
+        value, key, tombstone = changes.decode_cursor(cursor)
+        self.assertEqual(changes.parse_value(Note.__table__.c.updated_at,
+                                             value), START)
+        self.assertEqual((key, tombstone), (7, None))
+
+    def test_malformed_cursors(self):
+        for cursor in ('', 'not a cursor', changes.encode_cursor({})[:-2]):
+            with self.assertRaises((TypeError, ValueError)):
+                changes.decode_cursor(cursor)
+
+
+class ChangesTest(AppTestCase):
+
+    url = '/api/notes/changes/'
+
+    def setUp(self):
+        super(ChangesTest, self).setUp()
+        NoteResource.add_url_rules(self.app, '/api/notes/')
+        with self.app.app_context():
+            # Notes 1 and 2 share their timestamp
+            for i, minutes in enumerate([0, 0, 1, 2]):
+                db.session.add(Note(
+                    body=u'note %d' % i, topic=u'even' if i % 2 else u'odd',
+                    updated_at=START + datetime.timedelta(minutes=minutes)))
+            db.session.commit()
+
+    def changes(self, cursor=None, **params):
+        if cursor is not None:
+            params['since'] = cursor
+        status, data = self.get_json(self.url, query_string=params)
+        self.assertEqual(status, 200, data)
+        return data
+
+    def update(self, note_id, minutes):
+        with self.app.app_context():
+            note = Note.query.get(note_id)
+            note.body = u'updated'
+            note.updated_at = START + datetime.timedelta(minutes=minutes)
+            db.session.commit()
+
+    def test_first_sync_returns_every_object(self):
+        data = self.changes()
+        self.assertEqual([note['id'] for note in data['objects']],
+                         [1, 2, 3, 4])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+        # Nothing changed since
+        data = self.changes(data['cursor'])
+        self.assertEqual(data['objects'], [])
+        self.assertEqual(data['deleted'], [])
+
+    def test_pages_break_ties_on_the_primary_key(self):
+        ids = []
+        data = self.changes(limit=1)
+        while True:
+            ids.extend(note['id'] for note in data['objects'])
+            if not data['has_more']:
+                break
+            data = self.changes(data['cursor'], limit=1)
+
+        self.assertEqual(ids, [1, 2, 3, 4])
+
+    def test_updates_and_deletes_since_the_cursor(self):
+        cursor = self.changes()['cursor']
+
+        self.update(2, 5)
+        self.assertEqual(self.client.delete('/api/notes/3/').status_code,
+                         204)
+        with self.app.app_context():
+            Note.query.filter_by(id=4).delete(synchronize_session='fetch')
+            db.session.commit()
+
+        data = self.changes(cursor)
+        self.assertEqual([note['id'] for note in data['objects']], [2])
+        self.assertEqual(data['deleted'], [3, 4])
+
+        data = self.changes(data['cursor'])
+        self.assertEqual((data['objects'], data['deleted']), ([], []))
+
+    def test_deletes_are_paged(self):
+        cursor = self.changes()['cursor']
+        for note_id in (1, 2, 3):
+            self.client.delete('/api/notes/%d/' % note_id)
+
+        data = self.changes(cursor, limit=2)
+        self.assertEqual(data['deleted'], [1, 2])
+        self.assertTrue(data['has_more'])
+
+        data = self.changes(data['cursor'], limit=2)
+        self.assertEqual(data['deleted'], [3])
+        self.assertFalse(data['has_more'])
+
+    def test_rolled_back_deletes_are_not_recorded(self):
+        cursor = self.changes()['cursor']
+        with self.app.app_context():
+            db.session.delete(Note.query.get(1))
+            db.session.flush()
+            db.session.rollback()
+
+        self.assertEqual(self.changes(cursor)['deleted'], [])
+
+    def test_filters_apply(self):
+        data = self.changes(topic=u'even')
+        self.assertEqual([note['id'] for note in data['objects']], [2, 4])
+
+    def test_invalid_cursor(self):
+        status, data = self.get_json(self.url + '?since=garbage')
+        self.assertEqual(status, 400)
+
+    def test_purge(self):
+        self.client.delete('/api/notes/1/')
+        with self.app.app_context():
+            tombstones.purge(db.session, datetime.datetime.utcnow() +
+                             datetime.timedelta(seconds=1))
+            db.session.commit()
+            self.assertEqual(
+                tombstones.deleted_since(db.session, Note), [])
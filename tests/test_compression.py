@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import gzip
+import io
+import json
+import unittest
+
+from werkzeug.http import parse_accept_header
+
+from flask_sqa_restless import compression
+from flask_sqa_restless.cache import TTLCache
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+BODY = b'{"title": "title"}' * 100
+
+
+def decompress_gzip(data):
+    return gzip.GzipFile(fileobj=io.BytesIO(data)).read()
+
+
+class CountingCodec(compression.Codec):
+    """
+    Reverses bodies, counting the calls
+    """
+
+    name = 'reverse'
+    default_level = 1
+
+    def __init__(self):
+        self.calls = []
+
+    def compress(self, body, level=None):
+        self.calls.append(level)
+        return body[::-1]
+
+
+class UnavailableCodec(CountingCodec):
+
+    name = 'gzip'
+
+    @property
+    def available(self):
+        return False
+
+
+class GzipCodecTest(unittest.TestCase):
+
+    def test_level_zero_stores_the_body(self):
+        stored = compression.GZIP.compress(BODY, 0)
+        self.assertGreater(len(stored), len(BODY))
+        self.assertEqual(decompress_gzip(stored), BODY)
+
+    def test_default_level_compresses_the_body(self):
+        compressed = compression.GZIP.compress(BODY)
+        self.assertLess(len(compressed), len(BODY))
+        self.assertEqual(compressed, compression.GZIP.compress(
+            BODY, compression.GZIP.default_level))
+
+
+@unittest.skipUnless(compression.BROTLI.available, 'brotli is not installed')
+class BrotliCodecTest(unittest.TestCase):
+
+    def test_level_zero_is_honoured(self):
+        import brotli
+        self.assertEqual(compression.BROTLI.compress(BODY, 0),
+                         brotli.compress(BODY, quality=0))
+        self.assertNotEqual(compression.BROTLI.compress(BODY, 0),
+                            compression.BROTLI.compress(BODY))
+
+
+class CompressTest(unittest.TestCase):
+
+    def test_cache_reuses_compressed_bodies(self):
+        codec = CountingCodec()
+        cache = TTLCache()
+        first = compression.compress(BODY, codec, cache=cache)
+        self.assertEqual(compression.compress(BODY, codec, cache=cache),
+                         first)
+        self.assertEqual(codec.calls, [None])
+
+        compression.compress(BODY, codec, 0, cache=cache)
+        compression.compress(BODY + b' ', codec, cache=cache)
+        compression.compress(BODY, codec, 0, cache=cache)
+        self.assertEqual(codec.calls, [None, 0, None])
+
+    def test_without_cache_every_body_is_compressed(self):
+        codec = CountingCodec()
+        compression.compress(BODY, codec)
+        compression.compress(BODY, codec)
+        self.assertEqual(codec.calls, [None, None])
+
+    def test_negotiate_codec(self):
+        reverse = CountingCodec()
+        codecs = (reverse, compression.GZIP)
+
+        def negotiate(header, codecs=codecs):
+            return compression.negotiate_codec(parse_accept_header(header),
+                                               codecs)
+
+        self.assertIs(negotiate('gzip, reverse'), reverse)
+        self.assertIs(negotiate('gzip, reverse;q=0.5'), compression.GZIP)
+        self.assertIs(negotiate('*'), reverse)
+        self.assertIsNone(negotiate('identity'))
+        self.assertIsNone(negotiate('gzip', (UnavailableCodec(),)))
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    compress_responses = True
+    compression_codecs = (compression.GZIP,)
+    compression_min_size = 200
+    compression_level = {'gzip': 0}
+
+
+class CachedArticleResource(ArticleResource):
+    compression_codecs = (CountingCodec(),)
+    compression_cache = TTLCache()
+
+
+class ResponseCompressionTest(AppTestCase):
+
+    def setUp(self):
+        super(ResponseCompressionTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        CachedArticleResource.add_url_rules(
+            self.app, '/api/cached/articles/', endpoint_prefix='cached')
+        self.add_articles(5)
+
+    def test_level_zero_is_honoured(self):
+        response = self.client.get('/api/articles/',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.vary)
+
+        body = decompress_gzip(response.data)
+        self.assertEqual(len(json.loads(body.decode('utf-8'))['objects']), 5)
+        # Stored, not compressed
+        self.assertGreater(len(response.data), len(body))
+
+    def test_small_and_unaccepted_bodies_are_not_compressed(self):
+        response = self.client.get('/api/articles/1/',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+        response = self.client.get('/api/articles/')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.vary)
+
+    def test_identical_responses_are_compressed_once(self):
+        codec = CachedArticleResource.compression_codecs[0]
+        for _ in range(3):
+            response = self.client.get('/api/cached/articles/',
+                                       headers={'Accept-Encoding': 'reverse'})
+            self.assertEqual(response.headers['Content-Encoding'], 'reverse')
+        self.assertEqual(codec.calls, [None])
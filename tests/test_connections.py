@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless.metrics import PoolMetrics
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    release_connection_after_view = True
+    CUSTOM_APIS = [
+        {'url': 'draft/', 'name': 'draft', 'methods': ['POST']},
+        {'url': 'touch/', 'name': 'touch', 'methods': ['POST']},
+    ]
+
+    # Checked out connections seen by the serialization
+    checked_out = []
+    metrics = None
+
+    def serialize(self, method, endpoint, data):
+        self.checked_out.append(self.metrics.checked_out)
+        return super(ArticleResource, self).serialize(method, endpoint, data)
+
+    def draft(self, *args, **kwargs):
+        # Flushed for the id, left for the caller to commit
+        article = Article(title=u'draft')
+        self.session.add(article)
+        self.session.flush()
+        return article
+
+    def touch(self, *args, **kwargs):
+        self.query.update({'views': 99}, synchronize_session=False)
+        return self.obj_get(id=1)
+
+
+class ReleaseConnectionTest(AppTestCase):
+
+    def setUp(self):
+        super(ReleaseConnectionTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        self.add_articles(3)
+        with self.app.app_context():
+            self.metrics = PoolMetrics(db.engine)
+        ArticleResource.metrics = self.metrics
+        del ArticleResource.checked_out[:]
+
+    def tearDown(self):
+        self.metrics.remove()
+        super(ReleaseConnectionTest, self).tearDown()
+
+    def test_connection_is_released_before_serialization(self):
+        status, data = self.get_json('/api/articles/')
+        self.assertEqual([article['title'] for article in data['objects']],
+                         [u'title 0', u'title 1', u'title 2'])
+        status, data = self.get_json('/api/articles/2/')
+        self.assertEqual(data['title'], u'title 1')
+
+        self.assertEqual(ArticleResource.checked_out, [0, 0])
+        self.assertEqual(self.metrics.checked_out, 0)
+
+    def test_writes_committed_by_the_view_are_kept(self):
+        status, data = self.send_json('PATCH', '/api/articles/1/',
+                                      {'title': u'renamed'})
+        self.assertEqual(status, 202)
+        self.assertEqual(data['title'], u'renamed')
+        self.assertEqual(ArticleResource.checked_out, [0])
+
+        with self.app.app_context():
+            self.assertEqual(Article.query.get(1).title, u'renamed')
+
+    def test_flushed_writes_are_not_committed(self):
+        status, data = self.send_json('POST', '/api/articles/draft/', {})
+        self.assertEqual(data['title'], u'draft')
+        # The transaction, and its connection, are left to the caller
+        self.assertEqual(ArticleResource.checked_out, [1])
+
+        with self.app.app_context():
+            self.assertEqual(Article.query.count(), 3)
+
+    def test_bulk_writes_are_not_committed(self):
+        status, data = self.send_json('POST', '/api/articles/touch/', {})
+        self.assertEqual(status, 200)
+        self.assertEqual(ArticleResource.checked_out, [1])
+
+        with self.app.app_context():
+            self.assertEqual(Article.query.get(1).views, 0)
+
+
+class PoolMetricsTest(AppTestCase):
+
+    def test_checkouts_are_counted(self):
+        with self.app.app_context():
+            metrics = PoolMetrics(db.engine)
+            try:
+                connection = db.engine.connect()
+                snapshot = metrics.snapshot()
+                self.assertEqual(snapshot['checkouts'], 1)
+                self.assertEqual(snapshot['checked_out'], 1)
+
+                second = db.engine.connect()
+                second.close()
+                connection.close()
+
+                snapshot = metrics.snapshot()
+                self.assertEqual(snapshot['checkouts'], 2)
+                self.assertEqual(snapshot['checkins'], 2)
+                self.assertEqual(snapshot['checked_out'], 0)
+                self.assertEqual(snapshot['max_checked_out'], 2)
+                self.assertGreaterEqual(snapshot['max_checkout_seconds'],
+                                        snapshot['avg_checkout_seconds'])
+
+                metrics.reset()
+                self.assertEqual(metrics.snapshot()['checkouts'], 0)
+            finally:
+                metrics.remove()
+
+            db.engine.connect().close()
+            self.assertEqual(metrics.snapshot()['checkouts'], 0)
+
+    def test_checkins_of_connections_checked_out_before(self):
+        with self.app.app_context():
+            connection = db.engine.connect()
+            metrics = PoolMetrics(db.engine)
+            try:
+                connection.close()
+                snapshot = metrics.snapshot()
+                self.assertEqual(snapshot['checkins'], 1)
+                self.assertEqual(snapshot['checked_out'], 0)
+            finally:
+                metrics.remove()
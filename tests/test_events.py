@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import datetime
+import json
+import unittest
+
+from flask_sqa_restless import events
+from flask_sqa_restless.events import EventBus
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, Owner, db
+
+bus = EventBus()
+bus.track(Article)
+
+small_bus = EventBus(max_pending=1)
+small_bus.track(Article)
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    event_bus = bus
+    stream_keepalive = 0.01
+    filtering = {'status': ['exact'], 'views': ['gt'], 'owner': ['exact']}
+
+
+class SmallArticleResource(ArticleResource):
+    event_bus = small_bus
+
+
+class EventBusTest(AppTestCase):
+
+    def setUp(self):
+        super(EventBusTest, self).setUp()
+        self.enable_savepoints()
+        self.add_articles(1)
+        self.subscription = bus.subscribe(Article)
+
+    def tearDown(self):
+        self.subscription.close()
+        super(EventBusTest, self).tearDown()
+
+    def received(self):
+        received = []
+        while True:
+            event = self.subscription.get(timeout=0)
+            if event is None:
+                return received
+            received.append((event.type, event.identifier,
+                             event.values['title']))
+
+    def test_committed_changes_are_published(self):
+        with self.app.app_context():
+            article = Article(title=u'new')
+            db.session.add(article)
+            db.session.commit()
+
+            article.title = u'renamed'
+            db.session.commit()
+
+            db.session.delete(article)
+            db.session.commit()
+
+        self.assertEqual(self.received(), [
+            (events.CREATED, 2, u'new'),
+            (events.UPDATED, 2, u'renamed'),
+            (events.DELETED, 2, u'renamed'),
+        ])
+
+    def test_untracked_and_unmodified_objects_are_not_published(self):
+        with self.app.app_context():
+            db.session.add(Owner(name=u'owner'))
+            article = Article.query.get(1)
+            article.title = article.title
+            db.session.commit()
+
+        self.assertEqual(self.received(), [])
+
+    def test_rolled_back_changes_are_not_published(self):
+        with self.app.app_context():
+            db.session.add(Article(title=u'rolled back'))
+            db.session.flush()
+            db.session.rollback()
+
+            db.session.add(Article(title=u'kept'))
+            savepoint = db.session.begin_nested()
+            db.session.add(Article(title=u'savepoint'))
+            db.session.flush()
+            savepoint.rollback()
+
+            savepoint = db.session.begin_nested()
+            db.session.add(Article(title=u'released'))
+            savepoint.commit()
+            # Released savepoints are published with their transaction
+            self.assertEqual(self.received(), [])
+            db.session.commit()
+
+        self.assertEqual([title for _, _, title in self.received()],
+                         [u'kept', u'released'])
+
+    def test_slow_subscribers_overflow(self):
+        subscription = small_bus.subscribe(Article)
+        try:
+            with self.app.app_context():
+                db.session.add_all([Article(title=u'a'), Article(title=u'b')])
+                db.session.commit()
+
+            self.assertTrue(subscription.overflowed)
+            self.assertIsNotNone(subscription.get(timeout=0))
+            self.assertIsNone(subscription.get(timeout=0))
+        finally:
+            subscription.close()
+
+
+class ConditionTest(unittest.TestCase):
+
+    def condition(self, field, operator, value):
+        column = Article.__table__.c[field]
+        return events.make_condition(column, field, operator, value)
+
+    def test_typed_conditions_coerce_their_value(self):
+        self.assertTrue(self.condition('views', 'gt', '5')({'views': 6}))
+        self.assertFalse(self.condition('views', 'gt', '5')({'views': None}))
+        self.assertTrue(self.condition('views', 'in', ['1', '2'])(
+            {'views': 2}))
+        self.assertTrue(self.condition('views', 'range', ['1', '3'])(
+            {'views': 3}))
+
+    def test_text_conditions(self):
+        self.assertTrue(self.condition('title', 'icontains', 'ITL')(
+            {'title': u'title'}))
+        self.assertFalse(self.condition('title', 'icontains', 'x')(
+            {'title': None}))
+        self.assertTrue(self.condition('title', 'isnull', True)(
+            {'title': None}))
+
+    def test_coerce_value(self):
+        column = db.Column('at', db.DateTime)
+        self.assertEqual(events.coerce_value(column, '2017-03-01T10:30:00'),
+                         datetime.datetime(2017, 3, 1, 10, 30))
+
+    def test_unsupported_operator(self):
+        with self.assertRaises(ValueError):
+            self.condition('title', 'search', 'x')
+
+
+class StreamTest(AppTestCase):
+
+    def setUp(self):
+        super(StreamTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        SmallArticleResource.add_url_rules(self.app, '/api/small/articles/',
+                                           endpoint_prefix='small')
+        self.add_articles(1)
+
+    def open_stream(self, url):
+        response = self.client.get(url, buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = iter(response.response)
+        self.assertEqual(next(chunks), b': connected\n\n')
+        self.addCleanup(response.close)
+        return chunks
+
+    def next_event(self, chunks):
+        # Up to a second of keepalives
+        for _ in range(100):
+            chunk = next(chunks)
+            if chunk != b': keepalive\n\n':
+                return chunk
+        self.fail('No event was streamed')
+
+    def add(self, **values):
+        with self.app.app_context():
+            db.session.add(Article(**values))
+            db.session.commit()
+
+    def test_events_meeting_the_filters_are_streamed(self):
+        chunks = self.open_stream('/api/articles/stream/?status=open')
+        self.add(title=u'closed', status=u'closed')
+        self.add(title=u'open', status=u'open', views=3)
+
+        event_type, data = self.next_event(chunks).decode(
+            'utf-8').rstrip('\n').split('\n')
+        self.assertEqual(event_type, 'event: created')
+        data = json.loads(data[len('data: '):])
+        self.assertEqual((data['type'], data['id']), ('created', 3))
+        self.assertEqual(data['object']['title'], u'open')
+        self.assertEqual(data['object']['views'], 3)
+
+    def test_idle_streams_are_kept_alive(self):
+        chunks = self.open_stream('/api/articles/stream/')
+        self.assertEqual(next(chunks), b': keepalive\n\n')
+
+    def test_slow_subscribers_are_disconnected(self):
+        chunks = self.open_stream('/api/small/articles/stream/')
+        self.add(title=u'a')
+        self.add(title=u'b')
+
+        self.assertEqual(self.next_event(chunks),
+                         b'event: overflow\ndata: {}\n\n')
+        self.assertRaises(StopIteration, next, chunks)
+
+    def test_unsupported_filters_are_rejected(self):
+        status, data = self.get_json('/api/articles/stream/?owner=1')
+        self.assertEqual(status, 400)
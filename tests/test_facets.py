@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import (AppTestCase, Article, ArticleSerializer, Owner,
+                   OwnerSerializer, db)
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    filtering = {'status': ['exact'], 'owner_id': ['exact'],
+                 'views': ['gt']}
+
+
+class OwnerResource(FlaskSQAResource):
+    model = Owner
+    session = db.session
+    serializer_cls = OwnerSerializer
+    NESTED_API = [{
+        'resource': ArticleResource,
+        'url_prefix': 'articles',
+        'parent_identifier': 'owner_id',
+        'parent_filter': lambda value: {'owner_id': value},
+        'list_allowed': ['GET'],
+    }]
+
+
+class FacetCountTest(AppTestCase):
+
+    def setUp(self):
+        super(FacetCountTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        OwnerResource.add_url_rules(self.app, '/api/owners/')
+        # Views 0, 10, 20 and 30, odd articles open, owners 1 and 2
+        # alternating
+        self.add_articles(4)
+
+    def test_counts_per_facet_value(self):
+        status, data = self.get_json(
+            '/api/articles/count/?facets=status,owner_id')
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {
+            'total_count': 4,
+            'facets': {
+                'status': {'open': 2, 'closed': 2},
+                'owner_id': {'1': 2, '2': 2},
+            }
+        })
+
+    def test_counts_apply_the_filters(self):
+        status, data = self.get_json(
+            '/api/articles/count/?facets=status&views__gt=15')
+        self.assertEqual(data, {'total_count': 2,
+                                'facets': {'status': {'open': 1,
+                                                      'closed': 1}}})
+
+        status, data = self.get_json(
+            '/api/articles/count/?facets=status&views__gt=1000')
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {'total_count': 0, 'facets': {'status': {}}})
+
+    def test_null_values_are_counted(self):
+        with self.app.app_context():
+            db.session.add(Article(title=u'draft', status=None))
+            db.session.commit()
+
+        status, data = self.get_json('/api/articles/count/?facets=status')
+        self.assertEqual(data['total_count'], 5)
+        self.assertEqual(data['facets']['status'],
+                         {'open': 2, 'closed': 2, 'null': 1})
+
+    def test_facets_must_allow_exact_filtering(self):
+        status, data = self.get_json('/api/articles/count/?facets=views')
+        self.assertEqual(status, 400)
+
+        status, data = self.get_json('/api/articles/count/?facets=missing')
+        self.assertEqual(status, 400)
+
+    def test_count_without_facets(self):
+        status, data = self.get_json('/api/articles/count/?facets=')
+        self.assertEqual(data, {'total_count': 4})
+
+    def test_nested_counts_are_restricted_to_the_parent(self):
+        status, data = self.get_json(
+            '/api/owners/1/articles/count/?facets=status')
+        self.assertEqual(data, {'total_count': 2,
+                                'facets': {'status': {'closed': 2}}})
+
+        status, data = self.get_json(
+            '/api/owners/9/articles/count/?facets=status')
+        self.assertEqual(status, 404)
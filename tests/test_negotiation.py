@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import json
+
+from flask_sqa_restless.formats import JSON, MSGPACK
+from flask_sqa_restless.resources import (COLUMNAR_CONTENT_TYPE,
+                                          FlaskSQAResource)
+
+from flask_sqa_restless.serializer import ModelJSONSerializer
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+class Document(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    format = db.Column(db.Unicode(20))
+
+
+class DocumentSerializer(ModelJSONSerializer):
+    class Meta:
+        model = Document
+        sqla_session = db.session
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    formats = [JSON]
+
+
+class NegotiationTest(AppTestCase):
+
+    def setUp(self):
+        super(NegotiationTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        self.add_articles(2)
+
+    def test_columnar_negotiation_varies_on_accept(self):
+        response = self.client.get('/api/articles/', headers={
+            'Accept': COLUMNAR_CONTENT_TYPE})
+        self.assertEqual(response.mimetype, COLUMNAR_CONTENT_TYPE)
+        self.assertIn('Accept', response.vary)
+
+        response = self.client.get('/api/articles/')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertIn('Accept', response.vary)
+
+    def test_columnar_query_string_does_not_vary_on_accept(self):
+        response = self.client.get('/api/articles/?format=columnar')
+        self.assertEqual(response.mimetype, COLUMNAR_CONTENT_TYPE)
+        self.assertNotIn('Accept', response.vary)
+
+    def test_single_format_detail_does_not_vary_on_accept(self):
+        response = self.client.get('/api/articles/1/')
+        self.assertNotIn('Accept', response.vary)
+
+
+class MultiFormatResource(ArticleResource):
+    formats = [JSON, MSGPACK]
+
+
+class FormatNegotiationTest(AppTestCase):
+
+    def setUp(self):
+        super(FormatNegotiationTest, self).setUp()
+        MultiFormatResource.add_url_rules(self.app, '/api/articles/')
+        self.add_articles(2)
+
+    def test_negotiated_formats_vary_on_accept(self):
+        response = self.client.get('/api/articles/1/', headers={
+            'Accept': 'application/msgpack'})
+        self.assertEqual(response.mimetype, 'application/msgpack')
+        self.assertIn('Accept', response.vary)
+
+        response = self.client.get('/api/articles/1/')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertIn('Accept', response.vary)
+
+    def test_errors_vary_on_accept(self):
+        response = self.client.get('/api/articles/42/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('Accept', response.vary)
+
+
+class DocumentResource(FlaskSQAResource):
+    model = Document
+    session = db.session
+    serializer_cls = DocumentSerializer
+    formats = [JSON]
+    filtering = {'format': ['exact']}
+
+
+class PlainDocumentResource(DocumentResource):
+    allow_columnar = False
+
+
+class FormatFieldTest(AppTestCase):
+
+    def setUp(self):
+        super(FormatFieldTest, self).setUp()
+        DocumentResource.add_url_rules(self.app, '/api/documents/')
+        PlainDocumentResource.add_url_rules(self.app, '/api/plain/documents/',
+                                            endpoint_prefix='plain')
+        with self.app.app_context():
+            db.session.add_all([Document(format=u'pdf'),
+                                Document(format=u'columnar')])
+            db.session.commit()
+
+    def test_format_parameter_is_not_a_filter(self):
+        response = self.client.get('/api/documents/?format=columnar')
+        self.assertEqual(response.mimetype, COLUMNAR_CONTENT_TYPE)
+        data = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(len(data['rows']), 2)
+
+        status, data = self.get_json('/api/documents/?format=pdf')
+        self.assertEqual(len(data['objects']), 2)
+
+    def test_format_field_is_filtered_with_exact(self):
+        status, data = self.get_json('/api/documents/?format__exact=pdf')
+        self.assertEqual([document['format'] for document in data['objects']],
+                         [u'pdf'])
+
+    def test_format_field_is_filtered_without_columnar_format(self):
+        status, data = self.get_json('/api/plain/documents/?format=columnar')
+        self.assertEqual([document['format'] for document in data['objects']],
+                         [u'columnar'])
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless import util
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import (AppTestCase, Article, ArticleSerializer, Owner,
+                   OwnerSerializer, db)
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    use_lookup_cache = True
+
+
+class ReportArticleResource(ArticleResource):
+    aggregation = {'status': ['group_by'], 'owner_id': ['group_by'],
+                   'views': ['sum']}
+    changes_cursor_field = 'id'
+
+
+class OwnerResource(FlaskSQAResource):
+    model = Owner
+    session = db.session
+    serializer_cls = OwnerSerializer
+    NESTED_API = [{
+        'resource': ArticleResource,
+        'url_prefix': 'articles',
+        'parent_identifier': 'owner_id',
+        'parent_filter': lambda value: {'owner_id': value},
+        'list_allowed': ['GET'],
+        'detail_allowed': ['GET'],
+        'allow_bulk_insert': True,
+    }]
+
+
+LAZY_ARTICLES_API = {
+    'resource': 'tests.test_nested.ReportArticleResource',
+    'url_prefix': 'articles',
+    'name': 'reportarticle',
+    'parent_identifier': 'owner_id',
+    'parent_filter': lambda value: {'owner_id': value},
+    'list_allowed': ['GET'],
+}
+
+
+class LazyOwnerResource(FlaskSQAResource):
+    model = Owner
+    session = db.session
+    serializer_cls = OwnerSerializer
+
+
+class NestedResourceTest(AppTestCase):
+
+    def setUp(self):
+        super(NestedResourceTest, self).setUp()
+        OwnerResource.add_url_rules(self.app, '/api/owners/')
+        self.add_articles(4)
+
+    def test_list_of_missing_parent_is_not_found(self):
+        status, data = self.get_json('/api/owners/1/articles/')
+        self.assertEqual(status, 200)
+        self.assertEqual([article['id'] for article in data['objects']],
+                         [1, 3])
+
+        status, data = self.get_json('/api/owners/9/articles/')
+        self.assertEqual(status, 404)
+
+    def test_bulk_update(self):
+        status, data = self.send_json(
+            'POST', '/api/owners/1/articles/bulk_insert/',
+            [{'id': 1, 'title': u'updated'}, {'title': u'created'}])
+        self.assertEqual(status, 200)
+        self.assertEqual(data['errors'], {})
+
+        with self.app.app_context():
+            self.assertEqual(Article.query.get(1).title, u'updated')
+            self.assertEqual(
+                Article.query.filter_by(title=u'created').count(), 1)
+
+    def test_parent_object_goes_through_lookup_cache(self):
+        with self.app.test_request_context('/'):
+            from flask_sqa_restless.cache import RequestLookupCache
+            from flask_sqa_restless.resources import ParentRelation
+
+            RequestLookupCache.activate()
+            relation = ParentRelation(OwnerResource, 'owner_id', 1)
+            self.assertIs(relation.get_object(), relation.get_object())
+            self.assertEqual(len(RequestLookupCache.current()._entries), 1)
+
+
+class LazyNestedResourceTest(AppTestCase):
+
+    def setUp(self):
+        super(LazyNestedResourceTest, self).setUp()
+        self.add_articles(6, owner_count=1)
+
+    def get_view_function(self, api_name):
+        return self.app.view_functions.get(
+            LazyOwnerResource.build_endpoint_name(api_name))
+
+    def add_url_rules(self, **spec):
+        LazyOwnerResource.NESTED_API = [dict(LAZY_ARTICLES_API, **spec)]
+        LazyOwnerResource.add_url_rules(self.app, '/api/owners/', lazy=True)
+
+    def test_undeclared_apis_of_lazy_resource_are_found_out(self):
+        self.add_url_rules()
+
+        self.assertIsNotNone(self.get_view_function('reportarticle_aggregate'))
+        self.assertIsNotNone(self.get_view_function('reportarticle_changes'))
+        self.assertIsNone(self.get_view_function('reportarticle_stream'))
+
+        status, data = self.get_json(
+            '/api/owners/1/articles/aggregate/?group_by=status&sum=views')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['objects'], [
+            {'status': u'closed', 'sum__views': 60},
+            {'status': u'open', 'sum__views': 90},
+        ])
+
+    def test_declared_apis_keep_resource_lazy(self):
+        import_class = util.import_class
+        imported = []
+
+        def record_import(path):
+            imported.append(path)
+            return import_class(path)
+
+        util.import_class = record_import
+        try:
+            self.add_url_rules(aggregate=True, changes=False, stream=False)
+            self.assertEqual(imported, [])
+
+            self.assertIsNotNone(
+                self.get_view_function('reportarticle_aggregate'))
+            self.assertIsNone(self.get_view_function('reportarticle_changes'))
+
+            status, data = self.get_json(
+                '/api/owners/1/articles/aggregate/?count=*')
+            self.assertEqual(status, 200)
+            self.assertEqual(data['objects'], [{'count': 6}])
+            self.assertEqual(imported,
+                             ['tests.test_nested.ReportArticleResource'])
+        finally:
+            util.import_class = import_class
+
+    def test_aggregate_groups_are_paginated(self):
+        self.add_url_rules()
+
+        status, data = self.get_json(
+            '/api/owners/1/articles/aggregate/?group_by=status&sum=views'
+            '&limit=1&offset=1')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['objects'],
+                         [{'status': u'open', 'sum__views': 90}])
+        self.assertEqual(data['meta'],
+                         {'count': 2, 'limit': 1, 'offset': 1})
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Parity of the fast list serializations - rendered by the database, encoded
+on a process pool and columnar - with the serialization by the schema.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+
+import datetime
+import decimal
+
+from marshmallow import fields, post_dump, pre_dump
+
+from flask_sqa_restless.resources import FlaskSQAResource
+from flask_sqa_restless.serializer import ModelJSONSerializer
+
+from .base import AppTestCase, Owner, db
+
+
+class Reading(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.Unicode(50))
+    note = db.Column(db.UnicodeText)
+    active = db.Column(db.Boolean)
+    count = db.Column(db.Integer)
+    ratio = db.Column(db.Float)
+    price = db.Column(db.Numeric(10, 2))
+    taken_at = db.Column(db.DateTime)
+    day = db.Column(db.Date)
+    owner_id = db.Column(db.Integer, db.ForeignKey('owner.id'))
+    owner = db.relationship(Owner)
+
+
+class ReadingSerializer(ModelJSONSerializer):
+    class Meta:
+        model = Reading
+        sqla_session = db.session
+        include_fk = True
+
+
+class UpperNameSerializer(ReadingSerializer):
+
+    @post_dump
+    def upper_name(self, data):
+        data['name'] = data['name'] and data['name'].upper()
+        return data
+
+
+class DefaultNoteSerializer(ReadingSerializer):
+
+    @pre_dump
+    def default_note(self, obj):
+        if obj.note is None:
+            obj.note = u'none'
+        return obj
+
+
+class CountAsStringSerializer(ReadingSerializer):
+    count = fields.Integer(as_string=True)
+
+
+class TextOnlySerializer(ModelJSONSerializer):
+    """
+    Fields the database can render, for the rendered path to be taken
+    """
+
+    class Meta:
+        model = Reading
+        sqla_session = db.session
+        include_fk = True
+        fields = ('id', 'name', 'note', 'active', 'count', 'ratio',
+                  'owner_id')
+
+
+SERIALIZERS = [ReadingSerializer, UpperNameSerializer, DefaultNoteSerializer,
+               CountAsStringSerializer, TextOnlySerializer]
+
+MODES = {
+    'rendered': {'db_rendered_list': True},
+    'parallel': {'parallel_serialization': True,
+                 'parallel_serialization_threshold': 1,
+                 'parallel_serialization_workers': 2},
+}
+
+
+class RenderingParityTest(AppTestCase):
+
+    def setUp(self):
+        super(RenderingParityTest, self).setUp()
+        with self.app.app_context():
+            db.session.add(Owner(id=1, name=u'owner'))
+            for i in range(12):
+                empty = i % 4 == 3
+                db.session.add(Reading(
+                    id=i + 1,
+                    name=None if empty else u'r\xe9ading "%d"' % i,
+                    note=None if empty else u'line\nbreak %d' % i,
+                    active=None if empty else bool(i % 2),
+                    count=None if empty else i * 7 - 20,
+                    ratio=None if empty else i / 3.0,
+                    price=None if empty else decimal.Decimal('%d.25' % i),
+                    taken_at=None if empty else datetime.datetime(
+                        2017, 3, i + 1, 10, 30, 15, i * 1000),
+                    day=None if empty else datetime.date(2017, 3, i + 1),
+                    owner_id=None if empty else 1))
+            db.session.commit()
+
+        self.urls = {}
+        for serializer_cls in SERIALIZERS:
+            for mode in [None] + sorted(MODES):
+                attrs = dict(MODES.get(mode, {}), model=Reading,
+                             session=db.session,
+                             serializer_cls=serializer_cls,
+                             ordering_allowed=['id'])
+                resource = type(str('ReadingResource'), (FlaskSQAResource,),
+                                attrs)
+                url = '/api/{}/{}/'.format(serializer_cls.__name__,
+                                           mode or 'regular')
+                resource.add_url_rules(self.app, url, endpoint_prefix=url)
+                self.urls[serializer_cls, mode] = url
+
+    def get_objects(self, url):
+        status, data = self.get_json(url)
+        self.assertEqual(status, 200, data)
+        if 'columns' in data:
+            return [dict(zip(data['columns'], row)) for row in data['rows']]
+        return data['objects']
+
+    def assert_parity(self, serializer_cls, query_string=''):
+        expected = self.get_objects(
+            self.urls[serializer_cls, None] + query_string)
+        self.assertEqual(len(expected), 12 if 'limit' not in query_string
+                         else 5)
+
+        for mode in sorted(MODES):
+            self.assertEqual(
+                self.get_objects(self.urls[serializer_cls, mode] +
+                                 query_string),
+                expected, '{} {}'.format(serializer_cls.__name__, mode))
+
+        columnar = self.get_objects(
+            self.urls[serializer_cls, None] + query_string +
+            ('&' if query_string else '?') + 'format=columnar')
+        self.assertEqual(columnar, expected,
+                         '{} columnar'.format(serializer_cls.__name__))
+
+    def test_plain_schema(self):
+        self.assert_parity(ReadingSerializer)
+
+    def test_rendered_fields(self):
+        self.assert_parity(TextOnlySerializer)
+        self.assert_parity(TextOnlySerializer,
+                           '?limit=5&offset=3&order_by=-id')
+
+    def test_schema_with_post_dump(self):
+        self.assert_parity(UpperNameSerializer)
+
+    def test_schema_with_pre_dump(self):
+        self.assert_parity(DefaultNoteSerializer)
+
+    def test_schema_with_as_string_field(self):
+        self.assert_parity(CountAsStringSerializer)
+
+    def test_selected_fields(self):
+        self.assert_parity(ReadingSerializer,
+                           '?include_fields=name&include_fields=price')
+
+    def test_empty_rendered_page(self):
+        url = self.urls[TextOnlySerializer, 'rendered']
+        self.assertEqual(self.get_objects(url + '?limit=5&offset=20'), [])
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from flask_sqa_restless.resources import FlaskSQAResource
+from flask_sqa_restless.routing import ReplicaRouter
+
+from .base import AppTestCase, Article, ArticleSerializer, Owner, db
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+
+
+class ReplicaRoutingTest(AppTestCase):
+    """
+    Routes between the primary database of the application and a replica
+    holding different titles, to tell which one served a request
+    """
+
+    def setUp(self):
+        super(ReplicaRoutingTest, self).setUp()
+        self.add_articles(2)
+
+        engine = sa.create_engine(self.database_uri('replica'))
+        db.metadata.create_all(bind=engine)
+        self.replica = orm.scoped_session(orm.sessionmaker(bind=engine))
+        self.replica.add(Owner(id=1, name=u'owner'))
+        for i in (1, 2):
+            self.replica.add(Article(id=i, title=u'replica %d' % i,
+                                     owner_id=1))
+        self.replica.commit()
+        self.replica.remove()
+
+        ArticleResource.session_router = ReplicaRouter(
+            db.session, [self.replica], sticky_seconds=5)
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+
+    def tearDown(self):
+        ArticleResource.session_router = None
+        self.replica.remove()
+        super(ReplicaRoutingTest, self).tearDown()
+
+    def get_title(self, client, method='GET', override=None):
+        headers = {'Authorization': client}
+        if override:
+            headers['X-HTTP-Method-Override'] = override
+        status, data = self.send_json(method, '/api/articles/1/', None,
+                                      headers=headers)
+        self.assertEqual(status, 200)
+        return data['title']
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.get_title('alice'), u'replica 1')
+
+    def test_writes_go_to_primary_and_stick_the_client_to_it(self):
+        status, _ = self.send_json('PATCH', '/api/articles/1/',
+                                   {'title': u'patched'},
+                                   headers={'Authorization': 'alice'})
+        self.assertEqual(status, 202)
+
+        self.assertEqual(self.get_title('alice'), u'patched')
+        self.assertEqual(self.get_title('bob'), u'replica 1')
+
+    def test_routing_follows_method_override(self):
+        self.assertEqual(self.get_title('alice', 'POST', override='GET'),
+                         u'replica 1')
+
+        status, _ = self.send_json(
+            'GET', '/api/articles/2/', None,
+            headers={'Authorization': 'bob',
+                     'X-HTTP-Method-Override': 'DELETE'})
+        self.assertEqual(status, 204)
+
+        with self.app.app_context():
+            self.assertIsNone(Article.query.get(2))
+        self.assertIsNotNone(self.replica.query(Article).get(2))
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import datetime
+import unittest
+
+from marshmallow import fields
+
+from flask_sqa_restless.schema import BaseModelConverter, BaseModelSchema
+
+from .base import Article, db
+
+
+class FieldCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        BaseModelConverter.clear_field_cache()
+
+    def make_schema(self, **attrs):
+        meta = type('Meta', (object,), {'model': Article,
+                                        'sqla_session': db.session})
+        attrs['Meta'] = meta
+        return type('ArticleSchema', (BaseModelSchema,), attrs)
+
+    def test_fields_are_shared_across_schemas(self):
+        first = self.make_schema()
+        cached = dict(BaseModelConverter._field_cache)
+        self.assertTrue(cached)
+
+        second = self.make_schema()
+        self.assertEqual(BaseModelConverter._field_cache, cached)
+
+        # Every schema still gets fields of its own
+        self.assertIsNot(first._declared_fields['title'],
+                         second._declared_fields['title'])
+        self.assertIsInstance(second._declared_fields['title'], fields.String)
+
+    def test_schemas_with_other_type_mapping_are_converted_apart(self):
+        self.make_schema()
+        count = len(BaseModelConverter._field_cache)
+
+        type_mapping = dict(BaseModelSchema.TYPE_MAPPING)
+        type_mapping[datetime.datetime] = fields.DateTime
+        self.make_schema(TYPE_MAPPING=type_mapping)
+        self.assertEqual(len(BaseModelConverter._field_cache), count * 2)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless.djquery import DjangoQuery
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    search_fields = ['title', 'body']
+
+
+class FTSArticleResource(ArticleResource):
+    search_fts_table = 'article_fts'
+
+
+class SearchTest(AppTestCase):
+    """
+    Searches through the ``LIKE`` fallback
+    """
+
+    resource = ArticleResource
+
+    def setUp(self):
+        super(SearchTest, self).setUp()
+        self.resource.add_url_rules(self.app, '/api/articles/')
+        self.add_articles(5)
+
+    def search(self, terms):
+        status, data = self.get_json('/api/articles/',
+                                     query_string={'search': terms})
+        self.assertEqual(status, 200)
+        return sorted(article['id'] for article in data['objects'])
+
+    def test_search_matches_every_word(self):
+        self.assertEqual(self.search(u'title 3'), [4])
+        self.assertEqual(self.search(u'body'), [1, 2, 3, 4, 5])
+        self.assertEqual(self.search(u'title 7'), [])
+
+    def test_blank_search_is_no_search(self):
+        self.assertEqual(self.search(u''), [1, 2, 3, 4, 5])
+        self.assertEqual(self.search(u'  \t '), [1, 2, 3, 4, 5])
+
+    def test_blank_search_operator_is_no_filter(self):
+        with self.app.app_context():
+            query = DjangoQuery(Article, session=db.session())
+            self.assertEqual(query.filter_by(title__search=u' ').count(), 5)
+            self.assertEqual(query.filter_by(title__search=u'3').count(), 1)
+
+
+class FTSSearchTest(SearchTest):
+    """
+    Searches through the SQLite FTS5 table of the articles
+    """
+
+    resource = FTSArticleResource
+
+    def add_articles(self, *args, **kwargs):
+        super(FTSSearchTest, self).add_articles(*args, **kwargs)
+        with self.app.app_context():
+            db.session.execute(
+                "CREATE VIRTUAL TABLE article_fts USING fts5(title, body, "
+                "content='article', content_rowid='id')")
+            db.session.execute(
+                "INSERT INTO article_fts(article_fts) VALUES ('rebuild')")
+            db.session.commit()
+
+    def test_search_is_ordered_by_rank(self):
+        with self.app.app_context():
+            db.session.query(Article).filter_by(id=2).update(
+                {'body': u'searched searched searched'})
+            db.session.query(Article).filter_by(id=5).update(
+                {'body': u'searched'})
+            db.session.execute(
+                "INSERT INTO article_fts(article_fts) VALUES ('rebuild')")
+            db.session.commit()
+
+        status, data = self.get_json('/api/articles/?search=searched')
+        self.assertEqual([article['id'] for article in data['objects']],
+                         [2, 5])
+
+
+class LikeWildcardTest(AppTestCase):
+    """
+    Searches through the ``LIKE`` fallback for words holding its wildcards
+    """
+
+    def setUp(self):
+        super(LikeWildcardTest, self).setUp()
+        with self.app.app_context():
+            db.session.add_all([Article(title=title) for title in (
+                u'100% done', u'1000 done', u'a_b', u'axb', u'c\\d', u'cd')])
+            db.session.commit()
+
+    def search(self, terms):
+        with self.app.app_context():
+            query = DjangoQuery(Article, session=db.session())
+            return sorted(article.title for article in
+                          query.filter_by(title__search=terms))
+
+    def test_wildcards_match_themselves(self):
+        self.assertEqual(self.search(u'100%'), [u'100% done'])
+        self.assertEqual(self.search(u'%'), [u'100% done'])
+        self.assertEqual(self.search(u'a_b'), [u'a_b'])
+        self.assertEqual(self.search(u'_'), [u'a_b'])
+        self.assertEqual(self.search(u'c\\d'), [u'c\\d'])
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+from marshmallow import ValidationError as SchemaValidationError
+from marshmallow import fields, post_dump, post_load, pre_dump
+
+from flask_sqa_restless.exceptions import ValidationError
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+class UpperTitleSerializer(ArticleSerializer):
+
+    @post_dump
+    def upper_title(self, data):
+        data['title'] = data['title'].upper()
+        return data
+
+
+class EnvelopeSerializer(ArticleSerializer):
+
+    @post_dump(pass_many=True)
+    def envelope(self, data, many):
+        return {'items': data} if many else data
+
+
+class DefaultTitleSerializer(ArticleSerializer):
+
+    @pre_dump
+    def default_title(self, obj):
+        obj.title = obj.title or u'untitled'
+        return obj
+
+
+class ViewsAsStringSerializer(ArticleSerializer):
+    views = fields.Integer(as_string=True)
+
+
+class CleanTitleSerializer(ArticleSerializer):
+
+    @post_load
+    def strip_title(self, data):
+        if 'title' in data:
+            if not data['title'].strip():
+                raise SchemaValidationError('Blank title', 'title')
+            data['title'] = data['title'].strip()
+        return data
+
+
+class PlainProjectionTest(unittest.TestCase):
+
+    def test_column_fields_are_projected(self):
+        projection = ArticleSerializer().get_plain_projection()
+        self.assertEqual(
+            sorted((key, attribute) for key, attribute, _ in projection),
+            [('body', 'body'), ('id', 'id'), ('owner', 'owner_id'),
+             ('owner_id', 'owner_id'), ('status', 'status'),
+             ('title', 'title'), ('views', 'views')])
+
+    def test_schemas_with_dump_processors_are_not_projected(self):
+        for serializer_cls in (UpperTitleSerializer, EnvelopeSerializer,
+                               DefaultTitleSerializer):
+            self.assertIsNone(serializer_cls().get_plain_projection(),
+                              serializer_cls.__name__)
+
+    def test_fields_dumped_as_string_are_not_projected(self):
+        self.assertIsNone(ViewsAsStringSerializer().get_plain_projection())
+
+
+class ValidateModelTest(AppTestCase):
+
+    def setUp(self):
+        super(ValidateModelTest, self).setUp()
+        self.add_articles(1)
+
+    def test_values_are_returned_without_a_model_instance(self):
+        with self.app.app_context():
+            values = ArticleSerializer().validate_model(
+                {'title': u'new', 'views': u'5'}, partial=True)
+            self.assertEqual(values, {'title': u'new', 'views': 5})
+
+    def test_post_load_hooks_run_on_the_values(self):
+        with self.app.app_context():
+            values = CleanTitleSerializer().validate_model(
+                {'title': u'  padded  '}, partial=True)
+            self.assertEqual(values, {'title': u'padded'})
+
+            with self.assertRaises(ValidationError):
+                CleanTitleSerializer().validate_model({'title': u'  '},
+                                                      partial=True)
+
+    def test_persisted_row_is_left_untouched(self):
+        with self.app.app_context():
+            serializer = ArticleSerializer()
+            serializer.validate_model({'id': 1, 'title': u'changed'},
+                                      partial=True)
+            self.assertEqual(db.session.query(Article).get(1).title,
+                             u'title 0')
+            self.assertFalse(db.session.dirty)
+
+            # Loading still builds model instances afterwards
+            article = serializer.deserialize_model({'title': u'built'},
+                                                   partial=True)
+            self.assertIsInstance(article, Article)
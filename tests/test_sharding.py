@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import namedtuple
+
+import sqlalchemy as sa
+from flask import g, request
+from sqlalchemy import orm
+
+from flask_sqa_restless import sharding
+from flask_sqa_restless.authentication import Authentication
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, Owner, db
+
+User = namedtuple('User', ['shard'])
+
+
+class TokenAuthentication(Authentication):
+
+    def is_authenticated(self, method, view, **kwargs):
+        shard = request.headers.get('Authorization')
+        if shard is None:
+            return False
+
+        g.user = User(shard)
+        return True
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    serializer_cls = ArticleSerializer
+    search_fields = ['title', 'body']
+    search_fts_table = 'article_fts'
+    ordering_allowed = ['body']
+
+    def get_current_user(self):
+        return getattr(g, 'user', None)
+
+
+class PrincipalArticleResource(ArticleResource):
+    authentication = TokenAuthentication()
+
+
+class ShardingTest(AppTestCase):
+    """
+    Articles partitioned across two SQLite shards, the titles of articles of
+    shard ``b`` starting with ``b``
+    """
+
+    def setUp(self):
+        super(ShardingTest, self).setUp()
+        self.shards = {}
+        bodies = {'a': [u'apple', None, u'cherry searched searched'],
+                  'b': [None, u'banana searched', u'date']}
+        for name in ('a', 'b'):
+            engine = sa.create_engine(
+                self.database_uri('shard_' + name),
+                connect_args={'check_same_thread': False})
+            db.metadata.create_all(bind=engine)
+            session = orm.scoped_session(orm.sessionmaker(bind=engine))
+            session.add(Owner(id=1, name=u'owner'))
+            for i, body in enumerate(bodies[name]):
+                # Ids interleave across the shards
+                session.add(Article(id=i * 2 + (name == 'b') + 1,
+                                    title=u'%s%d' % (name, i), body=body,
+                                    owner_id=1))
+            session.flush()
+            session.execute(
+                "CREATE VIRTUAL TABLE article_fts USING fts5(title, body, "
+                "content='article', content_rowid='id')")
+            session.execute(
+                "INSERT INTO article_fts(article_fts) VALUES ('rebuild')")
+            session.commit()
+            self.shards[name] = session
+
+        router = sharding.ShardRouter(
+            sorted(self.shards.items()),
+            [sharding.PrincipalResolver('shard'),
+             sharding.FilterResolver('shard')])
+        ArticleResource.shard_router = router
+        PrincipalArticleResource.shard_router = router
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        PrincipalArticleResource.add_url_rules(
+            self.app, '/api/my/articles/', endpoint_prefix='my')
+
+    def tearDown(self):
+        ArticleResource.shard_router = None
+        PrincipalArticleResource.shard_router = None
+        for session in self.shards.values():
+            session.remove()
+        super(ShardingTest, self).tearDown()
+
+    def list_titles(self, url, **kwargs):
+        status, data = self.get_json(url, **kwargs)
+        self.assertEqual(status, 200)
+        return [article['title'] for article in data['objects']]
+
+    def test_shard_is_resolved_for_authenticated_user(self):
+        self.assertEqual(
+            self.list_titles('/api/my/articles/',
+                             headers={'Authorization': 'b'}),
+            [u'b0', u'b1', u'b2'])
+
+        status, _ = self.get_json('/api/my/articles/')
+        self.assertEqual(status, 401)
+
+    def test_fan_out_list_orders_nulls_as_the_database(self):
+        # SQLite sorts NULL before every value
+        self.assertEqual(
+            self.list_titles('/api/articles/?order_by=body'),
+            [u'b0', u'a1', u'a0', u'b1', u'a2', u'b2'])
+        self.assertEqual(
+            self.list_titles('/api/articles/?order_by=-body&limit=3'),
+            [u'b2', u'a2', u'b1'])
+
+    def test_fan_out_search_is_ordered_by_rank(self):
+        self.assertEqual(self.list_titles('/api/articles/?search=searched'),
+                         [u'a2', u'b1'])
+
+
+class SortKeyTest(AppTestCase):
+
+    def test_nulls_last_follows_dialect(self):
+        from sqlalchemy.dialects import postgresql, sqlite
+
+        self.assertTrue(sharding.nulls_last(postgresql.dialect()))
+        self.assertFalse(sharding.nulls_last(sqlite.dialect()))
+
+        objects = [Article(id=1, body=None), Article(id=2, body=u'x')]
+        ordered = sorted(objects, key=sharding.make_sort_key(
+            ['body'], ['id'], nulls_last=True))
+        self.assertEqual([obj.id for obj in ordered], [2, 1])
+        ordered = sorted(objects, key=sharding.make_sort_key(
+            ['-body'], ['id'], nulls_last=True))
+        self.assertEqual([obj.id for obj in ordered], [1, 2])
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+import io
+import json
+import unittest
+
+from flask_sqa_restless import streaming
+from flask_sqa_restless.exceptions import BadRequest
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+
+
+def read_array(text, chunk_size=4):
+    return list(streaming.iter_json_array(
+        io.BytesIO(text.encode('utf-8')), chunk_size=chunk_size))
+
+
+def read_ndjson(text):
+    return list(streaming.iter_ndjson(io.BytesIO(text.encode('utf-8'))))
+
+
+class JSONArrayReaderTest(unittest.TestCase):
+
+    def test_items_spanning_chunks(self):
+        self.assertEqual(
+            read_array(u'[{"title": "a, ]b"}, 12345, "été", null]'),
+            [{'title': u'a, ]b'}, 12345, u'été', None])
+
+    def test_empty_body_and_array(self):
+        self.assertEqual(read_array(u''), [])
+        self.assertEqual(read_array(u'  [ ]  '), [])
+
+    def test_malformed_bodies(self):
+        for text in (u'{"title": "a"}', u'[1, 2', u'[1 2]', u'[1,]',
+                     u'[{"title": ', u'[1] 2'):
+            with self.assertRaises(BadRequest, msg=text):
+                read_array(text)
+
+
+class NDJSONReaderTest(unittest.TestCase):
+
+    def test_records_and_blank_lines(self):
+        self.assertEqual(read_ndjson(u'{"a": 1}\n\n  \n{"a": 2}'),
+                         [{'a': 1}, {'a': 2}])
+
+    def test_malformed_line_is_reported(self):
+        with self.assertRaises(BadRequest) as context:
+            read_ndjson(u'{"a": 1}\n{"a": \n')
+        self.assertIn('line 2', context.exception.description)
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    allow_bulk_insert = True
+    bulk_insert_streaming = True
+    bulk_insert_chunk_size = 2
+
+
+class StreamedBulkInsertTest(AppTestCase):
+
+    url = '/api/articles/bulk_insert/'
+
+    def setUp(self):
+        super(StreamedBulkInsertTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+
+    def post(self, body, content_type='application/json'):
+        response = self.client.post(self.url, data=body,
+                                    content_type=content_type)
+        return response.status_code, json.loads(response.data.decode('utf-8'))
+
+    def titles(self):
+        with self.app.app_context():
+            return [article.title for article in
+                    Article.query.order_by(Article.id)]
+
+    def test_json_array(self):
+        status, data = self.post(json.dumps(
+            [{'title': u'title %d' % i} for i in range(5)]))
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(data['success']), ['0', '1', '2', '3', '4'])
+        self.assertEqual(data['errors'], {})
+        self.assertEqual(self.titles(), [u'title %d' % i for i in range(5)])
+
+    def test_ndjson(self):
+        status, data = self.post(u'{"title": "a"}\n\n{"title": "b"}\n',
+                                 streaming.NDJSON_CONTENT_TYPE)
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(data['success']), ['0', '1'])
+        self.assertEqual(self.titles(), [u'a', u'b'])
+
+    def test_records_that_are_not_objects_are_rejected(self):
+        status, data = self.post(u'[{"title": "a"}, 1, "b", null]')
+        self.assertEqual(status, 200)
+        self.assertEqual(list(data['success']), ['0'])
+        self.assertEqual(sorted(data['errors']), ['1', '2', '3'])
+        self.assertEqual(data['errors']['1']['type'], 'ValidationError')
+        self.assertEqual(self.titles(), [u'a'])
+
+    def test_truncated_stream_reports_the_processed_records(self):
+        status, data = self.post(u'[1, 2')
+        self.assertEqual(status, 400)
+        self.assertEqual(data['payload']['processed'], 2)
+        self.assertEqual(sorted(data['payload']['errors']), ['0', '1'])
+
+        status, data = self.post(
+            u'[{"title": "a"}, {"title": "b"}, {"title": "c"}, {"title"')
+        self.assertEqual(status, 400)
+        self.assertEqual(data['payload']['processed'], 2)
+        self.assertEqual(sorted(data['payload']['success']), ['0', '1'])
+        # The chunk saved before the malformed part stays saved
+        self.assertEqual(self.titles(), [u'a', u'b'])
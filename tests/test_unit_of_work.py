@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import division
+
+from flask_sqa_restless.exceptions import BadRequest, ValidationError
+from flask_sqa_restless.jobs import InMemoryJobStore, Job
+from flask_sqa_restless.resources import FlaskSQAResource
+
+from .base import AppTestCase, Article, ArticleSerializer, db
+from .test_bulk import RecordingJobRunner
+
+
+class ArticleResource(FlaskSQAResource):
+    model = Article
+    session = db.session
+    serializer_cls = ArticleSerializer
+    unit_of_work = True
+    allow_bulk_insert = True
+    bulk_insert_chunk_size = 1
+    CUSTOM_APIS = [
+        {'url': 'rejected/', 'name': 'rejected', 'methods': ['POST']},
+    ]
+
+    def rejected(self, *args, **kwargs):
+        self.obj_create({'title': u'rejected'})
+        raise BadRequest('Rejected after the create')
+
+    def obj_create(self, data, commit=True):
+        obj = super(ArticleResource, self).obj_create(data, commit)
+        # Fails once the record is flushed, for the savepoint to undo it
+        if obj.title == u'invalid':
+            raise ValidationError(payload={'title': 'Invalid title'})
+        return obj
+
+
+class FailingJobArticleResource(ArticleResource):
+    bulk_insert_async = True
+    job_store = InMemoryJobStore()
+    job_runner = RecordingJobRunner()
+
+    def _bulk_save(self, op_name, object_list, start_index=0):
+        result = super(FailingJobArticleResource, self)._bulk_save(
+            op_name, object_list, start_index)
+        if start_index:
+            raise RuntimeError('Lost the connection')
+        return result
+
+
+class StreamingArticleResource(ArticleResource):
+    bulk_insert_streaming = True
+
+
+class UnitOfWorkTest(AppTestCase):
+
+    def create_app(self, database_uri):
+        app = super(UnitOfWorkTest, self).create_app(database_uri)
+        app.config['SQLALCHEMY_COMMIT_ON_TEARDOWN'] = True
+        return app
+
+    def setUp(self):
+        super(UnitOfWorkTest, self).setUp()
+        ArticleResource.add_url_rules(self.app, '/api/articles/')
+        FailingJobArticleResource.add_url_rules(
+            self.app, '/api/jobs/articles/', endpoint_prefix='jobs')
+        StreamingArticleResource.add_url_rules(
+            self.app, '/api/streamed/articles/', endpoint_prefix='streamed')
+        self.enable_savepoints()
+
+    def titles(self):
+        with self.app.app_context():
+            return [article.title for article in
+                    Article.query.order_by(Article.id)]
+
+    def test_successful_request_is_committed(self):
+        status, data = self.send_json('POST', '/api/articles/',
+                                      {'title': u'created'})
+        self.assertEqual(status, 201)
+        self.assertEqual(self.titles(), [u'created'])
+
+    def test_failed_request_is_rolled_back(self):
+        status, data = self.send_json('POST', '/api/articles/rejected/', {})
+        self.assertEqual(status, 400)
+        self.assertEqual(self.titles(), [])
+
+        # Neither the teardown nor the next request commit the create
+        status, data = self.send_json('POST', '/api/articles/',
+                                      {'title': u'created'})
+        self.assertEqual(status, 201)
+        self.assertEqual(self.titles(), [u'created'])
+
+    def test_failed_bulk_records_are_rolled_back_alone(self):
+        status, data = self.send_json(
+            'POST', '/api/articles/bulk_insert/',
+            [{'title': u'first'}, {'title': u'invalid'}, {'title': u'last'}])
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(data['success']), ['0', '2'])
+        self.assertEqual(data['errors']['1']['type'], 'ValidationError')
+        self.assertEqual(self.titles(), [u'first', u'last'])
+
+    def test_malformed_stream_is_rolled_back(self):
+        response = self.client.post(
+            '/api/streamed/articles/bulk_insert/',
+            data=u'[{"title": "first"}, {"title"',
+            content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.titles(), [])
+
+    def test_failed_job_rolls_back_its_last_chunk(self):
+        status, data = self.send_json(
+            'POST', '/api/jobs/articles/bulk_insert/',
+            [{'title': u'first'}, {'title': u'second'}])
+        self.assertEqual(status, 202)
+
+        FailingJobArticleResource.job_runner.results[-1].get(timeout=10)
+        job = FailingJobArticleResource.job_store.get(data['job_id'])
+        self.assertEqual(job['status'], Job.FAILED)
+        self.assertEqual(job['processed'], 1)
+        self.assertEqual(self.titles(), [u'first'])